@@ -1,1792 +1,1171 @@
-import os, json, io, zipfile
-from pathlib import Path
-from datetime import datetime, date, time, timedelta, timezone
-from typing import Dict, List
-
-import pandas as pd
-import streamlit as st
-import gspread
-from google.oauth2.service_account import Credentials
-
-# -------- Page config (맨 위에서 1번만) --------
-ICON = Path(__file__).parent / "icon.png"   # 파일명이 favicon.png라면 여기만 바꾸세요
-st.set_page_config(
-    page_title="Pilates Manager",
-    page_icon=str(ICON) if ICON.exists() else "✨",
-    layout="wide",
-    initial_sidebar_state="expanded",
-)
-
-# -------- Google Sheets 연결 --------
-SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
-
-# secrets에 credentials가 문자열/딕트 어떤 형태로 와도 동작하게 처리
-creds_dict = _raw if isinstance(_raw, dict) else json.loads(_raw)
-
-client = gspread.authorize(creds)
-# ✅ 시트 ID
-SHEET_ID = st.secrets["gcp_service"]["SHEET_ID"]
-
-# ✅ 탭별 시트 가져오기
-members_sheet = client.open_by_key(SHEET_ID).worksheet("members")
-sessions_sheet = client.open_by_key(SHEET_ID).worksheet("sessions")
-schedule_sheet = client.open_by_key(SHEET_ID).worksheet("schedule")
-
-# ✅ DataFrame 변환
-df_members = pd.DataFrame(members_sheet.get_all_records())
-df_sessions = pd.DataFrame(sessions_sheet.get_all_records())
-df_schedule = pd.DataFrame(schedule_sheet.get_all_records())
-
-# -------- Streamlit 화면 --------
-st.title("📊 구글 시트 연결 테스트")
-
-st.subheader("👥 Members")
-st.dataframe(df_members)
-
-st.subheader("🗓️ Sessions")
-st.dataframe(df_sessions)
-
-st.subheader("📅 Schedule")
-st.dataframe(df_schedule)
-# ==========================
-# Constants & paths
-# ==========================
-MEMBERS_CSV  = DATA_DIR / "members.csv"
-SESSIONS_CSV = DATA_DIR / "sessions.csv"
-SCHEDULE_CSV = DATA_DIR / "schedule.csv"
-EX_DB_JSON   = DATA_DIR / "exercise_db.json"
-SETTINGS_JSON= DATA_DIR / "settings.json"   # 방문 기본 실수령 등
-
-CHERRY_PIN = st.secrets.get("CHERRY_PW", "2974")
-
-SITES      = ["F", "R", "V"]  # Flow / Ryu / Visit
-SITE_KR    = {"F": "플로우", "R": "리유", "V": "방문"}
-SITE_COLOR = {"F": "#d9f0ff", "R": "#eeeeee", "V": "#e9fbe9"}
-SITE_LABEL = {"F":"F", "R":"R", "V":"V"}
-
-# ==========================
-# Defaults
-# ==========================
-EX_DB_DEFAULT: Dict[str, List[str]] = {
-    # 최소 예시(원하는 대로 exercise_db.json로 교체 가능)
-    "Mat": ["The Hundred","Roll Up","Roll Over"],
-    "Reformer": ["Footwork - Toes","Hundred","Overhead"],
-    "Cadillac": ["Breathing","Spread Eagle","Pull Ups"],
-    "Wunda chair": ["Footwork - Toes","Push Down","Pull Up"],
-    "Ladder Barrel": ["Swan","Horseback","Side Stretch"],
-    "Spine Corrector": ["Teaser","Hip Circles","Swan"],
-    "Pedi-pull": ["Chest Expansion","Arm Circles"],
-    "Magic Circle": ["Mat - Hundred","Chin Press"],
-    "Arm Chair": ["Basics","Boxing","Hug"],
-    "Electric chair": ["Pumping","Going Up - Front"],
-    "Small Barrel": ["Arm Series - Circles","Leg Series - Circles"],
-    "Foot Corrector": ["Press Down - Toes on Top","Massage"],
-    "Toe Corrector": ["Seated - External Rotation"],
-    "Neck Stretcher": ["Seated - Flat Back"],
-    "기타": []
-}
-
-DEFAULT_SETTINGS = {
-    "visit_default_net": 0,   # 방문 기본 실수령(원) - 🍒에서 설정
-    "visit_memo": ""          # 메모(선택)
-}
-
-# ==========================
-# Helpers
-# ==========================
-def _site_coerce(v:str)->str:
-    s=str(v).strip()
-    if s in SITES: return s
-    if s in ["플로우","Flow","flow"]: return "F"
-    if s in ["리유","Ryu","ryu"]:     return "R"
-    if s in ["방문","Visit","visit"]: return "V"
-    return "F"
-
-def ensure_df_columns(df: pd.DataFrame, cols: List[str], num_cols: List[str]|None=None, bool_cols: List[str]|None=None) -> pd.DataFrame:
-    num_cols = num_cols or []
-    bool_cols= bool_cols or []
-    for c in cols:
-        if c not in df.columns:
-            if c in num_cols:
-                df[c] = 0
-            elif c in bool_cols:
-                df[c] = False
-            else:
-                df[c] = ""
-    return df
-
-def ensure_files():
-    DATA_DIR.mkdir(exist_ok=True)
-
-    # Settings
-    if not SETTINGS_JSON.exists():
-        SETTINGS_JSON.write_text(json.dumps(DEFAULT_SETTINGS, ensure_ascii=False, indent=2), encoding="utf-8")
-
-    # Members
-    if not MEMBERS_CSV.exists():
-        pd.DataFrame(columns=[
-            "id","이름","연락처","기본지점","등록일","총등록","남은횟수","회원유형",
-            "메모","재등록횟수","최근재등록일","듀엣","듀엣상대"
-        ]).to_csv(MEMBERS_CSV, index=False, encoding="utf-8-sig")
-
-    # Sessions
-    if not SESSIONS_CSV.exists():
-        pd.DataFrame(columns=[
-            "id","날짜","지점","구분","이름","인원","레벨","기구",
-            "동작(리스트)","추가동작","특이사항","숙제","메모",
-            "취소","사유","분","온더하우스","페이(총)","페이(실수령)"
-        ]).to_csv(SESSIONS_CSV, index=False, encoding="utf-8-sig")
-
-    # Schedule
-    if not SCHEDULE_CSV.exists():
-        pd.DataFrame(columns=[
-            "id","날짜","지점","구분","이름","인원","메모","온더하우스","상태"  # 상태: 예약됨/완료/취소됨/No Show
-        ]).to_csv(SCHEDULE_CSV, index=False, encoding="utf-8-sig")
-
-    # EX DB
-    if not EX_DB_JSON.exists():
-        pd.Series(EX_DB_DEFAULT).to_json(EX_DB_JSON, force_ascii=False)
-
-    # Upgrade existing
-    # members
-    mem = pd.read_csv(MEMBERS_CSV, dtype=str, encoding="utf-8-sig").fillna("")
-    mem = ensure_df_columns(mem,
-        ["id","이름","연락처","기본지점","등록일","총등록","남은횟수","회원유형","메모","재등록횟수","최근재등록일","듀엣","듀엣상대"]
-    )
-    mem["기본지점"] = mem["기본지점"].apply(_site_coerce)
-    mem.to_csv(MEMBERS_CSV, index=False, encoding="utf-8-sig")
-
-    # sessions
-    ses = pd.read_csv(SESSIONS_CSV, dtype=str, encoding="utf-8-sig").fillna("")
-    ses = ensure_df_columns(ses,
-        ["id","날짜","지점","구분","이름","인원","레벨","기구","동작(리스트)","추가동작","특이사항","숙제","메모",
-         "취소","사유","분","온더하우스","페이(총)","페이(실수령)"]
-    )
-    ses["지점"] = ses["지점"].apply(_site_coerce)
-    ses.to_csv(SESSIONS_CSV, index=False, encoding="utf-8-sig")
-
-    # schedule
-    sch = pd.read_csv(SCHEDULE_CSV, dtype=str, encoding="utf-8-sig").fillna("")
-    sch = ensure_df_columns(sch,
-        ["id","날짜","지점","구분","이름","인원","메모","온더하우스","상태"]
-    )
-    sch["지점"] = sch["지점"].apply(_site_coerce)
-    sch.to_csv(SCHEDULE_CSV, index=False, encoding="utf-8-sig")
-
-def load_settings() -> dict:
-    try:
-        return json.loads(SETTINGS_JSON.read_text(encoding="utf-8"))
-    except Exception:
-        return DEFAULT_SETTINGS.copy()
-
-def save_settings(d: dict):
-    SETTINGS_JSON.write_text(json.dumps(d, ensure_ascii=False, indent=2), encoding="utf-8")
-
-def load_members() -> pd.DataFrame:
-    return pd.read_csv(MEMBERS_CSV, dtype=str, encoding="utf-8-sig").fillna("")
-
-def save_members(df: pd.DataFrame):
-    df.to_csv(MEMBERS_CSV, index=False, encoding="utf-8-sig")
-
-def load_sessions() -> pd.DataFrame:
-    df = pd.read_csv(SESSIONS_CSV, dtype=str, encoding="utf-8-sig").fillna("")
-    if not df.empty:
-        df["날짜"] = pd.to_datetime(df["날짜"], errors="coerce")
-        for c in ["인원","분","페이(총)","페이(실수령)"]:
-            df[c] = pd.to_numeric(df[c], errors="coerce")
-        df["온더하우스"] = df["온더하우스"].astype(str).str.lower().isin(["true","1","y","yes"])
-        df["취소"]       = df["취소"].astype(str).str.lower().isin(["true","1","y","yes"])
-    return df
-
-def save_sessions(df: pd.DataFrame):
-    x = df.copy()
-    if not x.empty:
-        x["날짜"] = pd.to_datetime(x["날짜"]).dt.strftime("%Y-%m-%d %H:%M:%S")
-    x.to_csv(SESSIONS_CSV, index=False, encoding="utf-8-sig")
-
-def load_schedule() -> pd.DataFrame:
-    df = pd.read_csv(SCHEDULE_CSV, dtype=str, encoding="utf-8-sig").fillna("")
-    if not df.empty:
-        df["날짜"] = pd.to_datetime(df["날짜"], errors="coerce")
-        df["인원"] = pd.to_numeric(df["인원"], errors="coerce")
-        df["온더하우스"] = df["온더하우스"].astype(str).str.lower().isin(["true","1","y","yes"])
-    return df
-
-def save_schedule(df: pd.DataFrame):
-    x = df.copy()
-    if not x.empty:
-        x["날짜"] = pd.to_datetime(x["날짜"]).dt.strftime("%Y-%m-%d %H:%M:%S")
-    x.to_csv(SCHEDULE_CSV, index=False, encoding="utf-8-sig")
-
-def load_ex_db() -> Dict[str, List[str]]:
-    try:
-        raw = pd.read_json(EX_DB_JSON, typ="series")
-        return {k:list(v) for k,v in raw.items()}
-    except Exception:
-        pd.Series(EX_DB_DEFAULT).to_json(EX_DB_JSON, force_ascii=False)
-        return EX_DB_DEFAULT
-
-def save_ex_db(db: Dict[str, List[str]]):
-    pd.Series(db).to_json(EX_DB_JSON, force_ascii=False)
-
-def ensure_id(df: pd.DataFrame) -> str:
-    if df is None or df.empty:
-        return "1"
-    try:
-        return str(int(df["id"].astype(str).astype(int).max()) + 1)
-    except Exception:
-        return str(len(df) + 1)
-
-def big_info(msg: str):
-    st.info(msg)
-
-# -------------------
-# Pay rules
-# -------------------
-def calc_pay(site: str, session_type: str, headcount: int, settings: dict, is_duet: bool=False) -> tuple[float,float]:
-    """
-    returns (gross, net)
-    F(플로우): 35,000, 3.3% 공제
-    R(리유): 개인 30,000 / 3명 40,000 / 2명 30,000 / 1명 25,000 / 듀엣 35,000 (공제없음)
-    V(방문): 🍒 설정의 'visit_default_net'
-    """
-    site = _site_coerce(site)
-    gross = net = 0.0
-    if site == "F":
-        gross = 35000.0
-        net   = round(gross * 0.967, 0)
-    elif site == "R":
-        if session_type == "개인":
-            if is_duet:
-                gross = net = 35000.0
-            else:
-                gross = net = 30000.0
-        else:
-            if headcount == 2:   # 그룹 2명 (듀엣과 다름)
-                gross = net = 30000.0
-            elif headcount == 3:
-                gross = net = 40000.0
-            elif headcount == 1:
-                gross = net = 25000.0
-            else:
-                gross = net = 30000.0
-    else:  # V
-        net = float(settings.get("visit_default_net", 0) or 0)
-        gross = net
-    return gross, net
-
-# -------------------
-# ICS Export
-# -------------------
-def _fmt_ics_dt(dt: datetime) -> str:
-    return dt.strftime("%Y%m%dT%H%M%S")
-
-def build_ics_from_df(df: pd.DataFrame, default_minutes: int = 50) -> bytes:
-    lines = [
-        "BEGIN:VCALENDAR",
-        "VERSION:2.0",
-        "PRODID:-//PilatesApp//Schedule Export//KR",
-        "CALSCALE:GREGORIAN",
-    ]
-    now_utc = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
-
-    for _, r in df.iterrows():
-        try:
-            start = pd.to_datetime(r["날짜"])
-        except Exception:
-            continue
-        try:
-            minutes = int(float(r.get("분", default_minutes) or default_minutes))
-        except Exception:
-            minutes = default_minutes
-        end = start + timedelta(minutes=minutes)
-
-        title = r["이름"] if str(r.get("이름","")).strip() else "그룹"
-        loc   = SITE_KR.get(_site_coerce(str(r.get("지점",""))), "")
-        memo  = str(r.get("메모","") or "")
-
-        lines += [
-            "BEGIN:VEVENT",
-            f"UID:{r.get('id','')}@pilatesapp",
-            f"DTSTAMP:{now_utc}",
-            f"DTSTART:{_fmt_ics_dt(start)}",
-            f"DTEND:{_fmt_ics_dt(end)}",
-            f"SUMMARY:{title}",
-            f"LOCATION:{loc}",
-            f"DESCRIPTION:{memo.replace('\n','\\n')}",
-            "END:VEVENT"
-        ]
-
-    lines.append("END:VCALENDAR")
-    return ("\r\n".join(lines)).encode("utf-8")
-
-# ==========================
-# Init
-# ==========================
-ensure_files()
-settings = load_settings()
-members  = load_members()
-sessions = load_sessions()
-schedule = load_schedule()
-ex_db    = load_ex_db()
-
-# ==========================
-# Sidebar Navigation (no bullets, button style, active text only)
-# ==========================
-if "page" not in st.session_state:
-    st.session_state["page"] = "schedule"
-
-st.markdown("""
-<style>
-div[data-testid="stSidebar"] button {
-  background: transparent !important;
-  border: none !important;
-  box-shadow: none !important;
-  text-align: left !important;
-  padding: 6px 4px !important;
-  font-size: 18px !important;
-}
-.nav-active { font-weight: 800; color: #ff4b4b; padding: 6px 4px; }
-</style>
-""", unsafe_allow_html=True)
-
-def nav_item(label: str, key: str, emoji_only=False):
-    show = label if not emoji_only else label.split()[0]
-    if st.session_state["page"] == key:
-        st.sidebar.markdown(f"<div class='nav-active'>{show}</div>", unsafe_allow_html=True)
-    else:
-        if st.sidebar.button(show, key=f"nav_{key}"):
-            st.session_state["page"] = key
-
-st.sidebar.markdown("### 메뉴")
-nav_item("📅 스케줄", "schedule")
-nav_item("✍️ 세션",   "session")
-nav_item("👥 멤버",    "member")
-nav_item("📋 리포트", "report")
-nav_item("🍒",       "cherry", emoji_only=True)
-st.sidebar.markdown("---")
-
-# Manual backup/restore in sidebar bottom
-st.sidebar.markdown("#### 🗄️ 백업/복원")
-def make_zip_bytes() -> bytes:
-    buf = io.BytesIO()
-    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
-        for p in [MEMBERS_CSV, SESSIONS_CSV, SCHEDULE_CSV, EX_DB_JSON, SETTINGS_JSON]:
-            if p.exists():
-                z.writestr(p.name, p.read_bytes())
-    buf.seek(0)
-    return buf.read()
-
-st.sidebar.download_button("⬇️ ZIP 백업", data=make_zip_bytes(),
-                           file_name="pilates_backup.zip", mime="application/zip",
-                           use_container_width=True, key="dl_backup")
-
-up = st.sidebar.file_uploader("⬆️ ZIP 복원", type=["zip"], key="ul_restore", accept_multiple_files=False)
-if up is not None:
-    try:
-        with zipfile.ZipFile(up, "r") as z:
-            for name in z.namelist():
-                if name in {MEMBERS_CSV.name, SESSIONS_CSV.name, EX_DB_JSON.name, SETTINGS_JSON.name, SCHEDULE_CSV.name}:
-                    (DATA_DIR / name).write_bytes(z.read(name))
-        st.sidebar.success("복원 완료! 페이지를 다시 실행하면 적용됩니다.")
-    except Exception as e:
-        st.sidebar.error(f"복원 실패: {e}")
-
-# ==========================
-# Schedule Page
-# ==========================
-if st.session_state["page"] == "schedule":
-    st.subheader("📅 스케줄")
-
-    # Range controls
-    cols = st.columns([1,1,2,1])
-    with cols[0]:
-        view_mode = st.radio("보기", ["일","주","월"], horizontal=True, index=1, label_visibility="collapsed", key="sch_view")
-    with cols[1]:
-        base = st.date_input("기준", value=date.today(), label_visibility="collapsed", key="sch_base")
-    base_dt = datetime.combine(base, time.min)
-    if view_mode=="일":
-        start, end = base_dt, base_dt + timedelta(days=1)
-    elif view_mode=="주":
-        start = base_dt - timedelta(days=base_dt.weekday())
-        end   = start + timedelta(days=7)
-    else:
-        start = base_dt.replace(day=1)
-        end   = (start + pd.offsets.MonthEnd(1)).to_pydatetime() + timedelta(days=1)
-
-    # 빠른 잔여횟수 뱃지
-    def remain_badge(name: str) -> str:
-        if not name or name not in set(members["이름"]): return ""
-        try:
-            left = int(float(members.loc[members["이름"]==name,"남은횟수"].iloc[0] or 0))
-        except Exception:
-            left = 0
-        if left <= 0:  return " <span style='color:#d00;font-weight:700'>(0회)</span>"
-        if left == 1:  return " <span style='color:#d00;font-weight:700'>(❗1회)</span>"
-        if left == 2:  return " <span style='color:#d98200;font-weight:700'>(⚠️2회)</span>"
-        return ""
-
-    # 예약 추가
-    st.markdown("#### ✨ 예약 추가")
-    c = st.columns([1,1,1,1,2])
-    with c[0]:
-        sdate = st.date_input("날짜", value=base, key="s_new_date")
-    with c[1]:
-        stime = st.time_input("시간", value=datetime.now().time().replace(second=0, microsecond=0), key="s_new_time")
-    with c[2]:
-        stype = st.radio("구분", ["개인","그룹"], horizontal=True, key="s_new_type")
-    with c[3]:
-        onth = st.checkbox("✨ On the house", key="s_new_onth")
-    with c[4]:
-        memo = st.text_input("메모(선택)", key="s_new_memo")
-
-    if stype=="개인":
-        cc = st.columns([2,1])
-        with cc[0]:
-            mname = st.selectbox("멤버", members["이름"].tolist() if not members.empty else [], key="s_new_member")
-        if mname and (mname in members["이름"].values):
-            default_site = members.loc[members["이름"]==mname,"기본지점"].iloc[0] or "F"
-        else:
-            default_site = "F"
-        with cc[1]:
-            site = st.selectbox("지점(F/R/V)", SITES, index=SITES.index(default_site), key="s_new_site_personal")
-        headcount = 1
-    else:
-        mname = ""
-        site = st.selectbox("지점(F/R/V)", SITES, index=0, key="s_new_site_group")
-        headcount = st.number_input("인원(그룹)", 1, 20, 2, 1, key="s_new_headcount")
-
-    if st.button("예약 추가", use_container_width=True, key="s_new_add_btn"):
-        when = datetime.combine(sdate, stime)
-        row = pd.DataFrame([{
-            "id": ensure_id(schedule),
-            "날짜": when,
-            "지점": site,
-            "구분": stype,
-            "이름": mname if stype=="개인" else "",
-            "인원": int(headcount),
-            "메모": memo,
-            "온더하우스": bool(onth),
-            "상태": "예약됨"
-        }])
-        schedule = pd.concat([schedule, row], ignore_index=True)
-        save_schedule(schedule)
-        st.success("예약이 추가되었습니다.")
-
-    # 기간 뷰
-    st.markdown("#### 📋 일정")
-    view = schedule[(schedule["날짜"]>=start) & (schedule["날짜"]<end)].copy().sort_values("날짜")
-
-    def last_personal_summary(member_name: str):
-        past = sessions[(sessions["이름"]==member_name)].copy()
-        if past.empty:
-            return "—"
-        past = past.sort_values("날짜", ascending=False)
-        last = past.iloc[0]
-        if str(last.get("사유","")).strip().lower()=="no show" or str(last.get("특이사항","")).strip().lower()=="no show":
-            return "🫥"
-        if last.get("동작(리스트)",""):
-            return last["동작(리스트)"]
-        if last.get("추가동작",""):
-            return last["추가동작"]
-        lvl = str(last.get("레벨","") or "")
-        eqp = str(last.get("기구","") or "")
-        if lvl or eqp:
-            return " · ".join([x for x in [lvl, eqp] if x])
-        return "—"
-
-    if view.empty:
-        big_info("해당 기간에 일정이 없습니다.")
-    else:
-        for _, r in view.iterrows():
-            dt = pd.to_datetime(r["날짜"]).strftime("%m/%d %a %H:%M")
-            chip = f"<span style='background:{SITE_COLOR.get(r['지점'],'#eee')};padding:2px 8px;border-radius:8px;font-size:12px'>{SITE_LABEL.get(r['지점'],r['지점'])}</span>"
-            name_html = f"<b style='font-size:16px'>{r['이름'] if r['이름'] else '(그룹)'}</b>"
-            free = " · ✨" if r.get("온더하우스", False) else ""
-            rm = remain_badge(r["이름"]) if r["구분"]=="개인" else ""
-            title = f"{dt} · {chip} · {name_html}{free}{rm}"
-
-            status = str(r.get("상태","예약됨"))
-            if status == "취소됨":
-                badge = '<span style="background:#ccc;color:#666;padding:2px 6px;border-radius:6px;">취소됨</span>'
-                title = f"<s>{title}</s>"
-            elif status == "No Show":
-                badge = '<span style="background:#ffe3e3;color:#d00;padding:2px 6px;border-radius:6px;">No Show</span>'
-            elif status == "완료":
-                badge = '<span style="background:#e0ffe7;color:#11772a;padding:2px 6px;border-radius:6px;">완료</span>'
-            else:
-                badge = '<span style="background:#e8f0ff;color:#1849a9;padding:2px 6px;border-radius:6px;">예약됨</span>'
-
-            if r["구분"]=="개인" and r["이름"]:
-                sub = f"지난 운동: {last_personal_summary(r['이름'])}"
-            else:
-                sub = f"그룹 정보: 인원 {int(r.get('인원',0) or 0)}명"
-            if r.get("메모"):
-                sub += f" · 메모: {r['메모']}"
-
-            colA,colB,colC,colD = st.columns([3,1,1,1])
-            with colA:
-                st.markdown(f"{title} {badge}<br><span style='color:#888'>{sub}</span>", unsafe_allow_html=True)
-
-            rid = r["id"]
-            # 출석
-            with colB:
-                if st.button("출석", key=f"sch_att_{rid}"):
-                    # 듀엣 여부 (개인만)
-                    is_duet = False
-                    if r["구분"]=="개인" and r["이름"] in set(members["이름"]):
-                        try:
-                            is_duet = str(members.loc[members["이름"]==r["이름"], "듀엣"].iloc[0]).lower() in ["true","1","y","yes"]
-                        except Exception:
-                            pass
-                    gross, net = calc_pay(r["지점"], r["구분"], int(r["인원"] or 1), settings, is_duet=is_duet)
-                    if r.get("온더하우스", False):
-                        gross = net = 0.0
-                    sess = pd.DataFrame([{
-                        "id": ensure_id(sessions),
-                        "날짜": r["날짜"],
-                        "지점": r["지점"],
-                        "구분": r["구분"],
-                        "이름": r["이름"],
-                        "인원": int(r["인원"] or 1),
-                        "레벨": "",
-                        "기구": "",
-                        "동작(리스트)": "",
-                        "추가동작": "",
-                        "특이사항": "",
-                        "숙제": "",
-                        "메모": r.get("메모",""),
-                        "취소": False,
-                        "사유": "",
-                        "분": 50,
-                        "온더하우스": bool(r.get("온더하우스", False)),
-                        "페이(총)": float(gross),
-                        "페이(실수령)": float(net)
-                    }])
-                    sessions = pd.concat([sessions, sess], ignore_index=True)
-                    save_sessions(sessions)
-                    # 차감 (개인 + 무료 아님)
-                    if (r["구분"]=="개인") and r["이름"] and (r["이름"] in set(members["이름"])) and (not r.get("온더하우스", False)):
-                        idx = members.index[members["이름"]==r["이름"]][0]
-                        left = max(0, int(float(members.loc[idx,"남은횟수"] or 0)) - 1)
-                        members.loc[idx,"남은횟수"] = str(left)
-                        save_members(members)
-                    schedule.loc[schedule["id"]==rid, "상태"] = "완료"
-                    save_schedule(schedule)
-                    st.experimental_rerun()
-            # 취소
-            with colC:
-                if st.button("취소", key=f"sch_can_{rid}"):
-                    schedule.loc[schedule["id"]==rid, "상태"] = "취소됨"
-                    save_schedule(schedule)
-                    st.experimental_rerun()
-            # No Show
-            with colD:
-                if st.button("No Show", key=f"sch_ns_{rid}"):
-                    # 세션은 만들지 않음. 차감/페이는 🍒에서 합산(스케줄 NoShow 반영)
-                    if (r["구분"]=="개인") and r["이름"] and (r["이름"] in set(members["이름"])) and (not r.get("온더하우스", False)):
-                        idx = members.index[members["이름"]==r["이름"]][0]
-                        left = max(0, int(float(members.loc[idx,"남은횟수"] or 0)) - 1)
-                        members.loc[idx,"남은횟수"] = str(left)
-                        save_members(members)
-                    schedule.loc[schedule["id"]==rid, "상태"] = "No Show"
-                    save_schedule(schedule)
-                    st.experimental_rerun()
-
-    # ICS export
-    st.divider()
-    st.subheader("📤 iCal(.ics) 내보내기")
-    exclude_cancel = st.checkbox("취소된 일정 제외", value=True, key="ics_excl")
-    export_df = view.copy()
-    if not export_df.empty:
-        if "상태" in export_df.columns and exclude_cancel:
-            export_df = export_df[export_df["상태"]!="취소됨"]
-    if export_df.empty:
-        st.caption("내보낼 일정이 없습니다.")
-    else:
-        ics_bytes = build_ics_from_df(export_df)
-        filename = f"schedule_{view_mode}_{base.strftime('%Y%m%d')}.ics"
-        st.download_button("⬇️ iCal 파일 다운로드", data=ics_bytes, file_name=filename, mime="text/calendar", use_container_width=True, key="ics_btn")
-
-
-# ==========================
-# Page config & favicon
-# ==========================
-DATA_DIR = Path(".")
-FAVICON = DATA_DIR / "icon.png"
-if ICON.exists():
-    st.set_page_config(page_title="Pilates Manager", page_icon=str(ICON), layout="wide")
-else:
-    st.set_page_config(page_title="Pilates Manager", page_icon="✨", layout="wide")
-
-# ==========================
-# Constants & paths
-# ==========================
-MEMBERS_CSV  = DATA_DIR / "members.csv"
-SESSIONS_CSV = DATA_DIR / "sessions.csv"
-SCHEDULE_CSV = DATA_DIR / "schedule.csv"
-EX_DB_JSON   = DATA_DIR / "exercise_db.json"
-SETTINGS_JSON= DATA_DIR / "settings.json"   # 방문 기본 실수령 등
-
-CHERRY_PIN = st.secrets.get("CHERRY_PW", "2974")
-
-SITES      = ["F", "R", "V"]  # Flow / Ryu / Visit
-SITE_KR    = {"F": "플로우", "R": "리유", "V": "방문"}
-SITE_COLOR = {"F": "#d9f0ff", "R": "#eeeeee", "V": "#e9fbe9"}
-SITE_LABEL = {"F":"F", "R":"R", "V":"V"}
-
-# ==========================
-# Defaults
-# ==========================
-EX_DB_DEFAULT: Dict[str, List[str]] = {
-    # 최소 예시(원하는 대로 exercise_db.json로 교체 가능)
-    "Mat": ["The Hundred","Roll Up","Roll Over"],
-    "Reformer": ["Footwork - Toes","Hundred","Overhead"],
-    "Cadillac": ["Breathing","Spread Eagle","Pull Ups"],
-    "Wunda chair": ["Footwork - Toes","Push Down","Pull Up"],
-    "Ladder Barrel": ["Swan","Horseback","Side Stretch"],
-    "Spine Corrector": ["Teaser","Hip Circles","Swan"],
-    "Pedi-pull": ["Chest Expansion","Arm Circles"],
-    "Magic Circle": ["Mat - Hundred","Chin Press"],
-    "Arm Chair": ["Basics","Boxing","Hug"],
-    "Electric chair": ["Pumping","Going Up - Front"],
-    "Small Barrel": ["Arm Series - Circles","Leg Series - Circles"],
-    "Foot Corrector": ["Press Down - Toes on Top","Massage"],
-    "Toe Corrector": ["Seated - External Rotation"],
-    "Neck Stretcher": ["Seated - Flat Back"],
-    "기타": []
-}
-
-DEFAULT_SETTINGS = {
-    "visit_default_net": 0,   # 방문 기본 실수령(원) - 🍒에서 설정
-    "visit_memo": ""          # 메모(선택)
-}
-
-# ==========================
-# Helpers
-# ==========================
-def _site_coerce(v:str)->str:
-    s=str(v).strip()
-    if s in SITES: return s
-    if s in ["플로우","Flow","flow"]: return "F"
-    if s in ["리유","Ryu","ryu"]:     return "R"
-    if s in ["방문","Visit","visit"]: return "V"
-    return "F"
-
-def ensure_df_columns(df: pd.DataFrame, cols: List[str], num_cols: List[str]|None=None, bool_cols: List[str]|None=None) -> pd.DataFrame:
-    num_cols = num_cols or []
-    bool_cols= bool_cols or []
-    for c in cols:
-        if c not in df.columns:
-            if c in num_cols:
-                df[c] = 0
-            elif c in bool_cols:
-                df[c] = False
-            else:
-                df[c] = ""
-    return df
-
-def ensure_files():
-    DATA_DIR.mkdir(exist_ok=True)
-
-    # Settings
-    if not SETTINGS_JSON.exists():
-        SETTINGS_JSON.write_text(json.dumps(DEFAULT_SETTINGS, ensure_ascii=False, indent=2), encoding="utf-8")
-
-    # Members
-    if not MEMBERS_CSV.exists():
-        pd.DataFrame(columns=[
-            "id","이름","연락처","기본지점","등록일","총등록","남은횟수","회원유형",
-            "메모","재등록횟수","최근재등록일","듀엣","듀엣상대"
-        ]).to_csv(MEMBERS_CSV, index=False, encoding="utf-8-sig")
-
-    # Sessions
-    if not SESSIONS_CSV.exists():
-        pd.DataFrame(columns=[
-            "id","날짜","지점","구분","이름","인원","레벨","기구",
-            "동작(리스트)","추가동작","특이사항","숙제","메모",
-            "취소","사유","분","온더하우스","페이(총)","페이(실수령)"
-        ]).to_csv(SESSIONS_CSV, index=False, encoding="utf-8-sig")
-
-    # Schedule
-    if not SCHEDULE_CSV.exists():
-        pd.DataFrame(columns=[
-            "id","날짜","지점","구분","이름","인원","메모","온더하우스","상태"  # 상태: 예약됨/완료/취소됨/No Show
-        ]).to_csv(SCHEDULE_CSV, index=False, encoding="utf-8-sig")
-
-    # EX DB
-    if not EX_DB_JSON.exists():
-        pd.Series(EX_DB_DEFAULT).to_json(EX_DB_JSON, force_ascii=False)
-
-    # Upgrade existing
-    # members
-    mem = pd.read_csv(MEMBERS_CSV, dtype=str, encoding="utf-8-sig").fillna("")
-    mem = ensure_df_columns(mem,
-        ["id","이름","연락처","기본지점","등록일","총등록","남은횟수","회원유형","메모","재등록횟수","최근재등록일","듀엣","듀엣상대"]
-    )
-    mem["기본지점"] = mem["기본지점"].apply(_site_coerce)
-    mem.to_csv(MEMBERS_CSV, index=False, encoding="utf-8-sig")
-
-    # sessions
-    ses = pd.read_csv(SESSIONS_CSV, dtype=str, encoding="utf-8-sig").fillna("")
-    ses = ensure_df_columns(ses,
-        ["id","날짜","지점","구분","이름","인원","레벨","기구","동작(리스트)","추가동작","특이사항","숙제","메모",
-         "취소","사유","분","온더하우스","페이(총)","페이(실수령)"]
-    )
-    ses["지점"] = ses["지점"].apply(_site_coerce)
-    ses.to_csv(SESSIONS_CSV, index=False, encoding="utf-8-sig")
-
-    # schedule
-    sch = pd.read_csv(SCHEDULE_CSV, dtype=str, encoding="utf-8-sig").fillna("")
-    sch = ensure_df_columns(sch,
-        ["id","날짜","지점","구분","이름","인원","메모","온더하우스","상태"]
-    )
-    sch["지점"] = sch["지점"].apply(_site_coerce)
-    sch.to_csv(SCHEDULE_CSV, index=False, encoding="utf-8-sig")
-
-def load_settings() -> dict:
-    try:
-        return json.loads(SETTINGS_JSON.read_text(encoding="utf-8"))
-    except Exception:
-        return DEFAULT_SETTINGS.copy()
-
-def save_settings(d: dict):
-    SETTINGS_JSON.write_text(json.dumps(d, ensure_ascii=False, indent=2), encoding="utf-8")
-
-def load_members() -> pd.DataFrame:
-    return pd.read_csv(MEMBERS_CSV, dtype=str, encoding="utf-8-sig").fillna("")
-
-def save_members(df: pd.DataFrame):
-    df.to_csv(MEMBERS_CSV, index=False, encoding="utf-8-sig")
-
-def load_sessions() -> pd.DataFrame:
-    df = pd.read_csv(SESSIONS_CSV, dtype=str, encoding="utf-8-sig").fillna("")
-    if not df.empty:
-        df["날짜"] = pd.to_datetime(df["날짜"], errors="coerce")
-        for c in ["인원","분","페이(총)","페이(실수령)"]:
-            df[c] = pd.to_numeric(df[c], errors="coerce")
-        df["온더하우스"] = df["온더하우스"].astype(str).str.lower().isin(["true","1","y","yes"])
-        df["취소"]       = df["취소"].astype(str).str.lower().isin(["true","1","y","yes"])
-    return df
-
-def save_sessions(df: pd.DataFrame):
-    x = df.copy()
-    if not x.empty:
-        x["날짜"] = pd.to_datetime(x["날짜"]).dt.strftime("%Y-%m-%d %H:%M:%S")
-    x.to_csv(SESSIONS_CSV, index=False, encoding="utf-8-sig")
-
-def load_schedule() -> pd.DataFrame:
-    df = pd.read_csv(SCHEDULE_CSV, dtype=str, encoding="utf-8-sig").fillna("")
-    if not df.empty:
-        df["날짜"] = pd.to_datetime(df["날짜"], errors="coerce")
-        df["인원"] = pd.to_numeric(df["인원"], errors="coerce")
-        df["온더하우스"] = df["온더하우스"].astype(str).str.lower().isin(["true","1","y","yes"])
-    return df
-
-def save_schedule(df: pd.DataFrame):
-    x = df.copy()
-    if not x.empty:
-        x["날짜"] = pd.to_datetime(x["날짜"]).dt.strftime("%Y-%m-%d %H:%M:%S")
-    x.to_csv(SCHEDULE_CSV, index=False, encoding="utf-8-sig")
-
-def load_ex_db() -> Dict[str, List[str]]:
-    try:
-        raw = pd.read_json(EX_DB_JSON, typ="series")
-        return {k:list(v) for k,v in raw.items()}
-    except Exception:
-        pd.Series(EX_DB_DEFAULT).to_json(EX_DB_JSON, force_ascii=False)
-        return EX_DB_DEFAULT
-
-def save_ex_db(db: Dict[str, List[str]]):
-    pd.Series(db).to_json(EX_DB_JSON, force_ascii=False)
-
-def ensure_id(df: pd.DataFrame) -> str:
-    if df is None or df.empty:
-        return "1"
-    try:
-        return str(int(df["id"].astype(str).astype(int).max()) + 1)
-    except Exception:
-        return str(len(df) + 1)
-
-def big_info(msg: str):
-    st.info(msg)
-
-# -------------------
-# Pay rules
-# -------------------
-def calc_pay(site: str, session_type: str, headcount: int, settings: dict, is_duet: bool=False) -> tuple[float,float]:
-    """
-    returns (gross, net)
-    F(플로우): 35,000, 3.3% 공제
-    R(리유): 개인 30,000 / 3명 40,000 / 2명 30,000 / 1명 25,000 / 듀엣 35,000 (공제없음)
-    V(방문): 🍒 설정의 'visit_default_net'
-    """
-    site = _site_coerce(site)
-    gross = net = 0.0
-    if site == "F":
-        gross = 35000.0
-        net   = round(gross * 0.967, 0)
-    elif site == "R":
-        if session_type == "개인":
-            if is_duet:
-                gross = net = 35000.0
-            else:
-                gross = net = 30000.0
-        else:
-            if headcount == 2:   # 그룹 2명 (듀엣과 다름)
-                gross = net = 30000.0
-            elif headcount == 3:
-                gross = net = 40000.0
-            elif headcount == 1:
-                gross = net = 25000.0
-            else:
-                gross = net = 30000.0
-    else:  # V
-        net = float(settings.get("visit_default_net", 0) or 0)
-        gross = net
-    return gross, net
-
-# -------------------
-# ICS Export
-# -------------------
-def _fmt_ics_dt(dt: datetime) -> str:
-    return dt.strftime("%Y%m%dT%H%M%S")
-
-def build_ics_from_df(df: pd.DataFrame, default_minutes: int = 50) -> bytes:
-    lines = [
-        "BEGIN:VCALENDAR",
-        "VERSION:2.0",
-        "PRODID:-//PilatesApp//Schedule Export//KR",
-        "CALSCALE:GREGORIAN",
-    ]
-    now_utc = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
-
-    for _, r in df.iterrows():
-        try:
-            start = pd.to_datetime(r["날짜"])
-        except Exception:
-            continue
-        try:
-            minutes = int(float(r.get("분", default_minutes) or default_minutes))
-        except Exception:
-            minutes = default_minutes
-        end = start + timedelta(minutes=minutes)
-
-        title = r["이름"] if str(r.get("이름","")).strip() else "그룹"
-        loc   = SITE_KR.get(_site_coerce(str(r.get("지점",""))), "")
-        memo  = str(r.get("메모","") or "")
-
-        lines += [
-            "BEGIN:VEVENT",
-            f"UID:{r.get('id','')}@pilatesapp",
-            f"DTSTAMP:{now_utc}",
-            f"DTSTART:{_fmt_ics_dt(start)}",
-            f"DTEND:{_fmt_ics_dt(end)}",
-            f"SUMMARY:{title}",
-            f"LOCATION:{loc}",
-            f"DESCRIPTION:{memo.replace('\\n','\\\\n')}",
-            "END:VEVENT"
-        ]
-
-    lines.append("END:VCALENDAR")
-    return ("\r\n".join(lines)).encode("utf-8")
-
-# ==========================
-# Init
-# ==========================
-ensure_files()
-settings = load_settings()
-members  = load_members()
-sessions = load_sessions()
-schedule = load_schedule()
-ex_db    = load_ex_db()
-
-# ==========================
-# Sidebar Navigation (no bullets, button style, active text only)
-# ==========================
-if "page" not in st.session_state:
-    st.session_state["page"] = "schedule"
-
-st.markdown("""
-<style>
-div[data-testid="stSidebar"] button {
-  background: transparent !important;
-  border: none !important;
-  box-shadow: none !important;
-  text-align: left !important;
-  padding: 6px 4px !important;
-  font-size: 18px !important;
-}
-.nav-active { font-weight: 800; color: #ff4b4b; padding: 6px 4px; }
-</style>
-""", unsafe_allow_html=True)
-
-def nav_item(label: str, key: str, emoji_only=False):
-    show = label if not emoji_only else label.split()[0]
-    if st.session_state["page"] == key:
-        st.sidebar.markdown(f"<div class='nav-active'>{show}</div>", unsafe_allow_html=True)
-    else:
-        if st.sidebar.button(show, key=f"nav_{key}"):
-            st.session_state["page"] = key
-
-st.sidebar.markdown("### 메뉴")
-nav_item("📅 스케줄", "schedule")
-nav_item("✍️ 세션",   "session")
-nav_item("👥 멤버",    "member")
-nav_item("📋 리포트", "report")
-nav_item("🍒",       "cherry", emoji_only=True)
-st.sidebar.markdown("---")
-
-# Manual backup/restore in sidebar bottom
-st.sidebar.markdown("#### 🗄️ 백업/복원")
-def make_zip_bytes() -> bytes:
-    buf = io.BytesIO()
-    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
-        for p in [MEMBERS_CSV, SESSIONS_CSV, SCHEDULE_CSV, EX_DB_JSON, SETTINGS_JSON]:
-            if p.exists():
-                z.writestr(p.name, p.read_bytes())
-    buf.seek(0)
-    return buf.read()
-
-st.sidebar.download_button("⬇️ ZIP 백업", data=make_zip_bytes(),
-                           file_name="pilates_backup.zip", mime="application/zip",
-                           use_container_width=True, key="dl_backup")
-
-up = st.sidebar.file_uploader("⬆️ ZIP 복원", type=["zip"], key="ul_restore", accept_multiple_files=False)
-if up is not None:
-    try:
-        with zipfile.ZipFile(up, "r") as z:
-            for name in z.namelist():
-                if name in {MEMBERS_CSV.name, SESSIONS_CSV.name, EX_DB_JSON.name, SETTINGS_JSON.name, SCHEDULE_CSV.name}:
-                    (DATA_DIR / name).write_bytes(z.read(name))
-        st.sidebar.success("복원 완료! 페이지를 다시 실행하면 적용됩니다.")
-    except Exception as e:
-        st.sidebar.error(f"복원 실패: {e}")
-
-# ==========================
-# Schedule Page
-# ==========================
-if st.session_state["page"] == "schedule":
-    st.subheader("📅 스케줄")
-
-    # Range controls
-    cols = st.columns([1,1,2,1])
-    with cols[0]:
-        view_mode = st.radio("보기", ["일","주","월"], horizontal=True, index=1, label_visibility="collapsed", key="sch_view")
-    with cols[1]:
-        base = st.date_input("기준", value=date.today(), label_visibility="collapsed", key="sch_base")
-    base_dt = datetime.combine(base, time.min)
-    if view_mode=="일":
-        start, end = base_dt, base_dt + timedelta(days=1)
-    elif view_mode=="주":
-        start = base_dt - timedelta(days=base_dt.weekday())
-        end   = start + timedelta(days=7)
-    else:
-        start = base_dt.replace(day=1)
-        end   = (start + pd.offsets.MonthEnd(1)).to_pydatetime() + timedelta(days=1)
-
-    # 빠른 잔여횟수 뱃지
-    def remain_badge(name: str) -> str:
-        if not name or name not in set(members["이름"]): return ""
-        try:
-            left = int(float(members.loc[members["이름"]==name,"남은횟수"].iloc[0] or 0))
-        except Exception:
-            left = 0
-        if left <= 0:  return " <span style='color:#d00;font-weight:700'>(0회)</span>"
-        if left == 1:  return " <span style='color:#d00;font-weight:700'>(❗1회)</span>"
-        if left == 2:  return " <span style='color:#d98200;font-weight:700'>(⚠️2회)</span>"
-        return ""
-
-    # 예약 추가
-    st.markdown("#### ✨ 예약 추가")
-    c = st.columns([1,1,1,1,2])
-    with c[0]:
-        sdate = st.date_input("날짜", value=base, key="s_new_date")
-    with c[1]:
-        stime = st.time_input("시간", value=datetime.now().time().replace(second=0, microsecond=0), key="s_new_time")
-    with c[2]:
-        stype = st.radio("구분", ["개인","그룹"], horizontal=True, key="s_new_type")
-    with c[3]:
-        onth = st.checkbox("✨ On the house", key="s_new_onth")
-    with c[4]:
-        memo = st.text_input("메모(선택)", key="s_new_memo")
-
-    if stype=="개인":
-        cc = st.columns([2,1])
-        with cc[0]:
-            mname = st.selectbox("멤버", members["이름"].tolist() if not members.empty else [], key="s_new_member")
-        if mname and (mname in members["이름"].values):
-            default_site = members.loc[members["이름"]==mname,"기본지점"].iloc[0] or "F"
-        else:
-            default_site = "F"
-        with cc[1]:
-            site = st.selectbox("지점(F/R/V)", SITES, index=SITES.index(default_site), key="s_new_site_personal")
-        headcount = 1
-    else:
-        mname = ""
-        site = st.selectbox("지점(F/R/V)", SITES, index=0, key="s_new_site_group")
-        headcount = st.number_input("인원(그룹)", 1, 20, 2, 1, key="s_new_headcount")
-
-    if st.button("예약 추가", use_container_width=True, key="s_new_add_btn"):
-        when = datetime.combine(sdate, stime)
-        row = pd.DataFrame([{
-            "id": ensure_id(schedule),
-            "날짜": when,
-            "지점": site,
-            "구분": stype,
-            "이름": mname if stype=="개인" else "",
-            "인원": int(headcount),
-            "메모": memo,
-            "온더하우스": bool(onth),
-            "상태": "예약됨"
-        }])
-        schedule = pd.concat([schedule, row], ignore_index=True)
-        save_schedule(schedule)
-        st.success("예약이 추가되었습니다.")
-
-    # 기간 뷰
-    st.markdown("#### 📋 일정")
-    view = schedule[(schedule["날짜"]>=start) & (schedule["날짜"]<end)].copy().sort_values("날짜")
-
-    def last_personal_summary(member_name: str):
-        past = sessions[(sessions["이름"]==member_name)].copy()
-        if past.empty:
-            return "—"
-        past = past.sort_values("날짜", ascending=False)
-        last = past.iloc[0]
-        if str(last.get("사유","")).strip().lower()=="no show" or str(last.get("특이사항","")).strip().lower()=="no show":
-            return "🫥"
-        if last.get("동작(리스트)",""):
-            return last["동작(리스트)"]
-        if last.get("추가동작",""):
-            return last["추가동작"]
-        lvl = str(last.get("레벨","") or "")
-        eqp = str(last.get("기구","") or "")
-        if lvl or eqp:
-            return " · ".join([x for x in [lvl, eqp] if x])
-        return "—"
-
-    if view.empty:
-        big_info("해당 기간에 일정이 없습니다.")
-    else:
-        for _, r in view.iterrows():
-            dt = pd.to_datetime(r["날짜"]).strftime("%m/%d %a %H:%M")
-            chip = f"<span style='background:{SITE_COLOR.get(r['지점'],'#eee')};padding:2px 8px;border-radius:8px;font-size:12px'>{SITE_LABEL.get(r['지점'],r['지점'])}</span>"
-            name_html = f"<b style='font-size:16px'>{r['이름'] if r['이름'] else '(그룹)'}</b>"
-            free = " · ✨" if r.get("온더하우스", False) else ""
-            rm = remain_badge(r["이름"]) if r["구분"]=="개인" else ""
-            title = f"{dt} · {chip} · {name_html}{free}{rm}"
-
-            status = str(r.get("상태","예약됨"))
-            if status == "취소됨":
-                badge = '<span style="background:#ccc;color:#666;padding:2px 6px;border-radius:6px;">취소됨</span>'
-                title = f"<s>{title}</s>"
-            elif status == "No Show":
-                badge = '<span style="background:#ffe3e3;color:#d00;padding:2px 6px;border-radius:6px;">No Show</span>'
-            elif status == "완료":
-                badge = '<span style="background:#e0ffe7;color:#11772a;padding:2px 6px;border-radius:6px;">완료</span>'
-            else:
-                badge = '<span style="background:#e8f0ff;color:#1849a9;padding:2px 6px;border-radius:6px;">예약됨</span>'
-
-            if r["구분"]=="개인" and r["이름"]:
-                sub = f"지난 운동: {last_personal_summary(r['이름'])}"
-            else:
-                sub = f"그룹 정보: 인원 {int(r.get('인원',0) or 0)}명"
-            if r.get("메모"):
-                sub += f" · 메모: {r['메모']}"
-
-            colA,colB,colC,colD = st.columns([3,1,1,1])
-            with colA:
-                st.markdown(f"{title} {badge}<br><span style='color:#888'>{sub}</span>", unsafe_allow_html=True)
-
-            rid = r["id"]
-            # 출석
-            with colB:
-                if st.button("출석", key=f"sch_att_{rid}"):
-                    # 듀엣 여부 (개인만)
-                    is_duet = False
-                    if r["구분"]=="개인" and r["이름"] in set(members["이름"]):
-                        try:
-                            is_duet = str(members.loc[members["이름"]==r["이름"], "듀엣"].iloc[0]).lower() in ["true","1","y","yes"]
-                        except Exception:
-                            pass
-                    gross, net = calc_pay(r["지점"], r["구분"], int(r["인원"] or 1), settings, is_duet=is_duet)
-                    if r.get("온더하우스", False):
-                        gross = net = 0.0
-                    sess = pd.DataFrame([{
-                        "id": ensure_id(sessions),
-                        "날짜": r["날짜"],
-                        "지점": r["지점"],
-                        "구분": r["구분"],
-                        "이름": r["이름"],
-                        "인원": int(r["인원"] or 1),
-                        "레벨": "",
-                        "기구": "",
-                        "동작(리스트)": "",
-                        "추가동작": "",
-                        "특이사항": "",
-                        "숙제": "",
-                        "메모": r.get("메모",""),
-                        "취소": False,
-                        "사유": "",
-                        "분": 50,
-                        "온더하우스": bool(r.get("온더하우스", False)),
-                        "페이(총)": float(gross),
-                        "페이(실수령)": float(net)
-                    }])
-                    sessions = pd.concat([sessions, sess], ignore_index=True)
-                    save_sessions(sessions)
-                    # 차감 (개인 + 무료 아님)
-                    if (r["구분"]=="개인") and r["이름"] and (r["이름"] in set(members["이름"])) and (not r.get("온더하우스", False)):
-                        idx = members.index[members["이름"]==r["이름"]][0]
-                        left = max(0, int(float(members.loc[idx,"남은횟수"] or 0)) - 1)
-                        members.loc[idx,"남은횟수"] = str(left)
-                        save_members(members)
-                    schedule.loc[schedule["id"]==rid, "상태"] = "완료"
-                    save_schedule(schedule)
-                    st.experimental_rerun()
-            # 취소
-            with colC:
-                if st.button("취소", key=f"sch_can_{rid}"):
-                    schedule.loc[schedule["id"]==rid, "상태"] = "취소됨"
-                    save_schedule(schedule)
-                    st.experimental_rerun()
-            # No Show
-            with colD:
-                if st.button("No Show", key=f"sch_ns_{rid}"):
-                    # 세션은 만들지 않음. 차감/페이는 🍒에서 합산(스케줄 NoShow 반영)
-                    if (r["구분"]=="개인") and r["이름"] and (r["이름"] in set(members["이름"])) and (not r.get("온더하우스", False)):
-                        idx = members.index[members["이름"]==r["이름"]][0]
-                        left = max(0, int(float(members.loc[idx,"남은횟수"] or 0)) - 1)
-                        members.loc[idx,"남은횟수"] = str(left)
-                        save_members(members)
-                    schedule.loc[schedule["id"]==rid, "상태"] = "No Show"
-                    save_schedule(schedule)
-                    st.experimental_rerun()
-
-    # ICS export
-    st.divider()
-    st.subheader("📤 iCal(.ics) 내보내기")
-    exclude_cancel = st.checkbox("취소된 일정 제외", value=True, key="ics_excl")
-    export_df = view.copy()
-    if not export_df.empty:
-        if "상태" in export_df.columns and exclude_cancel:
-            export_df = export_df[export_df["상태"]!="취소됨"]
-    if export_df.empty:
-        st.caption("내보낼 일정이 없습니다.")
-    else:
-        ics_bytes = build_ics_from_df(export_df)
-        filename = f"schedule_{view_mode}_{base.strftime('%Y%m%d')}.ics"
-        st.download_button("⬇️ iCal 파일 다운로드", data=ics_bytes, file_name=filename, mime="text/calendar", use_container_width=True, key="ics_btn")
-
-# ==========================
-# Session Page
-# ==========================
-elif st.session_state["page"] == "session":
-    st.subheader("✍️ 세션 기록")
-
-    tabs = st.tabs(["개인", "그룹"])
-
-    # ---- 개인 세션 기록 ----
-    with tabs[0]:
-        mcols = st.columns([2,1,1,1])
-        with mcols[0]:
-            member = st.selectbox("멤버 선택", members["이름"].tolist(), key="sess_p_name")
-        with mcols[1]:
-            day = st.date_input("날짜", value=date.today(), key="sess_p_date")
-        with mcols[2]:
-            tme = st.time_input("시간", value=datetime.now().time().replace(second=0, microsecond=0), key="sess_p_time")
-        with mcols[3]:
-            default_site = members.loc[members["이름"]==member,"기본지점"].iloc[0] if (member in set(members["이름"])) else "F"
-            site = st.selectbox("지점(F/R/V)", SITES, index=SITES.index(default_site), key="sess_p_site")
-
-        equip_sel = st.multiselect("기구 선택(복수)", list(ex_db.keys()), key="sess_p_equips")
-        if "moves_by_equip" not in st.session_state:
-            st.session_state["moves_by_equip"] = {}
-        all_chosen = []
-        for eq in equip_sel:
-            prev = st.session_state["moves_by_equip"].get(eq, [])
-            picked = st.multiselect(f"{eq} 동작", options=sorted(ex_db.get(eq, [])), default=prev, key=f"s_p_moves_{eq}")
-            st.session_state["moves_by_equip"][eq] = picked
-            all_chosen.extend(picked)
-
-        add_free  = st.text_input("추가 동작(콤마 , 로 구분)", key="sess_p_addfree")
-        spec_note = st.text_input("특이사항", key="sess_p_spec")
-        homework  = st.text_input("숙제", key="sess_p_home")
-        memo      = st.text_area("메모", height=60, key="sess_p_memo")
-
-        if st.button("저장", key="sess_p_save"):
-            when = datetime.combine(day, tme)
-            is_duet = False
-            if member in set(members["이름"]):
-                try:
-                    is_duet = str(members.loc[members["이름"]==member, "듀엣"].iloc[0]).lower() in ["true","1","y","yes"]
-                except Exception:
-                    pass
-            gross, net = calc_pay(site, "개인", 1, settings, is_duet=is_duet)
-            row = pd.DataFrame([{
-                "id": ensure_id(sessions),
-                "날짜": when,
-                "지점": site,
-                "구분": "개인",
-                "이름": member,
-                "인원": 1,
-                "레벨": "",
-                "기구": ", ".join(equip_sel),
-                "동작(리스트)": "; ".join(all_chosen),
-                "추가동작": add_free,
-                "특이사항": spec_note,
-                "숙제": homework,
-                "메모": memo,
-                "취소": False,
-                "사유": "",
-                "분": 50,
-                "온더하우스": False,
-                "페이(총)": float(gross),
-                "페이(실수령)": float(net)
-            }])
-            sessions = pd.concat([sessions, row], ignore_index=True)
-            save_sessions(sessions)
-            if (member in set(members["이름"])):
-                idx = members.index[members["이름"]==member][0]
-                left = max(0, int(float(members.loc[idx,"남은횟수"] or 0)) - 1)
-                members.loc[idx,"남은횟수"] = str(left)
-                save_members(members)
-            st.success("개인 세션 저장 완료")
-
-    # ---- 그룹 세션 기록 ----
-    with tabs[1]:
-        gcols = st.columns([1,1,1,1,1])
-        with gcols[0]:
-            day = st.date_input("날짜", value=date.today(), key="sess_g_date")
-        with gcols[1]:
-            tme = st.time_input("시간", value=datetime.now().time().replace(second=0, microsecond=0), key="sess_g_time")
-        with gcols[2]:
-            site = st.selectbox("지점(F/R/V)", SITES, index=0, key="sess_g_site")
-        with gcols[3]:
-            headcount = st.number_input("인원", 1, 20, 2, 1, key="sess_g_head")
-        with gcols[4]:
-            level = st.selectbox("레벨", ["Basic","Intermediate","Advanced","Mixed","NA"], key="sess_g_level")
-
-        equip = st.selectbox("기구", list(ex_db.keys()), key="sess_g_equip")
-        memo  = st.text_area("메모", height=60, key="sess_g_memo")
-
-        if st.button("저장", key="sess_g_save"):
-            when = datetime.combine(day, tme)
-            gross, net = calc_pay(site, "그룹", int(headcount), settings, is_duet=False)
-            row = pd.DataFrame([{
-                "id": ensure_id(sessions),
-                "날짜": when,
-                "지점": site,
-                "구분": "그룹",
-                "이름": "",
-                "인원": int(headcount),
-                "레벨": level,
-                "기구": equip,
-                "동작(리스트)": "",
-                "추가동작": "",
-                "특이사항": "",
-                "숙제": "",
-                "메모": memo,
-                "취소": False,
-                "사유": "",
-                "분": 50,
-                "온더하우스": False,
-                "페이(총)": float(gross),
-                "페이(실수령)": float(net)
-            }])
-            sessions = pd.concat([sessions, row], ignore_index=True)
-            save_sessions(sessions)
-            st.success("그룹 세션 저장 완료")
-
-    # 최근 세션 (페이 숨김)
-    st.markdown("#### 📑 최근 세션")
-    if sessions.empty:
-        big_info("세션 데이터가 없습니다.")
-    else:
-        view = sessions.sort_values("날짜", ascending=False).copy()
-        hide_cols = ["페이(총)","페이(실수령)"]
-        show_cols = [c for c in view.columns if c not in hide_cols]
-        view["날짜"] = pd.to_datetime(view["날짜"]).dt.strftime("%Y-%m-%d %H:%M")
-        st.dataframe(view[show_cols], use_container_width=True, hide_index=True)
-
-# ==========================
-# Member Page
-# ==========================
-elif st.session_state["page"] == "member":
-    st.subheader("👥 멤버 관리")
-
-    tab_new, tab_edit, tab_re = st.tabs(["신규 등록", "수정", "재등록"])
-
-    # 신규 등록
-    with tab_new:
-        c1,c2 = st.columns([1,1])
-        with c1:
-            name = st.text_input("이름", key="m_new_name")
-            phone= st.text_input("연락처", placeholder="010-0000-0000", key="m_new_phone")
-            duet = st.checkbox("👭🏻 듀엣", key="m_new_duet")
-            duet_with = st.text_input("듀엣 상대 이름(선택)", key="m_new_duet_with")
-        with c2:
-            site = st.selectbox("기본지점(F/R/V)", SITES, index=0, key="m_new_site")
-            reg_date = st.date_input("등록일", value=date.today(), key="m_new_reg")
-            init_cnt = st.number_input("등록 횟수(초기)", 0, 200, 0, 1, key="m_new_init")
-        note = st.text_input("메모(선택)", key="m_new_note")
-
-        if st.button("등록", key="m_new_btn"):
-            if not name.strip():
-                st.error("이름을 입력하세요.")
-            elif phone and (members[(members["연락처"]==phone)].shape[0] > 0):
-                st.error("동일한 전화번호가 이미 존재합니다.")
-            else:
-                row = pd.DataFrame([{
-                    "id": ensure_id(members), "이름": name.strip(), "연락처": phone.strip(),
-                    "기본지점": site, "등록일": reg_date.isoformat(),
-                    "총등록": str(int(init_cnt)), "남은횟수": str(int(init_cnt)),
-                    "회원유형": "일반", "메모": note,
-                    "재등록횟수": "0", "최근재등록일": "",
-                    "듀엣": bool(duet), "듀엣상대": duet_with.strip()
-                }])
-                members = pd.concat([members, row], ignore_index=True)
-                save_members(members)
-                st.success("신규 등록 완료")
-
-    # 수정
-    with tab_edit:
-        sel = st.selectbox("회원 선택", members["이름"].tolist() if not members.empty else [], key="m_edit_sel")
-        if sel:
-            i = members.index[members["이름"]==sel][0]
-            c1,c2 = st.columns([1,1])
-            with c1:
-                name = st.text_input("이름", value=members.loc[i,"이름"], key="m_edit_name")
-                phone= st.text_input("연락처", value=members.loc[i,"연락처"], key="m_edit_phone")
-                duet = st.checkbox("👭🏻 듀엣", value=str(members.loc[i,"듀엣"]).lower() in ["true","1","y","yes"], key="m_edit_duet")
-                duet_with = st.text_input("듀엣 상대 이름", value=members.loc[i,"듀엣상대"], key="m_edit_duet_with")
-            with c2:
-                site = st.selectbox("기본지점(F/R/V)", SITES, index=SITES.index(members.loc[i,"기본지점"]), key="m_edit_site")
-                reg_date = st.date_input("등록일", value=pd.to_datetime(members.loc[i,"등록일"], errors="coerce").date() if members.loc[i]["등록일"] else date.today(), key="m_edit_reg")
-            note = st.text_input("메모(선택)", value=members.loc[i,"메모"], key="m_edit_note")
-
-            if st.button("수정 저장", key="m_edit_btn"):
-                if phone and (members[(members["연락처"]==phone) & (members["이름"]!=sel)].shape[0] > 0):
-                    st.error("동일한 전화번호가 이미 존재합니다.")
-                else:
-                    members.loc[i, ["이름","연락처","기본지점","등록일","메모","듀엣","듀엣상대"]] = \
-                        [name.strip(), phone.strip(), site, reg_date.isoformat(), note, bool(duet), duet_with.strip()]
-                    save_members(members)
-                    st.success("수정 완료")
-
-    # 재등록
-    with tab_re:
-        sel = st.selectbox("회원 선택", members["이름"].tolist() if not members.empty else [], key="m_re_sel")
-        add_cnt = st.number_input("재등록(+횟수)", 0, 200, 0, 1, key="m_re_cnt")
-        if st.button("재등록 반영", key="m_re_btn"):
-            if not sel:
-                st.error("회원을 선택하세요.")
-            else:
-                i = members.index[members["이름"]==sel][0]
-                members.loc[i,"총등록"]   = str(int(float(members.loc[i,"총등록"] or 0)) + int(add_cnt))
-                members.loc[i,"남은횟수"] = str(int(float(members.loc[i,"남은횟수"] or 0)) + int(add_cnt))
-                members.loc[i,"재등록횟수"] = str(int(float(members.loc[i,"재등록횟수"] or 0)) + 1)
-                members.loc[i,"최근재등록일"] = date.today().isoformat()
-                save_members(members)
-                st.success("재등록 반영 완료")
-
-    with st.expander("📋 현재 멤버 보기", expanded=False):
-        if members.empty:
-            big_info("등록된 멤버가 없습니다.")
-        else:
-            show = members.copy()
-            for c in ["등록일","최근재등록일"]:
-                show[c] = pd.to_datetime(show[c], errors="coerce").dt.date.astype(str)
-            st.dataframe(show, use_container_width=True, hide_index=True)
-
-# ==========================
-# Report Page
-# ==========================
-elif st.session_state["page"] == "report":
-    st.subheader("📋 리포트 (회원 동작 Top5 & 추이)")
-    if sessions.empty:
-        big_info("세션 데이터가 없습니다.")
-    else:
-        df = sessions.copy()
-        df = df[df["구분"]=="개인"]
-        df["YM"] = pd.to_datetime(df["날짜"]).dt.strftime("%Y-%m")
-        months = sorted(df["YM"].unique(), reverse=True)
-        who = st.selectbox("회원 선택", sorted(set(df["이름"]) - set([""])), key="r_name")
-        month = st.selectbox("월 선택", months, key="r_month") if months else None
-
-        if who and month:
-            dfm = df[(df["이름"]==who) & (df["YM"]==month)]
-            moves = []
-            for x in dfm["동작(리스트)"].dropna():
-                for part in str(x).split(";"):
-                    p = part.strip()
-                    if p:
-                        moves.append(p)
-            st.markdown("**Top5 동작**")
-            if moves:
-                top = pd.Series(moves).value_counts().head(5).reset_index()
-                top.columns = ["동작","횟수"]
-                st.dataframe(top, use_container_width=True, hide_index=True)
-            else:
-                st.caption("해당 월 동작 기록이 없습니다.")
-
-            # 6개월 추이 (상위 3개 동작)
-            if moves:
-                top_moves = set(pd.Series(moves).value_counts().head(3).index.tolist())
-                last6 = (pd.to_datetime(df["날짜"]).dt.to_period("M").astype(str).sort_values().unique())[-6:]
-                trend = []
-                for ym in last6:
-                    sub = df[(df["이름"]==who) & (pd.to_datetime(df["날짜"]).dt.strftime("%Y-%m")==ym)]
-                    ms = []
-                    for x in sub["동작(리스트)"].dropna():
-                        ms += [p.strip() for p in str(x).split(";") if p.strip()]
-                    row = {"YM": ym}
-                    for m in top_moves:
-                        row[m] = sum([1 for k in ms if k==m])
-                    trend.append(row)
-                if trend:
-                    tdf = pd.DataFrame(trend).fillna(0)
-                    st.markdown("**최근 6개월 추이(상위 3개 동작)**")
-                    st.dataframe(tdf, use_container_width=True, hide_index=True)
-
-# ==========================
-# Cherry Page
-# ==========================
-elif st.session_state["page"] == "cherry":
-    st.subheader("🍒")
-    if "cherry_ok" not in st.session_state or not st.session_state["cherry_ok"]:
-        pin = st.text_input("PIN 입력", type="password", placeholder="****", key="ch_pin")
-        if st.button("열기", key="ch_open"):
-            if pin == CHERRY_PIN:
-                st.session_state["cherry_ok"] = True
-                st.experimental_rerun()
-            else:
-                st.error("PIN이 올바르지 않습니다.")
-    else:
-        # 방문 기본 실수령 설정
-        st.markdown("#### 방문 기본 실수령(원) 설정")
-        vcols = st.columns([1,3])
-        with vcols[0]:
-            visit_pay = st.number_input("방문 실수령(원)", 0, 2_000_000, int(settings.get("visit_default_net", 0)), 1000, key="ch_visit_pay")
-        with vcols[1]:
-            visit_memo = st.text_input("메모(선택)", value=settings.get("visit_memo",""), key="ch_visit_memo")
-        if st.button("저장", key="ch_save"):
-            settings["visit_default_net"] = int(visit_pay)
-            settings["visit_memo"] = visit_memo
-            save_settings(settings)
-            st.success("저장되었습니다.")
-
-        st.markdown("#### 수입 요약")
-        if sessions.empty and schedule.empty:
-            big_info("데이터가 없습니다.")
-        else:
-            ses = sessions.copy()
-            ses["Y"]  = pd.to_datetime(ses["날짜"]).dt.year
-            ses["YM"] = pd.to_datetime(ses["날짜"]).dt.strftime("%Y-%m")
-
-            # No Show 수입(스케줄에서 계산)
-            sch_ns = schedule[schedule["상태"]=="No Show"].copy()
-            ns_net = []
-            for _, r in sch_ns.iterrows():
-                gross, net = calc_pay(r["지점"], r["구분"], int(r.get("인원",1) or 1), settings, is_duet=False)
-                if r.get("온더하우스", False):
-                    net = 0.0
-                ns_net.append(net)
-            sch_ns["net"] = ns_net
-            sch_ns["Y"]   = pd.to_datetime(sch_ns["날짜"]).dt.year
-            sch_ns["YM"]  = pd.to_datetime(sch_ns["날짜"]).dt.strftime("%Y-%m")
-
-            month_s = ses.groupby("YM")["페이(실수령)"].sum().astype(float).rename("세션")
-            ns_m    = sch_ns.groupby("YM")["net"].sum().rename("NoShow") if not sch_ns.empty else pd.Series(dtype=float)
-            month_sum = month_s.to_frame()
-            if not ns_m.empty:
-                month_sum = month_sum.join(ns_m, how="outer").fillna(0.0)
-            else:
-                month_sum["NoShow"] = 0.0
-            month_sum["합계"] = (month_sum["세션"] + month_sum["NoShow"]).astype(int)
-            month_sum = month_sum.reset_index().sort_values("YM", ascending=False)
-
-            year_s = ses.groupby("Y")["페이(실수령)"].sum().astype(float).rename("세션")
-            ns_y   = sch_ns.groupby("Y")["net"].sum().rename("NoShow") if not sch_ns.empty else pd.Series(dtype=float)
-            year_sum = year_s.to_frame()
-            if not ns_y.empty:
-                year_sum = year_sum.join(ns_y, how="outer").fillna(0.0)
-            else:
-                year_sum["NoShow"] = 0.0
-            year_sum["합계"] = (year_sum["세션"] + year_sum["NoShow"]).astype(int)
-            year_sum = year_sum.reset_index().sort_values("Y", ascending=False)
-
-            c1,c2 = st.columns(2)
-            with c1:
-                st.markdown("**월별 실수령(세션+NoShow)**")
-                st.dataframe(month_sum, use_container_width=True, hide_index=True)
-                if len(month_sum) >= 2:
-                    cur, prev = month_sum.iloc[0]["합계"], month_sum.iloc[1]["합계"]
-                    diff = int(cur - prev)
-                    st.metric("전월 대비", f"{diff:+,} 원")
-            with c2:
-                st.markdown("**연도별 실수령(세션+NoShow)**")
-                st.dataframe(year_sum, use_container_width=True, hide_index=True)
-
-            # 지점별 월간 건수(개인/그룹)
-            st.markdown("**지점별 월간 건수(개인/그룹)**")
-            def piv_counts(df):
-                if df.empty:
-                    return pd.DataFrame(columns=["YM","구분","F","R","V"])
-                tmp = df.groupby(["YM","구분","지점"]).size().reset_index(name="cnt")
-                pv = tmp.pivot_table(index=["YM","구분"], columns="지점", values="cnt", fill_value=0).reset_index()
-                for s in SITES:
-                    if s not in pv.columns: pv[s]=0
-                return pv[["YM","구분","F","R","V"]]
-
-            ss = sessions.copy(); ss["YM"] = pd.to_datetime(ss["날짜"]).dt.strftime("%Y-%m")
-            sch = schedule.copy(); sch["YM"] = pd.to_datetime(sch["날짜"]).dt.strftime("%Y-%m")
-            out = pd.concat([piv_counts(ss), piv_counts(sch)], ignore_index=True).sort_values(["YM","구분"], ascending=[False,True])
-            st.dataframe(out, use_container_width=True, hide_index=True)
-# ==========================
-# Member Page
-# ==========================
-elif st.session_state["page"] == "member":
-    st.subheader("👥 멤버 관리")
-
-    tab_new, tab_edit, tab_re = st.tabs(["신규 등록", "수정", "재등록"])
-
-    # 신규 등록
-    with tab_new:
-        c1,c2 = st.columns([1,1])
-        with c1:
-            name = st.text_input("이름", key="m_new_name")
-            phone= st.text_input("연락처", placeholder="010-0000-0000", key="m_new_phone")
-            duet = st.checkbox("👭🏻 듀엣", key="m_new_duet")
-            duet_with = st.text_input("듀엣 상대 이름(선택)", key="m_new_duet_with")
-        with c2:
-            site = st.selectbox("기본지점(F/R/V)", SITES, index=0, key="m_new_site")
-            reg_date = st.date_input("등록일", value=date.today(), key="m_new_reg")
-            init_cnt = st.number_input("등록 횟수(초기)", 0, 200, 0, 1, key="m_new_init")
-        note = st.text_input("메모(선택)", key="m_new_note")
-
-        if st.button("등록", key="m_new_btn"):
-            if not name.strip():
-                st.error("이름을 입력하세요.")
-            elif phone and (members[(members["연락처"]==phone)].shape[0] > 0):
-                st.error("동일한 전화번호가 이미 존재합니다.")
-            else:
-                row = pd.DataFrame([{
-                    "id": ensure_id(members), "이름": name.strip(), "연락처": phone.strip(),
-                    "기본지점": site, "등록일": reg_date.isoformat(),
-                    "총등록": str(int(init_cnt)), "남은횟수": str(int(init_cnt)),
-                    "회원유형": "일반", "메모": note,
-                    "재등록횟수": "0", "최근재등록일": "",
-                    "듀엣": bool(duet), "듀엣상대": duet_with.strip()
-                }])
-                members = pd.concat([members, row], ignore_index=True)
-                save_members(members)
-                st.success("신규 등록 완료")
-
-    # 수정
-    with tab_edit:
-        sel = st.selectbox("회원 선택", members["이름"].tolist() if not members.empty else [], key="m_edit_sel")
-        if sel:
-            i = members.index[members["이름"]==sel][0]
-            c1,c2 = st.columns([1,1])
-            with c1:
-                name = st.text_input("이름", value=members.loc[i,"이름"], key="m_edit_name")
-                phone= st.text_input("연락처", value=members.loc[i,"연락처"], key="m_edit_phone")
-                duet = st.checkbox("👭🏻 듀엣", value=str(members.loc[i,"듀엣"]).lower() in ["true","1","y","yes"], key="m_edit_duet")
-                duet_with = st.text_input("듀엣 상대 이름", value=members.loc[i,"듀엣상대"], key="m_edit_duet_with")
-            with c2:
-                site = st.selectbox("기본지점(F/R/V)", SITES, index=SITES.index(members.loc[i,"기본지점"]), key="m_edit_site")
-                reg_date = st.date_input("등록일", value=pd.to_datetime(members.loc[i,"등록일"], errors="coerce").date() if members.loc[i]["등록일"] else date.today(), key="m_edit_reg")
-            note = st.text_input("메모(선택)", value=members.loc[i,"메모"], key="m_edit_note")
-
-            if st.button("수정 저장", key="m_edit_btn"):
-                if phone and (members[(members["연락처"]==phone) & (members["이름"]!=sel)].shape[0] > 0):
-                    st.error("동일한 전화번호가 이미 존재합니다.")
-                else:
-                    members.loc[i, ["이름","연락처","기본지점","등록일","메모","듀엣","듀엣상대"]] = \
-                        [name.strip(), phone.strip(), site, reg_date.isoformat(), note, bool(duet), duet_with.strip()]
-                    save_members(members)
-                    st.success("수정 완료")
-
-    # 재등록
-    with tab_re:
-        sel = st.selectbox("회원 선택", members["이름"].tolist() if not members.empty else [], key="m_re_sel")
-        add_cnt = st.number_input("재등록(+횟수)", 0, 200, 0, 1, key="m_re_cnt")
-        if st.button("재등록 반영", key="m_re_btn"):
-            if not sel:
-                st.error("회원을 선택하세요.")
-            else:
-                i = members.index[members["이름"]==sel][0]
-                members.loc[i,"총등록"]   = str(int(float(members.loc[i,"총등록"] or 0)) + int(add_cnt))
-                members.loc[i,"남은횟수"] = str(int(float(members.loc[i,"남은횟수"] or 0)) + int(add_cnt))
-                members.loc[i,"재등록횟수"] = str(int(float(members.loc[i,"재등록횟수"] or 0)) + 1)
-                members.loc[i,"최근재등록일"] = date.today().isoformat()
-                save_members(members)
-                st.success("재등록 반영 완료")
-
-    with st.expander("📋 현재 멤버 보기", expanded=False):
-        if members.empty:
-            big_info("등록된 멤버가 없습니다.")
-        else:
-            show = members.copy()
-            for c in ["등록일","최근재등록일"]:
-                show[c] = pd.to_datetime(show[c], errors="coerce").dt.date.astype(str)
-            st.dataframe(show, use_container_width=True, hide_index=True)
-
-# ==========================
-# Report Page
-# ==========================
-elif st.session_state["page"] == "report":
-    st.subheader("📋 리포트 (회원 동작 Top5 & 추이)")
-    if sessions.empty:
-        big_info("세션 데이터가 없습니다.")
-    else:
-        df = sessions.copy()
-        df = df[df["구분"]=="개인"]
-        df["YM"] = pd.to_datetime(df["날짜"]).dt.strftime("%Y-%m")
-        months = sorted(df["YM"].unique(), reverse=True)
-        who = st.selectbox("회원 선택", sorted(set(df["이름"]) - set([""])), key="r_name")
-        month = st.selectbox("월 선택", months, key="r_month") if months else None
-
-        if who and month:
-            dfm = df[(df["이름"]==who) & (df["YM"]==month)]
-            moves = []
-            for x in dfm["동작(리스트)"].dropna():
-                for part in str(x).split(";"):
-                    p = part.strip()
-                    if p:
-                        moves.append(p)
-            st.markdown("**Top5 동작**")
-            if moves:
-                top = pd.Series(moves).value_counts().head(5).reset_index()
-                top.columns = ["동작","횟수"]
-                st.dataframe(top, use_container_width=True, hide_index=True)
-            else:
-                st.caption("해당 월 동작 기록이 없습니다.")
-
-            # 6개월 추이 (상위 3개 동작)
-            if moves:
-                top_moves = set(pd.Series(moves).value_counts().head(3).index.tolist())
-                last6 = (pd.to_datetime(df["날짜"]).dt.to_period("M").astype(str).sort_values().unique())[-6:]
-                trend = []
-                for ym in last6:
-                    sub = df[(df["이름"]==who) & (pd.to_datetime(df["날짜"]).dt.strftime("%Y-%m")==ym)]
-                    ms = []
-                    for x in sub["동작(리스트)"].dropna():
-                        ms += [p.strip() for p in str(x).split(";") if p.strip()]
-                    row = {"YM": ym}
-                    for m in top_moves:
-                        row[m] = sum([1 for k in ms if k==m])
-                    trend.append(row)
-                if trend:
-                    tdf = pd.DataFrame(trend).fillna(0)
-                    st.markdown("**최근 6개월 추이(상위 3개 동작)**")
-                    st.dataframe(tdf, use_container_width=True, hide_index=True)
-
-# ==========================
-# Cherry Page
-# ==========================
-elif st.session_state["page"] == "cherry":
-    st.subheader("🍒")
-    if "cherry_ok" not in st.session_state or not st.session_state["cherry_ok"]:
-        pin = st.text_input("PIN 입력", type="password", placeholder="****", key="ch_pin")
-        if st.button("열기", key="ch_open"):
-            if pin == CHERRY_PIN:
-                st.session_state["cherry_ok"] = True
-                st.experimental_rerun()
-            else:
-                st.error("PIN이 올바르지 않습니다.")
-    else:
-        # 방문 기본 실수령 설정
-        st.markdown("#### 방문 기본 실수령(원) 설정")
-        vcols = st.columns([1,3])
-        with vcols[0]:
-            visit_pay = st.number_input("방문 실수령(원)", 0, 2_000_000, int(settings.get("visit_default_net", 0)), 1000, key="ch_visit_pay")
-        with vcols[1]:
-            visit_memo = st.text_input("메모(선택)", value=settings.get("visit_memo",""), key="ch_visit_memo")
-        if st.button("저장", key="ch_save"):
-            settings["visit_default_net"] = int(visit_pay)
-            settings["visit_memo"] = visit_memo
-            save_settings(settings)
-            st.success("저장되었습니다.")
-
-        st.markdown("#### 수입 요약")
-        if sessions.empty and schedule.empty:
-            big_info("데이터가 없습니다.")
-        else:
-            ses = sessions.copy()
-            ses["Y"]  = pd.to_datetime(ses["날짜"]).dt.year
-            ses["YM"] = pd.to_datetime(ses["날짜"]).dt.strftime("%Y-%m")
-
-            # No Show 수입(스케줄에서 계산)
-            sch_ns = schedule[schedule["상태"]=="No Show"].copy()
-            ns_net = []
-            for _, r in sch_ns.iterrows():
-                gross, net = calc_pay(r["지점"], r["구분"], int(r.get("인원",1) or 1), settings, is_duet=False)
-                if r.get("온더하우스", False):
-                    net = 0.0
-                ns_net.append(net)
-            sch_ns["net"] = ns_net
-            sch_ns["Y"]   = pd.to_datetime(sch_ns["날짜"]).dt.year
-            sch_ns["YM"]  = pd.to_datetime(sch_ns["날짜"]).dt.strftime("%Y-%m")
-
-            month_s = ses.groupby("YM")["페이(실수령)"].sum().astype(float).rename("세션")
-            ns_m    = sch_ns.groupby("YM")["net"].sum().rename("NoShow") if not sch_ns.empty else pd.Series(dtype=float)
-            month_sum = month_s.to_frame()
-            if not ns_m.empty:
-                month_sum = month_sum.join(ns_m, how="outer").fillna(0.0)
-            else:
-                month_sum["NoShow"] = 0.0
-            month_sum["합계"] = (month_sum["세션"] + month_sum["NoShow"]).astype(int)
-            month_sum = month_sum.reset_index().sort_values("YM", ascending=False)
-
-            year_s = ses.groupby("Y")["페이(실수령)"].sum().astype(float).rename("세션")
-            ns_y   = sch_ns.groupby("Y")["net"].sum().rename("NoShow") if not sch_ns.empty else pd.Series(dtype=float)
-            year_sum = year_s.to_frame()
-            if not ns_y.empty:
-                year_sum = year_sum.join(ns_y, how="outer").fillna(0.0)
-            else:
-                year_sum["NoShow"] = 0.0
-            year_sum["합계"] = (year_sum["세션"] + year_sum["NoShow"]).astype(int)
-            year_sum = year_sum.reset_index().sort_values("Y", ascending=False)
-
-            c1,c2 = st.columns(2)
-            with c1:
-                st.markdown("**월별 실수령(세션+NoShow)**")
-                st.dataframe(month_sum, use_container_width=True, hide_index=True)
-                if len(month_sum) >= 2:
-                    cur, prev = month_sum.iloc[0]["합계"], month_sum.iloc[1]["합계"]
-                    diff = int(cur - prev)
-                    st.metric("전월 대비", f"{diff:+,} 원")
-            with c2:
-                st.markdown("**연도별 실수령(세션+NoShow)**")
-                st.dataframe(year_sum, use_container_width=True, hide_index=True)
-
-            # 지점별 월간 건수(개인/그룹)
-            st.markdown("**지점별 월간 건수(개인/그룹)**")
-            def piv_counts(df):
-                if df.empty:
-                    return pd.DataFrame(columns=["YM","구분","F","R","V"])
-                tmp = df.groupby(["YM","구분","지점"]).size().reset_index(name="cnt")
-                pv = tmp.pivot_table(index=["YM","구분"], columns="지점", values="cnt", fill_value=0).reset_index()
-                for s in SITES:
-                    if s not in pv.columns: pv[s]=0
-                return pv[["YM","구분","F","R","V"]]
-
-            ss = sessions.copy(); ss["YM"] = pd.to_datetime(ss["날짜"]).dt.strftime("%Y-%m")
-            sch = schedule.copy(); sch["YM"] = pd.to_datetime(sch["날짜"]).dt.strftime("%Y-%m")
-            out = pd.concat([piv_counts(ss), piv_counts(sch)], ignore_index=True).sort_values(["YM","구분"], ascending=[False,True])
-            st.dataframe(out, use_container_width=True, hide_index=True)
-
-
-
-
-
-
-
-
-
-
-
-
+import os, json, zipfile, html, hashlib, tempfile
+from pathlib import Path
+from datetime import datetime, date, time, timedelta
+from typing import Dict, List
+
+import pandas as pd
+import streamlit as st
+
+from storage import (read_table, write_table, table_bytes, replace_table, use_backend, migrate_csv_to_sqlite,
+                     cached_load, cached_peek, cached_table, invalidate, file_signature, set_write_listener, next_id, next_ids, table_files,
+                     partition_table, create_table)
+from sheets import credentials_info, open_spreadsheet, Outbox, SyncWorker
+from schema import (SITES, SITE_KR, STATUSES, CALENDAR_COLS, MEMBERS, SESSIONS, SCHEDULE, MOVES, MEMBERS_COLS, SESSIONS_COLS, SCHEDULE_COLS, MOVES_COLS,
+                    to_typed, to_text)
+from pay import RULE_COLS, price_frame, pay_one, reprice, missing_gross
+from ics import build_ics
+from feed import FEED_PATH, IcsFeed, start_feed
+from indexes import split_moves, MemberIndex, LastSessionIndex, MoveCatalog, MoveCounts, IncomeAggregates
+
+pd.set_option("mode.copy_on_write", True)   # 캐시된 프레임을 공유해도 안전하도록
+
+# -------- Page config (맨 위에서 1번만) --------
+ICON = Path(__file__).parent / "icon.png"   # 파일명이 favicon.png라면 여기만 바꾸세요
+st.set_page_config(
+    page_title="Pilates Manager",
+    page_icon=str(ICON) if ICON.exists() else "✨",
+    layout="wide",
+    initial_sidebar_state="expanded",
+)
+
+# ==========================
+# Data dir & favicon
+# ==========================
+DATA_DIR = Path(".")
+FAVICON = DATA_DIR / "icon.png"
+
+# ==========================
+# Constants & paths
+# ==========================
+MEMBERS_CSV  = DATA_DIR / "members.csv"
+SESSIONS_CSV = DATA_DIR / "sessions.csv"
+SCHEDULE_CSV = DATA_DIR / "schedule.csv"
+EX_DB_JSON   = DATA_DIR / "exercise_db.json"
+EX_SEED_JSON = DATA_DIR / "pilates_exercises.json"   # 기구별 전체 동작 목록 (동작 카탈로그 시드)
+MOVES_CSV    = DATA_DIR / "moves.csv"                # 동작 카탈로그 (id, 동작, 기구)
+SETTINGS_JSON= DATA_DIR / "settings.json"   # 방문 기본 실수령 등
+SQLITE_DB    = DATA_DIR / "pilates.db"      # STORAGE_BACKEND="sqlite" 일 때
+BACKUP_DIR   = Path(tempfile.gettempdir()) / f"pilates_{hashlib.sha1(str(DATA_DIR.resolve()).encode()).hexdigest()[:8]}"
+
+CHERRY_PIN = st.secrets.get("CHERRY_PW", "2974")
+SHEETS_TTL = 300   # 구글 시트 캐시 유지(초). 사이드바 새로고침으로 즉시 갱신
+SHEETS_OUTBOX = DATA_DIR / "sheets_outbox.db"
+STORAGE_BACKEND = st.secrets.get("STORAGE_BACKEND", "csv")   # "csv" | "sqlite"
+PARTITIONED = [SCHEDULE_CSV, SESSIONS_CSV]   # csv 일 때 월 파티션(schedule/2024-05.csv ...)으로 저장
+SCHEDULE_PAGE_SIZES = [10, 20, 50, 100]      # 일정 목록 한 페이지 줄 수 (기본 20)
+BACKUP_TABLES = [MEMBERS_CSV, SESSIONS_CSV, SCHEDULE_CSV, MOVES_CSV]   # ZIP 백업/복원 대상
+BACKUP_JSON   = [EX_DB_JSON, SETTINGS_JSON]
+
+SITE_COLOR = {"F": "#d9f0ff", "R": "#eeeeee", "V": "#e9fbe9"}
+SITE_LABEL = {"F":"F", "R":"R", "V":"V"}
+
+# ==========================
+# Defaults
+# ==========================
+EX_DB_DEFAULT: Dict[str, List[str]] = {
+    # 최소 예시(원하는 대로 exercise_db.json로 교체 가능)
+    "Mat": ["The Hundred","Roll Up","Roll Over"],
+    "Reformer": ["Footwork - Toes","Hundred","Overhead"],
+    "Cadillac": ["Breathing","Spread Eagle","Pull Ups"],
+    "Wunda chair": ["Footwork - Toes","Push Down","Pull Up"],
+    "Ladder Barrel": ["Swan","Horseback","Side Stretch"],
+    "Spine Corrector": ["Teaser","Hip Circles","Swan"],
+    "Pedi-pull": ["Chest Expansion","Arm Circles"],
+    "Magic Circle": ["Mat - Hundred","Chin Press"],
+    "Arm Chair": ["Basics","Boxing","Hug"],
+    "Electric chair": ["Pumping","Going Up - Front"],
+    "Small Barrel": ["Arm Series - Circles","Leg Series - Circles"],
+    "Foot Corrector": ["Press Down - Toes on Top","Massage"],
+    "Toe Corrector": ["Seated - External Rotation"],
+    "Neck Stretcher": ["Seated - Flat Back"],
+    "기타": []
+}
+
+# 컬럼 정의와 타입은 schema.py (MEMBERS / SESSIONS / SCHEDULE)
+
+DEFAULT_SETTINGS = {
+    "visit_default_net": 0,   # 방문 기본 실수령(원) - 🍒에서 설정
+    "visit_memo": ""          # 메모(선택)
+}
+
+# ==========================
+# Helpers
+# ==========================
+_SITE_ALIAS = {
+    **{s: s for s in SITES},
+    "플로우": "F", "Flow": "F", "flow": "F",
+    "리유": "R",   "Ryu": "R",  "ryu": "R",
+    "방문": "V",   "Visit": "V", "visit": "V",
+}
+
+def _site_coerce(v:str)->str:
+    return _SITE_ALIAS.get(str(v).strip(), "F")
+
+def ensure_df_columns(df: pd.DataFrame, cols: List[str], num_cols: List[str]|None=None, bool_cols: List[str]|None=None) -> pd.DataFrame:
+    num_cols = num_cols or []
+    bool_cols= bool_cols or []
+    for c in cols:
+        if c not in df.columns:
+            if c in num_cols:
+                df[c] = 0
+            elif c in bool_cols:
+                df[c] = False
+            else:
+                df[c] = ""
+    return df
+
+def _site_coerce_series(s: pd.Series) -> pd.Series:
+    # _site_coerce 의 벡터 버전
+    return s.astype(str).str.strip().map(_SITE_ALIAS).fillna("F")
+
+# -------------------
+# Schema migrations
+# -------------------
+# settings.json 의 "schema_version" 보다 높은 버전만 한 번씩 실행한다.
+# 스키마를 바꿀 때는 함수를 만들고 MIGRATIONS 끝에 (다음 버전, 함수)를 추가.
+def _migrate_v1():
+    """컬럼 보강 + 지점 값 정규화(F/R/V)"""
+    for path, cols, site_col in [(MEMBERS_CSV, MEMBERS_COLS, "기본지점"),
+                                 (SESSIONS_CSV, SESSIONS_COLS, "지점"),
+                                 (SCHEDULE_CSV, SCHEDULE_COLS, "지점")]:
+        df = ensure_df_columns(read_table(path), cols)
+        df[site_col] = _site_coerce_series(df[site_col])
+        write_table(path, df)
+
+def _migrate_v2():
+    """updated_at(행 버전 스탬프) 컬럼 추가 - 이후 save_* 가 바뀐 행마다 찍는다"""
+    for path, cols in [(MEMBERS_CSV, MEMBERS_COLS), (SESSIONS_CSV, SESSIONS_COLS), (SCHEDULE_CSV, SCHEDULE_COLS)]:
+        write_table(path, ensure_df_columns(read_table(path), cols))
+
+def _migrate_v3():
+    """저장된 문자열을 타입 스키마의 표준 형태로 ("1.0" -> "1", 날짜 포맷 통일 등)"""
+    for path, schema in [(MEMBERS_CSV, MEMBERS), (SESSIONS_CSV, SESSIONS), (SCHEDULE_CSV, SCHEDULE)]:
+        write_table(path, to_text(to_typed(read_table(path), schema), schema))
+
+def _migrate_v4():
+    """동작 카탈로그 채우기: pilates_exercises.json -> exercise_db.json -> 기존 세션에 나온 이름 순"""
+    seeds = []
+    for src in [EX_SEED_JSON, EX_DB_JSON]:
+        try:
+            seeds += [(m, eq) for eq, ms in json.loads(src.read_text(encoding="utf-8")).items() for m in ms]
+        except Exception:
+            pass
+    seeds += [(m, "") for m in split_moves(read_table(SESSIONS_CSV)["동작(리스트)"]).unique()]
+    intern_moves([m for m, _ in seeds], dict(reversed(seeds)))
+
+MIGRATIONS = [
+    (1, _migrate_v1),
+    (2, _migrate_v2),
+    (3, _migrate_v3),
+    (4, _migrate_v4),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def ensure_files():
+    DATA_DIR.mkdir(exist_ok=True)
+
+    # Settings
+    if not SETTINGS_JSON.exists():
+        SETTINGS_JSON.write_text(json.dumps(DEFAULT_SETTINGS, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    # Members / Sessions / Schedule
+    for path, cols in [(MEMBERS_CSV, MEMBERS_COLS), (SESSIONS_CSV, SESSIONS_COLS), (SCHEDULE_CSV, SCHEDULE_COLS),
+                       (MOVES_CSV, MOVES_COLS)]:
+        create_table(path, cols)
+
+    # EX DB
+    if not EX_DB_JSON.exists():
+        pd.Series(EX_DB_DEFAULT).to_json(EX_DB_JSON, force_ascii=False)
+
+    # SQLite: 처음 한 번 CSV -> SQLite 이전 (이미 있는 테이블은 건너뜀)
+    if STORAGE_BACKEND == "sqlite":
+        migrate_csv_to_sqlite([MEMBERS_CSV, SESSIONS_CSV, SCHEDULE_CSV, MOVES_CSV], SQLITE_DB)
+
+    # Upgrade existing (버전이 오를 때만; 평소에는 읽기/쓰기 없음)
+    ver = int(load_settings().get("schema_version", 0) or 0)
+    for v, fn in MIGRATIONS:
+        if v > ver:
+            fn()
+            d = _read_settings()
+            d["schema_version"] = v
+            save_settings(d)
+
+# load_* 는 파일(path+mtime+size)이 그대로면 캐시된 결과를 돌려주고,
+# 같은 테이블의 save_* 가 캐시를 비운다.
+def _read_settings() -> dict:
+    try:
+        return json.loads(SETTINGS_JSON.read_text(encoding="utf-8"))
+    except Exception:
+        return DEFAULT_SETTINGS.copy()
+
+def load_settings() -> dict:
+    return dict(cached_load(SETTINGS_JSON, [SETTINGS_JSON], _read_settings))
+
+def save_settings(d: dict):
+    SETTINGS_JSON.write_text(json.dumps(d, ensure_ascii=False, indent=2), encoding="utf-8")
+    invalidate(SETTINGS_JSON)
+
+def load_members() -> pd.DataFrame:
+    return cached_table(MEMBERS_CSV, lambda df: to_typed(df, MEMBERS))
+
+def save_members(df: pd.DataFrame):
+    write_table(MEMBERS_CSV, to_text(df, MEMBERS))
+
+def load_member_index() -> MemberIndex:
+    # 이름/연락처/id -> 행 라벨. members 가 바뀔 때만 다시 만든다 (save_members 가 캐시를 비움).
+    return cached_load((MEMBERS_CSV, "index"), table_files(MEMBERS_CSV), lambda: MemberIndex(load_members()))
+
+def duet_flags(names: pd.Series) -> pd.Series:
+    """이름 -> 지금 members 의 듀엣 여부 (없는 이름은 False)"""
+    mi, mem = load_member_index(), load_members()
+    flags = pd.Series(mem.loc[list(mi.by_name.values()), "듀엣"].to_numpy(), index=list(mi.by_name.keys()))
+    return names.astype(str).map(flags).eq(True)
+
+def load_sessions() -> pd.DataFrame:
+    return cached_table(SESSIONS_CSV, lambda df: to_typed(df, SESSIONS))
+
+def save_sessions(df: pd.DataFrame):
+    agg = cached_peek(INCOME_KEY, _income_files())   # 저장 전에 (저장하면 파일 서명이 바뀜)
+    x = to_text(df, SESSIONS)
+    write_table(SESSIONS_CSV, x)
+    if agg is not None:
+        agg.update_sessions(to_typed(x, SESSIONS))
+        cached_load(INCOME_KEY, _income_files(), lambda: agg)
+
+def load_last_sessions() -> LastSessionIndex:
+    # 회원별 최근 세션 요약. 세션 파일이 (다른 곳에서) 바뀌면 다시 만든다.
+    return cached_load((SESSIONS_CSV, "last"), table_files(SESSIONS_CSV), lambda: LastSessionIndex(load_sessions()))
+
+def load_move_catalog() -> MoveCatalog:
+    return cached_load((MOVES_CSV, "catalog"), table_files(MOVES_CSV),
+                       lambda: MoveCatalog(to_typed(read_table(MOVES_CSV), MOVES)))
+
+def intern_moves(names: List[str], equip: Dict[str, str]|None=None) -> MoveCatalog:
+    """카탈로그에 없는 동작 이름에 새 id 를 붙여 저장한다 (이미 있는 이름은 그대로)."""
+    cat = load_move_catalog()
+    new = [n for n in dict.fromkeys(names) if n and n not in cat.by_name]
+    if new:
+        ids = next_ids(MOVES_CSV, len(new))
+        rows = pd.DataFrame({"id": ids, "동작": new, "기구": [(equip or {}).get(n, "") for n in new]})
+        write_table(MOVES_CSV, rows.reindex(columns=MOVES_COLS, fill_value=""))
+        cat.add([int(i) for i in ids], new)
+        cached_load((MOVES_CSV, "catalog"), table_files(MOVES_CSV), lambda: cat)   # 새 파일 서명으로 다시 등록
+    return cat
+
+def load_move_counts() -> MoveCounts:
+    # 리포트용 (이름, 월, 동작 id) 횟수. 세션/카탈로그 파일이 (다른 곳에서) 바뀌면 다시 만든다.
+    def build():
+        sess = load_sessions()
+        intern_moves(split_moves(sess["동작(리스트)"]).unique())   # 보통은 없음 (append_sessions/마이그레이션에서 등록)
+        return MoveCounts(sess, load_move_catalog())
+    return cached_load((SESSIONS_CSV, "moves"), table_files(SESSIONS_CSV) + table_files(MOVES_CSV), build)
+
+def append_sessions(df: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    """세션 행 추가 + 저장 (추가한 행만 쓴다). 최근 세션/동작 횟수 인덱스는 다시 만들지 않고 추가한 행만 반영한다."""
+    last, moves = load_last_sessions(), load_move_counts()
+    rows = to_typed(rows.reindex(columns=df.columns), SESSIONS)
+    intern_moves(split_moves(rows["동작(리스트)"]).unique())   # moves 와 같은 catalog 객체가 갱신됨
+    save_sessions(rows)
+    last.add(rows)
+    moves.add(rows)
+    files = table_files(SESSIONS_CSV)   # 새 파일 서명으로 다시 등록
+    cached_load((SESSIONS_CSV, "last"), files, lambda: last)
+    cached_load((SESSIONS_CSV, "moves"), files + table_files(MOVES_CSV), lambda: moves)
+    return pd.concat([df, rows], ignore_index=True)
+
+def load_schedule(start: datetime|None=None, end: datetime|None=None) -> pd.DataFrame:
+    # start/end 를 주면 그 기간 [start, end) 만 (sqlite: 날짜 인덱스 range scan)
+    return cached_table(SCHEDULE_CSV, lambda df: to_typed(df, SCHEDULE), start, end)
+
+def save_schedule(df: pd.DataFrame):
+    agg = cached_peek(INCOME_KEY, _income_files())
+    x = to_text(df, SCHEDULE)
+    write_table(SCHEDULE_CSV, x)
+    if agg is not None:
+        agg.update_schedule(to_typed(x, SCHEDULE))
+        cached_load(INCOME_KEY, _income_files(), lambda: agg)
+
+# 🍒 수입 요약: (월, 지점, 구분) 집계. save_sessions/save_schedule 가 저장한 행만 반영하고,
+# 파일이 다른 곳에서 바뀌었거나(복원 등) 페이 설정이 바뀌면 다시 만든다 ('다시 집계' 버튼도).
+INCOME_KEY = "income"
+
+def _income_files() -> List[Path]:
+    return table_files(SESSIONS_CSV) + table_files(SCHEDULE_CSV) + [SETTINGS_JSON]
+
+def _no_show_net(rows: pd.DataFrame) -> pd.Series:
+    # 스케줄 행 -> No Show 실수령 (No Show 가 아니거나 온더하우스면 0)
+    ns = rows[(rows["상태"] == "No Show") & ~rows["온더하우스"].astype(bool)]
+    return price_frame(ns, load_settings(), duet=False)["net"].reindex(rows.index, fill_value=0.0)
+
+def load_income() -> IncomeAggregates:
+    return cached_load(INCOME_KEY, _income_files(),
+                       lambda: IncomeAggregates(load_sessions(), load_schedule(), _no_show_net))
+
+def _read_ex_db() -> Dict[str, List[str]]:
+    try:
+        raw = pd.read_json(EX_DB_JSON, typ="series")
+        return {k:list(v) for k,v in raw.items()}
+    except Exception:
+        pd.Series(EX_DB_DEFAULT).to_json(EX_DB_JSON, force_ascii=False)
+        return EX_DB_DEFAULT
+
+def load_ex_db() -> Dict[str, List[str]]:
+    return dict(cached_load(EX_DB_JSON, [EX_DB_JSON], _read_ex_db))
+
+def save_ex_db(db: Dict[str, List[str]]):
+    pd.Series(db).to_json(EX_DB_JSON, force_ascii=False)
+    invalidate(EX_DB_JSON)
+
+# -------------------
+# Google Sheets
+# -------------------
+# 로컬 저장소가 기준이고, 시트 동기화는 백그라운드 워커가 맡는다 (화면은 네트워크를 기다리지 않음).
+@st.cache_resource(show_spinner=False)
+def sheets_worker():
+    """프로세스당 한 번: outbox + 동기화 스레드 시작, save_* 변경 행을 outbox 로 연결 (secrets 가 없으면 None)"""
+    if "gcp_service" not in st.secrets:
+        return None
+    svc = st.secrets["gcp_service"]
+    _raw = svc["credentials"] if "credentials" in svc else {k: svc[k] for k in svc if k != "SHEET_ID"}
+    info, sheet_id = credentials_info(_raw), svc["SHEET_ID"]
+    worker = SyncWorker(Outbox(SHEETS_OUTBOX), lambda: open_spreadsheet(info, sheet_id), pull_every=SHEETS_TTL)
+    set_write_listener("sheets", worker.enqueue)
+    worker.start()
+    return worker
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _typed_sheet_frames(pulled_at: float, _raw: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    # 워커가 마지막으로 읽어 둔 탭 -> load_* 와 같은 타입 (pulled_at 이 바뀔 때만 다시 변환)
+    return {
+        "members":  to_typed(_raw["members"], MEMBERS),
+        "sessions": to_typed(_raw["sessions"], SESSIONS),
+        "schedule": to_typed(_raw["schedule"], SCHEDULE),
+    }
+
+def load_sheet_frames() -> Dict[str, pd.DataFrame]:
+    w = sheets_worker()
+    if w is None or not w.frames:
+        return {}
+    return _typed_sheet_frames(w.pulled_at, w.frames)
+
+# -------------------
+# iCal 구독 피드
+# -------------------
+# secrets 에 ICS_FEED_PORT 가 있으면 프로세스당 한 번 로컬 피드 서버를 띄운다 (feed.py, 따로 띄워도 됨).
+@st.cache_resource(show_spinner=False)
+def ics_feed():
+    """-> (feed 서버, 구독 주소) 또는 None"""
+    port = int(st.secrets.get("ICS_FEED_PORT", 0) or 0)
+    if not port:
+        return None
+    host, token = st.secrets.get("ICS_FEED_HOST", "127.0.0.1"), st.secrets.get("ICS_FEED_TOKEN", "")
+    try:
+        server = start_feed(IcsFeed(SCHEDULE_CSV, SITE_KR, token=token), host, port)
+    except OSError:   # 포트 사용 중 (따로 띄운 feed.py 등)
+        return None
+    return server, f"http://{host}:{port}{FEED_PATH}" + (f"?token={token}" if token else "")
+
+def big_info(msg: str):
+    st.info(msg)
+
+# -------------------
+# Pay rules
+# -------------------
+def calc_pay(site: str, session_type: str, headcount: int, settings: dict, is_duet: bool=False,
+             when: datetime|None=None) -> tuple[float,float]:
+    """returns (gross, net) - when(세션 날짜, 없으면 오늘)에 유효한 규칙 (pay.RATES + settings["pay_rules"])"""
+    return pay_one(_site_coerce(site), session_type, headcount, settings, is_duet=is_duet, when=when)
+
+# -------------------
+# Calendar grid
+# -------------------
+WEEKDAY_KR = ["월","화","수","목","금","토","일"]
+STATUS_MARK = {"예약됨": "", "완료": " ✓", "취소됨": " ✕", "No Show": " 🫥"}
+GRID_CSS = """<style>
+.sch-grid { border-collapse: collapse; width: 100%; }
+.sch-grid th { padding: 4px; border: 1px solid #eee; background: #fafafa; font-weight: 600; }
+.sch-grid td { padding: 2px; border: 1px solid #eee; vertical-align: top; min-width: 90px; }
+.sch-grid .c { border-radius: 6px; padding: 1px 4px; margin: 1px 0; font-size: 12px; white-space: nowrap; }
+.sch-grid s { color: #999; }
+</style>"""
+
+def schedule_grid_html(df: pd.DataFrame, start: datetime, end: datetime, by_week: bool=False) -> str:
+    """
+    일정 -> 달력 표 HTML 한 덩어리 (위젯 없음). pivot 한 번으로 칸마다 일정 칩을 모은다.
+    by_week=False: 시간대(행) x 날짜(열) / True(월 보기): 주(행) x 요일(열)
+    """
+    days = pd.date_range(start, pd.Timestamp(end) - pd.Timedelta(days=1), freq="D")
+    d = df[df["날짜"].notna()].sort_values("날짜")
+    t = d["날짜"]
+    name = d["이름"].astype(str).replace("", "(그룹)").map(html.escape)
+    status = d["상태"].astype(str)
+    chip = ("<div class='c' style='background:" + d["지점"].astype(str).map(SITE_COLOR).fillna("#eee") + "'>"
+            + t.dt.strftime("%H:%M") + " " + d["지점"].astype(str).map(SITE_LABEL).fillna("") + " " + name
+            + status.map(STATUS_MARK).fillna("") + "</div>")
+    chip = chip.where(status != "취소됨", "<s>" + chip + "</s>")
+
+    if by_week:
+        week0 = days[0] - pd.Timedelta(days=days[0].weekday())
+        rows = pd.date_range(week0, days[-1], freq="7D")
+        rkey, ckey = d["주"], d["요일"]
+        cols, rlabel = list(range(7)), [r.strftime("%m/%d~") for r in rows]
+        clabel = WEEKDAY_KR
+    else:
+        lo, hi = (int(d["시"].min()), int(d["시"].max())) if len(t) else (9, 18)
+        rows = list(range(lo, hi + 1))
+        rkey, ckey = d["시"], t.dt.normalize()
+        cols, rlabel = list(days), [f"{h:02d}:00" for h in rows]
+        clabel = [f"{c:%m/%d} ({WEEKDAY_KR[c.weekday()]})" for c in days]
+
+    grid = (pd.DataFrame({"r": rkey, "c": ckey, "chip": chip})
+            .pivot_table(index="r", columns="c", values="chip", aggfunc="".join)
+            .reindex(index=rows, columns=cols).fillna(""))
+    head = "<tr><th></th>" + "".join(f"<th>{c}</th>" for c in clabel) + "</tr>"
+    body = "".join(f"<tr><th>{lab}</th>" + "".join(f"<td>{v}</td>" for v in vals) + "</tr>"
+                   for lab, vals in zip(rlabel, grid.to_numpy().tolist()))
+    return (GRID_CSS + "<div style='overflow-x:auto'><table class='sch-grid'>" + head + body + "</table></div>")
+
+# ==========================
+# Init
+# ==========================
+use_backend(STORAGE_BACKEND, SQLITE_DB)
+for _p in PARTITIONED:
+    partition_table(_p)
+sync = sheets_worker()
+ics_feed()
+ensure_files()
+settings = load_settings()
+members  = load_members()
+mindex   = load_member_index()
+sessions = load_sessions()
+schedule = load_schedule()
+ex_db    = load_ex_db()
+
+# ==========================
+# Google Sheets 연결 확인
+# ==========================
+sheet_frames = load_sheet_frames()
+if sync is not None:
+    with st.expander("📊 구글 시트 연결 테스트", expanded=False):
+        if st.button("🔄 시트 새로고침", key="sheets_refresh"):
+            sync.request_pull()   # 워커가 읽어 오면 다음 rerun 에 반영
+        if not sheet_frames:
+            st.caption("시트를 아직 읽어 오지 못했습니다." + (f" ({sync.last_error})" if sync.last_error else ""))
+            sheet_frames = {k: pd.DataFrame() for k in ("members", "sessions", "schedule")}
+        else:
+            st.caption(f"마지막으로 읽은 시각: {datetime.fromtimestamp(sync.pulled_at):%Y-%m-%d %H:%M:%S}")
+
+        st.subheader("👥 Members")
+        st.dataframe(sheet_frames["members"])
+
+        st.subheader("🗓️ Sessions")
+        st.dataframe(sheet_frames["sessions"])
+
+        st.subheader("📅 Schedule")
+        st.dataframe(sheet_frames["schedule"])
+
+# ==========================
+# Sidebar Navigation (no bullets, button style, active text only)
+# ==========================
+if "page" not in st.session_state:
+    st.session_state["page"] = "schedule"
+
+st.markdown("""
+<style>
+div[data-testid="stSidebar"] button {
+  background: transparent !important;
+  border: none !important;
+  box-shadow: none !important;
+  text-align: left !important;
+  padding: 6px 4px !important;
+  font-size: 18px !important;
+}
+.nav-active { font-weight: 800; color: #ff4b4b; padding: 6px 4px; }
+</style>
+""", unsafe_allow_html=True)
+
+def nav_item(label: str, key: str, emoji_only=False):
+    show = label if not emoji_only else label.split()[0]
+    if st.session_state["page"] == key:
+        st.sidebar.markdown(f"<div class='nav-active'>{show}</div>", unsafe_allow_html=True)
+    else:
+        if st.sidebar.button(show, key=f"nav_{key}"):
+            st.session_state["page"] = key
+
+st.sidebar.markdown("### 메뉴")
+nav_item("📅 스케줄", "schedule")
+nav_item("✍️ 세션",   "session")
+nav_item("👥 멤버",    "member")
+nav_item("📋 리포트", "report")
+nav_item("🍒",       "cherry", emoji_only=True)
+st.sidebar.markdown("---")
+
+# Manual backup/restore in sidebar bottom
+st.sidebar.markdown("#### 🗄️ 백업/복원")
+# ZIP 은 '백업 준비'를 눌렀을 때만 만든다 (평소 rerun 에는 파일 stat 만).
+# 입력 파일 서명 해시가 이름인 임시 파일로 두고, 데이터가 그대로면 다시 압축하지 않는다.
+def _backup_sources() -> List[Path]:
+    return [f for p in BACKUP_TABLES for f in table_files(p)] + BACKUP_JSON
+
+def backup_zip_path() -> Path:
+    sig = repr(file_signature(_backup_sources())).encode("utf-8")
+    return BACKUP_DIR / f"pilates_backup_{hashlib.sha1(sig).hexdigest()[:16]}.zip"
+
+def build_backup_zip(path: Path) -> Path:
+    """테이블(journal/파티션/SQLite 반영) + json -> path (이미 있으면 그대로, 예전 ZIP 은 지운다)"""
+    if path.exists():
+        return path
+    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+    for old in BACKUP_DIR.glob("pilates_backup_*.zip"):
+        old.unlink(missing_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as z:
+        for p in BACKUP_TABLES:   # ensure_files 가 만들어 두므로 항상 있음 (월 파티션이면 schedule.csv 자체는 없다)
+            z.writestr(p.name, table_bytes(p))
+        for p in BACKUP_JSON:
+            if p.exists():
+                z.write(p, p.name)
+    tmp.replace(path)
+    return path
+
+zip_path = backup_zip_path()
+if st.session_state.get("backup_zip") != zip_path.name or not zip_path.exists():
+    if st.sidebar.button("🗜️ ZIP 백업 준비", use_container_width=True, key="mk_backup"):
+        st.session_state["backup_zip"] = build_backup_zip(zip_path).name
+if st.session_state.get("backup_zip") == zip_path.name and zip_path.exists():
+    with open(zip_path, "rb") as fh:
+        st.sidebar.download_button("⬇️ ZIP 백업", data=fh,
+                                   file_name="pilates_backup.zip", mime="application/zip",
+                                   use_container_width=True, key="dl_backup")
+
+up = st.sidebar.file_uploader("⬆️ ZIP 복원", type=["zip"], key="ul_restore", accept_multiple_files=False)
+if up is not None and st.session_state.get("restored_file") != up.file_id:   # 같은 파일은 한 번만 복원
+    try:
+        with zipfile.ZipFile(up, "r") as z:
+            for name in z.namelist():
+                if name in {p.name for p in BACKUP_TABLES + BACKUP_JSON}:
+                    if name.endswith(".csv"):
+                        replace_table(DATA_DIR / name, z.read(name))   # 예전 journal/SQLite 내용까지 교체
+                    else:
+                        (DATA_DIR / name).write_bytes(z.read(name))
+        # 복원본이 어느 스키마 버전인지 모르므로 다음 실행에서 마이그레이션을 다시 확인
+        d = _read_settings()
+        d["schema_version"] = 0
+        save_settings(d)
+        st.session_state["restored_file"] = up.file_id
+        st.sidebar.success("복원 완료! 페이지를 다시 실행하면 적용됩니다.")
+    except Exception as e:
+        st.sidebar.error(f"복원 실패: {e}")
+
+# ==========================
+# Schedule Page
+# ==========================
+if st.session_state["page"] == "schedule":
+    st.subheader("📅 스케줄")
+
+    # Range controls
+    cols = st.columns([1,1,2,1])
+    with cols[0]:
+        view_mode = st.radio("보기", ["일","주","월"], horizontal=True, index=1, label_visibility="collapsed", key="sch_view")
+    with cols[1]:
+        base = st.date_input("기준", value=date.today(), label_visibility="collapsed", key="sch_base")
+    base_dt = datetime.combine(base, time.min)
+    if view_mode=="일":
+        start, end = base_dt, base_dt + timedelta(days=1)
+    elif view_mode=="주":
+        start = base_dt - timedelta(days=base_dt.weekday())
+        end   = start + timedelta(days=7)
+    else:
+        start = base_dt.replace(day=1)
+        end   = (start + pd.offsets.MonthEnd(1)).to_pydatetime() + timedelta(days=1)
+
+    # 빠른 잔여횟수 뱃지 (fragment 안에서 차감된 값도 보이도록 캐시된 members 를 다시 본다)
+    def remain_badge(name: str) -> str:
+        mi = load_member_index()
+        if not name or name not in mi: return ""
+        left = int(load_members().at[mi.row(name), "남은횟수"])
+        if left <= 0:  return " <span style='color:#d00;font-weight:700'>(0회)</span>"
+        if left == 1:  return " <span style='color:#d00;font-weight:700'>(❗1회)</span>"
+        if left == 2:  return " <span style='color:#d98200;font-weight:700'>(⚠️2회)</span>"
+        return ""
+
+    def use_credit(r: pd.Series):
+        # 개인 + 무료 아님 -> 남은횟수 1 차감 (그 회원 행만 저장)
+        mi = load_member_index()
+        if r["구분"]=="개인" and r["이름"] and (r["이름"] in mi) and (not r.get("온더하우스", False)):
+            mem, idx = load_members(), mi.row(r["이름"])
+            mem.loc[idx,"남은횟수"] = max(0, mem.loc[idx,"남은횟수"] - 1)
+            save_members(mem.loc[[idx]])
+
+    # 예약 추가
+    st.markdown("#### ✨ 예약 추가")
+    c = st.columns([1,1,1,1,2])
+    with c[0]:
+        sdate = st.date_input("날짜", value=base, key="s_new_date")
+    with c[1]:
+        stime = st.time_input("시간", value=datetime.now().time().replace(second=0, microsecond=0), key="s_new_time")
+    with c[2]:
+        stype = st.radio("구분", ["개인","그룹"], horizontal=True, key="s_new_type")
+    with c[3]:
+        onth = st.checkbox("✨ On the house", key="s_new_onth")
+    with c[4]:
+        memo = st.text_input("메모(선택)", key="s_new_memo")
+
+    if stype=="개인":
+        cc = st.columns([2,1])
+        with cc[0]:
+            mname = st.selectbox("멤버", members["이름"].tolist() if not members.empty else [], key="s_new_member")
+        if mname and (mname in mindex):
+            default_site = members.at[mindex.row(mname), "기본지점"]
+        else:
+            default_site = "F"
+        with cc[1]:
+            site = st.selectbox("지점(F/R/V)", SITES, index=SITES.index(default_site), key="s_new_site_personal")
+        headcount = 1
+    else:
+        mname = ""
+        site = st.selectbox("지점(F/R/V)", SITES, index=0, key="s_new_site_group")
+        headcount = st.number_input("인원(그룹)", 1, 20, 2, 1, key="s_new_headcount")
+
+    if st.button("예약 추가", use_container_width=True, key="s_new_add_btn"):
+        when = datetime.combine(sdate, stime)
+        row = pd.DataFrame([{
+            "id": next_id(SCHEDULE_CSV),
+            "날짜": when,
+            "지점": site,
+            "구분": stype,
+            "이름": mname if stype=="개인" else "",
+            "인원": int(headcount),
+            "메모": memo,
+            "온더하우스": bool(onth),
+            "상태": "예약됨"
+        }])
+        schedule = pd.concat([schedule, row], ignore_index=True)
+        save_schedule(schedule)
+        st.success("예약이 추가되었습니다.")
+
+    # 기간 뷰
+    st.markdown("#### 📋 일정")
+    view = load_schedule(start, end).sort_values("날짜")
+
+    last_sessions = load_last_sessions()
+
+    # 필터 + 페이지: 한 번에 그리는 줄(위젯) 수는 기간이 아니라 페이지 크기로 정해진다
+    # (캘린더는 기간 전체를 위젯 없는 HTML 한 덩어리로 그리므로 페이지와 상관없음)
+    layout = st.radio("표시", ["목록","캘린더"], horizontal=True, label_visibility="collapsed", key="sch_layout")
+    fc = st.columns([2,2,1,1])
+    with fc[0]:
+        f_site = st.multiselect("지점", SITES, key="sch_f_site", placeholder="전체")
+    with fc[1]:
+        f_status = st.multiselect("상태", STATUSES, key="sch_f_status", placeholder="전체")
+    with fc[2]:
+        page_size = st.selectbox("페이지당", SCHEDULE_PAGE_SIZES, index=SCHEDULE_PAGE_SIZES.index(20), key="sch_page_size")
+    shown = view
+    if f_site:
+        shown = shown[shown["지점"].isin(f_site)]
+    if f_status:
+        shown = shown[shown["상태"].isin(f_status)]
+    pages = max(1, -(-len(shown) // page_size))
+    if st.session_state.get("sch_page", 1) > pages:
+        st.session_state["sch_page"] = pages   # 필터/기간이 바뀌어 페이지 수가 줄어든 경우
+    with fc[3]:
+        page = st.number_input("페이지", 1, pages, key="sch_page")
+    if len(shown) and layout=="목록":
+        st.caption(f"{len(shown)}건 · {page}/{pages} 페이지")
+
+    if shown.empty:
+        big_info("해당 기간에 일정이 없습니다." if view.empty else "조건에 맞는 일정이 없습니다.")
+    elif layout=="캘린더":
+        # 기간 전체를 한 번에 (페이지 나눔 없음, 버튼은 목록에서)
+        st.markdown(schedule_grid_html(shown, start, end, by_week=(view_mode=="월")), unsafe_allow_html=True)
+    else:
+        @st.fragment
+        def schedule_row(row: pd.DataFrame, last_summary: str):
+            """
+            예약 한 줄. 출석/취소/No Show 는 이 줄만 다시 실행하고 바뀐 행만 저장한다
+            (목록/ICS 등 나머지는 다음 전체 실행 때 새 상태로 그려진다).
+            """
+            rid = row.iloc[0]["id"]
+            # 이 줄만 다시 실행될 때는 처음 받은 row 가 그대로 넘어온다 -> 저장된 행을 다시 읽는다 (파일 서명 캐시)
+            cur = load_schedule(start, end)
+            cur = cur[cur["id"] == rid]
+            if len(cur):
+                row = cur
+            r = row.iloc[0]
+            colA, colM = st.columns([5,1])
+            head = colA.empty()   # 버튼을 처리한 뒤에 그린다 (바뀐 상태를 같은 실행에서 보여 줌)
+            status = None
+            # 출석/취소/No Show 버튼은 아직 예약됨인 줄을 펼쳤을 때만 만든다 (한 예약에 한 번만)
+            if str(r["상태"]) == "예약됨" and colM.toggle("⋯", key=f"sch_more_{rid}"):
+                cb = st.columns(3)
+                # 출석
+                with cb[0]:
+                    if st.button("출석", key=f"sch_att_{rid}"):
+                        # 듀엣 여부 (개인만)
+                        mi = load_member_index()
+                        is_duet = False
+                        if r["구분"]=="개인" and r["이름"] in mi:
+                            is_duet = bool(load_members().at[mi.row(r["이름"]), "듀엣"])
+                        gross, net = calc_pay(r["지점"], r["구분"], int(r["인원"]), settings, is_duet=is_duet, when=r["날짜"])
+                        if r.get("온더하우스", False):
+                            gross = net = 0.0
+                        sess = pd.DataFrame([{
+                            "id": next_id(SESSIONS_CSV),
+                            "날짜": r["날짜"],
+                            "지점": r["지점"],
+                            "구분": r["구분"],
+                            "이름": r["이름"],
+                            "인원": int(r["인원"]),
+                            "레벨": "",
+                            "기구": "",
+                            "동작(리스트)": "",
+                            "추가동작": "",
+                            "특이사항": "",
+                            "숙제": "",
+                            "메모": r.get("메모",""),
+                            "취소": False,
+                            "사유": "",
+                            "분": 50,
+                            "온더하우스": bool(r.get("온더하우스", False)),
+                            "페이(총)": float(gross),
+                            "페이(실수령)": float(net)
+                        }])
+                        append_sessions(load_sessions(), sess)
+                        use_credit(r)
+                        status = "완료"
+                # 취소
+                with cb[1]:
+                    if st.button("취소", key=f"sch_can_{rid}"):
+                        status = "취소됨"
+                # No Show
+                with cb[2]:
+                    if st.button("No Show", key=f"sch_ns_{rid}"):
+                        # 세션은 만들지 않음. 차감/페이는 🍒에서 합산(스케줄 NoShow 반영)
+                        use_credit(r)
+                        status = "No Show"
+            if status:
+                row = row.assign(상태=status)
+                save_schedule(row)
+                r = row.iloc[0]
+
+            dt = r["날짜"].strftime("%m/%d %a %H:%M")
+            chip = f"<span style='background:{SITE_COLOR.get(r['지점'],'#eee')};padding:2px 8px;border-radius:8px;font-size:12px'>{SITE_LABEL.get(r['지점'],r['지점'])}</span>"
+            name_html = f"<b style='font-size:16px'>{r['이름'] if r['이름'] else '(그룹)'}</b>"
+            free = " · ✨" if r.get("온더하우스", False) else ""
+            rm = remain_badge(r["이름"]) if r["구분"]=="개인" else ""
+            title = f"{dt} · {chip} · {name_html}{free}{rm}"
+
+            status = str(r.get("상태","예약됨"))
+            if status == "취소됨":
+                badge = '<span style="background:#ccc;color:#666;padding:2px 6px;border-radius:6px;">취소됨</span>'
+                title = f"<s>{title}</s>"
+            elif status == "No Show":
+                badge = '<span style="background:#ffe3e3;color:#d00;padding:2px 6px;border-radius:6px;">No Show</span>'
+            elif status == "완료":
+                badge = '<span style="background:#e0ffe7;color:#11772a;padding:2px 6px;border-radius:6px;">완료</span>'
+            else:
+                badge = '<span style="background:#e8f0ff;color:#1849a9;padding:2px 6px;border-radius:6px;">예약됨</span>'
+
+            if r["구분"]=="개인" and r["이름"]:
+                sub = f"지난 운동: {last_summary}"
+            else:
+                sub = f"그룹 정보: 인원 {int(r['인원'])}명"
+            if r.get("메모"):
+                sub += f" · 메모: {r['메모']}"
+            head.markdown(f"{title} {badge}<br><span style='color:#888'>{sub}</span>", unsafe_allow_html=True)
+
+        part = shown.iloc[(page-1)*page_size : page*page_size]
+        for i in part.index:
+            name = part.at[i, "이름"]
+            schedule_row(part.loc[[i]], last_sessions.summary(name) if name else "")
+
+    # ICS export
+    st.divider()
+    st.subheader("📤 iCal(.ics) 내보내기")
+    exclude_cancel = st.checkbox("취소된 일정 제외", value=True, key="ics_excl")
+    export_df = view.copy()
+    if not export_df.empty:
+        if "상태" in export_df.columns and exclude_cancel:
+            export_df = export_df[export_df["상태"]!="취소됨"]
+    if export_df.empty:
+        st.caption("내보낼 일정이 없습니다.")
+    else:
+        ics_bytes = build_ics(export_df, SITE_KR)
+        filename = f"schedule_{view_mode}_{base.strftime('%Y%m%d')}.ics"
+        st.download_button("⬇️ iCal 파일 다운로드", data=ics_bytes, file_name=filename, mime="text/calendar", use_container_width=True, key="ics_btn")
+    feed = ics_feed()
+    if feed is not None:
+        st.caption("캘린더 앱에서 구독 (지점/회원별: site=F,R / member=이름 / 취소 포함: cancelled=1)")
+        st.code(feed[1], language=None)
+
+# ==========================
+# Session Page
+# ==========================
+elif st.session_state["page"] == "session":
+    st.subheader("✍️ 세션 기록")
+
+    tabs = st.tabs(["개인", "그룹"])
+
+    # ---- 개인 세션 기록 ----
+    with tabs[0]:
+        mcols = st.columns([2,1,1,1])
+        with mcols[0]:
+            member = st.selectbox("멤버 선택", members["이름"].tolist(), key="sess_p_name")
+        with mcols[1]:
+            day = st.date_input("날짜", value=date.today(), key="sess_p_date")
+        with mcols[2]:
+            tme = st.time_input("시간", value=datetime.now().time().replace(second=0, microsecond=0), key="sess_p_time")
+        with mcols[3]:
+            default_site = members.at[mindex.row(member), "기본지점"] if (member in mindex) else "F"
+            site = st.selectbox("지점(F/R/V)", SITES, index=SITES.index(default_site), key="sess_p_site")
+
+        equip_sel = st.multiselect("기구 선택(복수)", list(ex_db.keys()), key="sess_p_equips")
+        if "moves_by_equip" not in st.session_state:
+            st.session_state["moves_by_equip"] = {}
+        all_chosen = []
+        for eq in equip_sel:
+            prev = st.session_state["moves_by_equip"].get(eq, [])
+            picked = st.multiselect(f"{eq} 동작", options=sorted(ex_db.get(eq, [])), default=prev, key=f"s_p_moves_{eq}")
+            st.session_state["moves_by_equip"][eq] = picked
+            all_chosen.extend(picked)
+
+        add_free  = st.text_input("추가 동작(콤마 , 로 구분)", key="sess_p_addfree")
+        spec_note = st.text_input("특이사항", key="sess_p_spec")
+        homework  = st.text_input("숙제", key="sess_p_home")
+        memo      = st.text_area("메모", height=60, key="sess_p_memo")
+
+        if st.button("저장", key="sess_p_save"):
+            when = datetime.combine(day, tme)
+            is_duet = False
+            if member in mindex:
+                is_duet = bool(members.at[mindex.row(member), "듀엣"])
+            gross, net = calc_pay(site, "개인", 1, settings, is_duet=is_duet, when=when)
+            row = pd.DataFrame([{
+                "id": next_id(SESSIONS_CSV),
+                "날짜": when,
+                "지점": site,
+                "구분": "개인",
+                "이름": member,
+                "인원": 1,
+                "레벨": "",
+                "기구": ", ".join(equip_sel),
+                "동작(리스트)": "; ".join(all_chosen),
+                "추가동작": add_free,
+                "특이사항": spec_note,
+                "숙제": homework,
+                "메모": memo,
+                "취소": False,
+                "사유": "",
+                "분": 50,
+                "온더하우스": False,
+                "페이(총)": float(gross),
+                "페이(실수령)": float(net)
+            }])
+            sessions = append_sessions(sessions, row)
+            if member in mindex:
+                idx = mindex.row(member)
+                members.loc[idx,"남은횟수"] = max(0, members.loc[idx,"남은횟수"] - 1)
+                save_members(members)
+            st.success("개인 세션 저장 완료")
+
+    # ---- 그룹 세션 기록 ----
+    with tabs[1]:
+        gcols = st.columns([1,1,1,1,1])
+        with gcols[0]:
+            day = st.date_input("날짜", value=date.today(), key="sess_g_date")
+        with gcols[1]:
+            tme = st.time_input("시간", value=datetime.now().time().replace(second=0, microsecond=0), key="sess_g_time")
+        with gcols[2]:
+            site = st.selectbox("지점(F/R/V)", SITES, index=0, key="sess_g_site")
+        with gcols[3]:
+            headcount = st.number_input("인원", 1, 20, 2, 1, key="sess_g_head")
+        with gcols[4]:
+            level = st.selectbox("레벨", ["Basic","Intermediate","Advanced","Mixed","NA"], key="sess_g_level")
+
+        equip = st.selectbox("기구", list(ex_db.keys()), key="sess_g_equip")
+        memo  = st.text_area("메모", height=60, key="sess_g_memo")
+
+        if st.button("저장", key="sess_g_save"):
+            when = datetime.combine(day, tme)
+            gross, net = calc_pay(site, "그룹", int(headcount), settings, is_duet=False, when=when)
+            row = pd.DataFrame([{
+                "id": next_id(SESSIONS_CSV),
+                "날짜": when,
+                "지점": site,
+                "구분": "그룹",
+                "이름": "",
+                "인원": int(headcount),
+                "레벨": level,
+                "기구": equip,
+                "동작(리스트)": "",
+                "추가동작": "",
+                "특이사항": "",
+                "숙제": "",
+                "메모": memo,
+                "취소": False,
+                "사유": "",
+                "분": 50,
+                "온더하우스": False,
+                "페이(총)": float(gross),
+                "페이(실수령)": float(net)
+            }])
+            sessions = append_sessions(sessions, row)
+            st.success("그룹 세션 저장 완료")
+
+    # 최근 세션 (페이 숨김)
+    st.markdown("#### 📑 최근 세션")
+    if sessions.empty:
+        big_info("세션 데이터가 없습니다.")
+    else:
+        view = sessions.sort_values("날짜", ascending=False).copy()
+        hide_cols = ["페이(총)","페이(실수령)", *CALENDAR_COLS]
+        show_cols = [c for c in view.columns if c not in hide_cols]
+        view["날짜"] = view["날짜"].dt.strftime("%Y-%m-%d %H:%M")
+        st.dataframe(view[show_cols], use_container_width=True, hide_index=True)
+
+# ==========================
+# Member Page
+# ==========================
+elif st.session_state["page"] == "member":
+    st.subheader("👥 멤버 관리")
+
+    tab_new, tab_edit, tab_re = st.tabs(["신규 등록", "수정", "재등록"])
+
+    # 신규 등록
+    with tab_new:
+        c1,c2 = st.columns([1,1])
+        with c1:
+            name = st.text_input("이름", key="m_new_name")
+            phone= st.text_input("연락처", placeholder="010-0000-0000", key="m_new_phone")
+            duet = st.checkbox("👭🏻 듀엣", key="m_new_duet")
+            duet_with = st.text_input("듀엣 상대 이름(선택)", key="m_new_duet_with")
+        with c2:
+            site = st.selectbox("기본지점(F/R/V)", SITES, index=0, key="m_new_site")
+            reg_date = st.date_input("등록일", value=date.today(), key="m_new_reg")
+            init_cnt = st.number_input("등록 횟수(초기)", 0, 200, 0, 1, key="m_new_init")
+        note = st.text_input("메모(선택)", key="m_new_note")
+
+        if st.button("등록", key="m_new_btn"):
+            if not name.strip():
+                st.error("이름을 입력하세요.")
+            elif mindex.phone_owner(phone) is not None:
+                st.error("동일한 전화번호가 이미 존재합니다.")
+            else:
+                row = pd.DataFrame([{
+                    "id": next_id(MEMBERS_CSV), "이름": name.strip(), "연락처": phone.strip(),
+                    "기본지점": site, "등록일": pd.Timestamp(reg_date),
+                    "총등록": int(init_cnt), "남은횟수": int(init_cnt),
+                    "회원유형": "일반", "메모": note,
+                    "재등록횟수": 0, "최근재등록일": pd.NaT,
+                    "듀엣": bool(duet), "듀엣상대": duet_with.strip()
+                }])
+                members = pd.concat([members, row], ignore_index=True)
+                save_members(members)
+                st.success("신규 등록 완료")
+
+    # 수정
+    with tab_edit:
+        sel = st.selectbox("회원 선택", members["이름"].tolist() if not members.empty else [], key="m_edit_sel")
+        if sel:
+            i = mindex.row(sel)
+            c1,c2 = st.columns([1,1])
+            with c1:
+                name = st.text_input("이름", value=members.loc[i,"이름"], key="m_edit_name")
+                phone= st.text_input("연락처", value=members.loc[i,"연락처"], key="m_edit_phone")
+                duet = st.checkbox("👭🏻 듀엣", value=bool(members.loc[i,"듀엣"]), key="m_edit_duet")
+                duet_with = st.text_input("듀엣 상대 이름", value=members.loc[i,"듀엣상대"], key="m_edit_duet_with")
+            with c2:
+                site = st.selectbox("기본지점(F/R/V)", SITES, index=SITES.index(members.loc[i,"기본지점"]), key="m_edit_site")
+                reg_date = st.date_input("등록일", value=members.loc[i,"등록일"].date() if pd.notna(members.loc[i,"등록일"]) else date.today(), key="m_edit_reg")
+            note = st.text_input("메모(선택)", value=members.loc[i,"메모"], key="m_edit_note")
+
+            if st.button("수정 저장", key="m_edit_btn"):
+                if mindex.phone_owner(phone) not in (None, i):
+                    st.error("동일한 전화번호가 이미 존재합니다.")
+                else:
+                    members.loc[i, ["이름","연락처","기본지점","등록일","메모","듀엣","듀엣상대"]] = \
+                        [name.strip(), phone.strip(), site, pd.Timestamp(reg_date), note, bool(duet), duet_with.strip()]
+                    save_members(members)
+                    st.success("수정 완료")
+
+    # 재등록
+    with tab_re:
+        sel = st.selectbox("회원 선택", members["이름"].tolist() if not members.empty else [], key="m_re_sel")
+        add_cnt = st.number_input("재등록(+횟수)", 0, 200, 0, 1, key="m_re_cnt")
+        if st.button("재등록 반영", key="m_re_btn"):
+            if not sel:
+                st.error("회원을 선택하세요.")
+            else:
+                i = mindex.row(sel)
+                members.loc[i,"총등록"]   += int(add_cnt)
+                members.loc[i,"남은횟수"] += int(add_cnt)
+                members.loc[i,"재등록횟수"] += 1
+                members.loc[i,"최근재등록일"] = pd.Timestamp(date.today())
+                save_members(members)
+                st.success("재등록 반영 완료")
+
+    with st.expander("📋 현재 멤버 보기", expanded=False):
+        if members.empty:
+            big_info("등록된 멤버가 없습니다.")
+        else:
+            show = members.copy()
+            for c in ["등록일","최근재등록일"]:
+                show[c] = show[c].dt.strftime("%Y-%m-%d").fillna("")
+            st.dataframe(show, use_container_width=True, hide_index=True)
+
+# ==========================
+# Report Page
+# ==========================
+elif st.session_state["page"] == "report":
+    st.subheader("📋 리포트 (회원 동작 Top5 & 추이)")
+    if sessions.empty:
+        big_info("세션 데이터가 없습니다.")
+    else:
+        mc = load_move_counts()
+        months = sorted(mc.months, reverse=True)
+        who = st.selectbox("회원 선택", sorted(mc.names), key="r_name")
+        month = st.selectbox("월 선택", months, key="r_month") if months else None
+
+        if who and month:
+            top = mc.top(who, month, 5)
+            st.markdown("**Top5 동작**")
+            if len(top):
+                st.dataframe(top.rename_axis("동작").reset_index(name="횟수"), use_container_width=True, hide_index=True)
+            else:
+                st.caption("해당 월 동작 기록이 없습니다.")
+
+            # 6개월 추이 (상위 3개 동작)
+            if len(top):
+                tdf = mc.trend(who, top.index[:3], sorted(mc.months)[-6:]).rename_axis("YM").reset_index()
+                st.markdown("**최근 6개월 추이(상위 3개 동작)**")
+                st.dataframe(tdf, use_container_width=True, hide_index=True)
+
+# ==========================
+# Cherry Page
+# ==========================
+elif st.session_state["page"] == "cherry":
+    st.subheader("🍒")
+    if "cherry_ok" not in st.session_state or not st.session_state["cherry_ok"]:
+        pin = st.text_input("PIN 입력", type="password", placeholder="****", key="ch_pin")
+        if st.button("열기", key="ch_open"):
+            if pin == CHERRY_PIN:
+                st.session_state["cherry_ok"] = True
+                st.rerun()
+            else:
+                st.error("PIN이 올바르지 않습니다.")
+    else:
+        # 방문 기본 실수령 설정
+        st.markdown("#### 방문 기본 실수령(원) 설정")
+        vcols = st.columns([1,3])
+        with vcols[0]:
+            visit_pay = st.number_input("방문 실수령(원)", 0, 2_000_000, int(settings.get("visit_default_net", 0)), 1000, key="ch_visit_pay")
+        with vcols[1]:
+            visit_memo = st.text_input("메모(선택)", value=settings.get("visit_memo",""), key="ch_visit_memo")
+        if st.button("저장", key="ch_save"):
+            settings["visit_default_net"] = int(visit_pay)
+            settings["visit_memo"] = visit_memo
+            save_settings(settings)
+            st.success("저장되었습니다.")
+
+        # 페이 규칙: 기본 요율(pay.RATES)은 처음부터, 여기 규칙은 시작일부터 같은 항목의 금액을 바꾼다
+        st.markdown("#### 페이 규칙 (시작일별)")
+        st.caption("구분 '*' = 전체 · 인원 0 = 그 외(리유 그룹) · 방문 규칙의 총액이 비면 방문 기본 실수령")
+        rules_df = pd.DataFrame(settings.get("pay_rules") or [], columns=RULE_COLS)
+        rules_df["시작"] = pd.to_datetime(rules_df["시작"], errors="coerce").dt.date
+        rules_edit = st.data_editor(rules_df, num_rows="dynamic", use_container_width=True, hide_index=True, key="ch_pay_rules",
+            column_config={
+                "시작": st.column_config.DateColumn("시작", required=True),
+                "지점": st.column_config.SelectboxColumn("지점", options=SITES, required=True),
+                "구분": st.column_config.SelectboxColumn("구분", options=["*","개인","그룹"], default="*"),
+                "인원": st.column_config.NumberColumn("인원", min_value=0, step=1, default=0),
+                "듀엣": st.column_config.CheckboxColumn("듀엣", default=False),
+                "총액": st.column_config.NumberColumn("총액", min_value=0, step=1000),
+                "비율": st.column_config.NumberColumn("실수령 비율", min_value=0.0, max_value=1.0, step=0.001, default=1.0),
+            })
+        if st.button("규칙 저장", key="ch_pay_rules_save"):
+            out = rules_edit.dropna(subset=["시작","지점"]).copy()
+            out["시작"] = pd.to_datetime(out["시작"]).dt.strftime("%Y-%m-%d")
+            rules = json.loads(out.to_json(orient="records", force_ascii=False))
+            bad = missing_gross(rules)
+            if bad.any():   # 0원으로 계산되지 않도록 저장하지 않는다
+                st.error(f"플로우/리유 규칙은 총액을 입력해야 합니다 ({int(bad.sum())}건, 시작 {', '.join(out.loc[bad.to_numpy(), '시작'])})")
+            else:
+                settings["pay_rules"] = rules
+                save_settings(settings)
+                st.success("저장되었습니다. 지난 세션에 반영하려면 아래에서 다시 계산하세요.")
+
+        # 지난 세션 페이 다시 계산 (바뀌는 행만 저장)
+        st.markdown("#### 페이 다시 계산")
+        rcols = st.columns([1,1,1])
+        with rcols[0]:
+            rp_from = st.date_input("시작", value=date.today().replace(day=1), key="ch_rp_from")
+        with rcols[1]:
+            rp_to = st.date_input("끝(포함)", value=date.today(), key="ch_rp_to")
+        rp_range = (datetime.combine(rp_from, time.min), datetime.combine(rp_to, time.min) + timedelta(days=1))
+        def _reprice():
+            ses_all = load_sessions()
+            return reprice(ses_all, settings, duet=duet_flags(ses_all["이름"]), start=rp_range[0], end=rp_range[1])
+        with rcols[2]:
+            if st.button("미리보기", key="ch_rp_preview"):
+                st.session_state["ch_rp"] = (rp_range, _reprice()[1])
+        hit = st.session_state.get("ch_rp")
+        if hit and hit[0] == rp_range:
+            report = hit[1]
+            if report.empty:
+                st.caption("바뀌는 세션이 없습니다.")
+            else:
+                st.dataframe(report, use_container_width=True, hide_index=True)
+                st.caption(f"{len(report)}건 · 실수령 합계 {report['차이(실수령)'].sum():+,.0f}원 (듀엣 여부는 지금 회원 정보 기준)")
+                if st.button("적용", key="ch_rp_apply"):
+                    changed, _ = _reprice()   # 미리보기 뒤에 바뀐 세션이 있어도 지금 데이터로
+                    save_sessions(changed)
+                    st.session_state.pop("ch_rp", None)
+                    st.success(f"{len(changed)}건의 페이를 다시 계산했습니다.")
+
+        # 구글 시트 동기화 상태
+        if sync is not None:
+            st.markdown("#### 시트 동기화")
+            scols = st.columns(3)
+            scols[0].metric("대기 중인 변경", sync.outbox.depth())
+            scols[1].metric("마지막 동기화", sync.last_sync or "-")
+            scols[2].metric("상태", "오류" if sync.last_error else "정상")
+            if sync.last_error:
+                st.caption(f"최근 오류: {sync.last_error} (자동 재시도)")
+
+        st.markdown("#### 수입 요약")
+        if sessions.empty and schedule.empty:
+            big_info("데이터가 없습니다.")
+        else:
+            if st.button("🔄 다시 집계", key="ch_income_rebuild"):
+                invalidate(INCOME_KEY)
+            income = load_income()
+            month_sum = income.monthly()
+            year_sum  = income.yearly()
+
+            c1,c2 = st.columns(2)
+            with c1:
+                st.markdown("**월별 실수령(세션+NoShow)**")
+                st.dataframe(month_sum, use_container_width=True, hide_index=True)
+                if len(month_sum) >= 2:
+                    cur, prev = month_sum.iloc[0]["합계"], month_sum.iloc[1]["합계"]
+                    diff = int(cur - prev)
+                    st.metric("전월 대비", f"{diff:+,} 원")
+            with c2:
+                st.markdown("**연도별 실수령(세션+NoShow)**")
+                st.dataframe(year_sum, use_container_width=True, hide_index=True)
+
+            # 지점별 월간 건수(개인/그룹)
+            st.markdown("**지점별 월간 건수(개인/그룹)**")
+            st.dataframe(income.site_counts(SITES), use_container_width=True, hide_index=True)
+
+
+
+
+
+
+
+
+
+
+
+
@@ -0,0 +1,155 @@
+import sys, hashlib, argparse, threading
+from pathlib import Path
+from datetime import datetime, timedelta
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Mapping
+from urllib.parse import urlsplit, parse_qs
+
+import pandas as pd
+
+from storage import cached_load, query_table, table_files, file_signature, attach_partitions, use_backend
+from schema import SITES, SITE_KR, SCHEDULE, to_typed
+from ics import build_ics
+
+# ==========================
+# Local iCal feed (HTTP)
+# ==========================
+# 캘린더 앱이 구독할 수 있는 로컬 .ics 주소. 앱과 같은 프로세스(스레드)로 띄우거나
+# `python feed.py --port 8765` 로 따로 띄운다. 피드는 읽기만 한다 (월 파티션으로 나누는 것은 앱이 하고,
+# 피드는 나뉘어 있으면 그대로 따라 읽는다).
+#   GET /schedule.ics?site=F,R&member=홍길동&cancelled=1&token=...
+#  - ETag 은 스케줄 파일 서명(stat 만)+조건으로 정한다: If-None-Match / If-Modified-Since 가 맞으면
+#    스케줄을 읽지도 ics 를 만들지도 않고 304.
+#  - 본문은 ETag 별로 조금 들고 있다가(BODY_CACHE_MAX) 같은 요청이면 그대로 보낸다.
+#  - 지난 일정은 FEED_PAST_DAYS 일까지만 (월 파티션이면 그 달부터 읽는다).
+FEED_PATH = "/schedule.ics"
+FEED_PAST_DAYS = 30
+BODY_CACHE_MAX = 32
+
+class IcsFeed:
+    """스케줄 -> 조건별 ics (ETag/Last-Modified 포함)"""
+    def __init__(self, schedule_path: Path, locations: Mapping[str, str]=SITE_KR, token: str="",
+                 past_days: int=FEED_PAST_DAYS):
+        self.schedule_path = schedule_path
+        self.locations = dict(locations)
+        self.token = token
+        self.past_days = past_days
+        self._bodies: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def _start(self) -> datetime:
+        return datetime.combine(datetime.now().date() - timedelta(days=self.past_days), datetime.min.time())
+
+    @staticmethod
+    def parse_query(qs: Dict[str, list]) -> tuple:
+        """(지점들, 회원 이름, 취소 포함) - ETag 에 들어가는 정규화된 조건"""
+        sites = tuple(sorted({s.strip().upper() for v in qs.get("site", []) for s in v.split(",")} & set(SITES)))
+        member = (qs.get("member") or [""])[0].strip()
+        cancelled = (qs.get("cancelled") or ["0"])[0].strip().lower() in ("1", "true", "yes")
+        return sites, member, cancelled
+
+    def validators(self, query: tuple) -> tuple[str, float]:
+        """(ETag, 마지막 수정 시각) - 파일 stat 만 본다"""
+        start = self._start()
+        attach_partitions(self.schedule_path)   # 따로 띄운 피드: 앱이 그 사이 파티션으로 나눴을 수 있다
+        sig = file_signature(table_files(self.schedule_path, start))
+        etag = '"' + hashlib.sha1(repr((sig, query, start)).encode("utf-8")).hexdigest()[:20] + '"'
+        mtime = max((m for _, m, _ in sig if m is not None), default=0) / 1e9
+        return etag, mtime
+
+    def load(self) -> pd.DataFrame:
+        # 앱의 cached_table 과 다른 키 (앱 화면의 기간 캐시를 밀어내지 않도록)
+        start = self._start()
+        attach_partitions(self.schedule_path)
+        return cached_load((self.schedule_path, "feed"), table_files(self.schedule_path, start),
+                           lambda: to_typed(query_table(self.schedule_path, start), SCHEDULE), extra=start)
+
+    def render(self, query: tuple) -> bytes:
+        sites, member, cancelled = query
+        df = self.load()
+        if sites:
+            df = df[df["지점"].isin(sites)]
+        if member:
+            df = df[df["이름"].astype(str) == member]
+        if not cancelled:
+            df = df[df["상태"] != "취소됨"]
+        return build_ics(df.sort_values("날짜"), self.locations)
+
+    def body(self, etag: str, query: tuple) -> bytes:
+        with self._lock:
+            hit = self._bodies.get(etag)
+        if hit is None:
+            hit = self.render(query)
+            with self._lock:
+                if len(self._bodies) >= BODY_CACHE_MAX:
+                    self._bodies.clear()
+                self._bodies[etag] = hit
+        return hit
+
+def _not_modified(headers, etag: str, mtime: float) -> bool:
+    inm = headers.get("If-None-Match")
+    if inm is not None:   # If-None-Match 가 있으면 그것만 본다 (RFC 7232)
+        return inm.strip() == "*" or etag in [t.strip().removeprefix("W/") for t in inm.split(",")]
+    ims = headers.get("If-Modified-Since")
+    if ims:
+        try:
+            return int(mtime) <= parsedate_to_datetime(ims).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def make_handler(feed: IcsFeed):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path != FEED_PATH:
+                return self.send_error(404)
+            qs = parse_qs(url.query)
+            if feed.token and (qs.get("token") or [""])[0] != feed.token:
+                return self.send_error(403)
+            query = feed.parse_query(qs)
+            etag, mtime = feed.validators(query)
+            head = {"ETag": etag, "Last-Modified": formatdate(mtime, usegmt=True), "Cache-Control": "no-cache"}
+            if _not_modified(self.headers, etag, mtime):
+                self.send_response(304)
+                for k, v in head.items():
+                    self.send_header(k, v)
+                return self.end_headers()
+            data = feed.body(etag, query)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/calendar; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in head.items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, fmt, *args):   # 폴링 요청마다 stderr 에 찍지 않는다
+            pass
+    return Handler
+
+def start_feed(feed: IcsFeed, host: str="127.0.0.1", port: int=8765) -> ThreadingHTTPServer:
+    """백그라운드(daemon) 스레드로 피드 서버 시작"""
+    server = ThreadingHTTPServer((host, port), make_handler(feed))
+    threading.Thread(target=server.serve_forever, name="ics-feed", daemon=True).start()
+    return server
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="스케줄 iCal 구독 피드")
+    ap.add_argument("--data-dir", default=".", type=Path)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", default=8765, type=int)
+    ap.add_argument("--backend", default="csv", choices=["csv", "sqlite"])
+    ap.add_argument("--token", default="")
+    ap.add_argument("--past-days", default=FEED_PAST_DAYS, type=int)
+    args = ap.parse_args(argv)
+    path = args.data_dir / "schedule.csv"
+    use_backend(args.backend, args.data_dir / "pilates.db")
+    server = ThreadingHTTPServer((args.host, args.port),
+                                 make_handler(IcsFeed(path, token=args.token, past_days=args.past_days)))
+    print(f"iCal feed: http://{args.host}:{args.port}{FEED_PATH}", file=sys.stderr)
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, Mapping
+
+import pandas as pd
+
+# ==========================
+# iCalendar (.ics) writer
+# ==========================
+# 일정 프레임 -> VCALENDAR. 행마다 돌지 않고 컬럼 단위 문자열 연산으로 VEVENT 를 만든다.
+#  - 텍스트는 RFC 5545 규칙대로 escape (\\ ; , 줄바꿈) 하고 75 octet 이 넘는 줄은 접는다.
+#  - VEVENT 블록은 원본 필드(id/시작/분/제목/장소/메모) 해시로 캐시한다. 다시 내보낼 때는
+#    바뀐 행만 새로 만들고, 안 바뀐 일정은 DTSTAMP 까지 그대로라 결과도 그대로다.
+#  - iter_ics 는 bytes 조각을 차례로 내놓는다 (파일/HTTP 로 흘려 보내기용).
+PRODID = "-//PilatesApp//Schedule Export//KR"
+FOLD_OCTETS = 75
+CHUNK_EVENTS = 500         # iter_ics 가 한 번에 내놓는 VEVENT 수
+BLOCK_CACHE_MAX = 50_000   # 캐시된 VEVENT 가 이보다 많아지면 비운다
+
+_blocks: Dict[int, str] = {}   # 필드 해시 -> VEVENT 블록 (CRLF 포함)
+
+def escape_text(s: pd.Series) -> pd.Series:
+    """TEXT 값 escape: \\ -> \\\\, ; -> \\;, , -> \\,, 줄바꿈 -> \\n"""
+    return (s.astype(str).str.replace("\\", "\\\\", regex=False)
+             .str.replace(";", "\\;", regex=False).str.replace(",", "\\,", regex=False)
+             .str.replace("\r\n", "\\n", regex=False).str.replace("\n", "\\n", regex=False)
+             .str.replace("\r", "\\n", regex=False))
+
+def fold(line: str) -> str:
+    """75 octet 이 넘는 줄 접기 (UTF-8 글자 중간에서 자르지 않는다. 이어지는 줄은 공백으로 시작)"""
+    if len(line.encode("utf-8")) <= FOLD_OCTETS:
+        return line
+    out, cur, n = [], [], 0
+    for ch in line:
+        w = len(ch.encode("utf-8"))
+        if n + w > FOLD_OCTETS:
+            out.append("".join(cur))
+            cur, n = [" "], 1
+        cur.append(ch)
+        n += w
+    out.append("".join(cur))
+    return "\r\n".join(out)
+
+def _fold_series(s: pd.Series) -> pd.Series:
+    long = s.str.encode("utf-8").str.len() > FOLD_OCTETS
+    return s.where(~long, s[long].map(fold)) if long.any() else s
+
+def _fields(df: pd.DataFrame, locations: Mapping[str, str], default_minutes: int) -> pd.DataFrame:
+    # VEVENT 에 들어가는 값만 (이게 같으면 블록도 같다). 날짜가 없는 행은 뺀다.
+    df = df[df["날짜"].notna()]
+    col = lambda c: df[c] if c in df.columns else pd.Series("", index=df.index)
+    name = col("이름").astype(object).fillna("").astype(str).str.strip()
+    minutes = pd.to_numeric(col("분"), errors="coerce").fillna(default_minutes).astype(int)
+    return pd.DataFrame({
+        "uid": col("id").astype(str),
+        "start": pd.to_datetime(df["날짜"]),
+        "minutes": minutes.where(minutes > 0, default_minutes),
+        "title": name.where(name != "", "그룹"),
+        "loc": col("지점").astype(object).astype(str).map(dict(locations)).fillna(""),
+        "memo": col("메모").astype(object).fillna("").astype(str),
+    }, index=df.index)
+
+def _build_blocks(f: pd.DataFrame) -> pd.Series:
+    # 필드 프레임 -> VEVENT 블록 문자열 (전부 컬럼 연산)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    end = f["start"] + pd.to_timedelta(f["minutes"], unit="m")
+    lines = [
+        "BEGIN:VEVENT\r\nUID:" + f["uid"] + "@pilatesapp\r\nDTSTAMP:" + stamp,
+        "DTSTART:" + f["start"].dt.strftime("%Y%m%dT%H%M%S") + "\r\nDTEND:" + end.dt.strftime("%Y%m%dT%H%M%S"),
+        _fold_series("SUMMARY:" + escape_text(f["title"])),
+        _fold_series("LOCATION:" + escape_text(f["loc"])),
+        _fold_series("DESCRIPTION:" + escape_text(f["memo"])),
+    ]
+    out = lines[0]
+    for s in lines[1:]:
+        out = out + "\r\n" + s
+    return out + "\r\nEND:VEVENT\r\n"
+
+def event_blocks(df: pd.DataFrame, locations: Mapping[str, str], default_minutes: int=50) -> pd.Series:
+    """일정 행 -> VEVENT 블록 (df 순서, 날짜가 없는 행 제외). 캐시에 없는 행만 새로 만든다."""
+    f = _fields(df, locations, default_minutes)
+    if f.empty:
+        return pd.Series([], dtype=object)
+    keys = pd.util.hash_pandas_object(f, index=False).to_numpy()
+    blocks = pd.Series([_blocks.get(k) for k in keys.tolist()], index=f.index, dtype=object)
+    miss = blocks.isna().to_numpy()
+    if miss.any():
+        new = _build_blocks(f[miss])
+        if len(_blocks) + len(new) > BLOCK_CACHE_MAX:
+            _blocks.clear()
+        _blocks.update(zip(keys[miss].tolist(), new.tolist()))
+        blocks[miss] = new.to_numpy()
+    return blocks
+
+def iter_ics(df: pd.DataFrame, locations: Mapping[str, str], default_minutes: int=50,
+             chunk: int=CHUNK_EVENTS) -> Iterator[bytes]:
+    """VCALENDAR 를 bytes 조각으로 (헤더, VEVENT chunk 개씩, 끝)"""
+    yield f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:{PRODID}\r\nCALSCALE:GREGORIAN\r\n".encode("utf-8")
+    blocks = event_blocks(df, locations, default_minutes).tolist()
+    for i in range(0, len(blocks), chunk):
+        yield "".join(blocks[i:i + chunk]).encode("utf-8")
+    yield b"END:VCALENDAR\r\n"
+
+def build_ics(df: pd.DataFrame, locations: Mapping[str, str], default_minutes: int=50) -> bytes:
+    return b"".join(iter_ics(df, locations, default_minutes))
+
+def write_ics(path: Path, df: pd.DataFrame, locations: Mapping[str, str], default_minutes: int=50):
+    """iter_ics 를 파일로 흘려 쓴다 (임시 파일 -> 교체)"""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as fh:
+        for part in iter_ics(df, locations, default_minutes):
+            fh.write(part)
+    tmp.replace(path)
@@ -0,0 +1,273 @@
+import re
+from typing import Dict, Hashable, List
+
+import numpy as np
+import pandas as pd
+
+# ==========================
+# Lookup indexes
+# ==========================
+# 화면마다 members["이름"]==name 같은 전체 스캔을 반복하지 않도록, 테이블이 바뀔 때만
+# 해시맵을 다시 만든다 (app.py 에서 storage.cached_load 로 파일 서명에 묶어 둔다).
+def normalize_phone(phone) -> str:
+    """숫자만 남긴다: "010-1234-5678" / "010 1234 5678" -> "01012345678" """
+    return re.sub(r"\D", "", str(phone or ""))
+
+def _text(s: pd.Series) -> pd.Series:
+    # 타입 컬럼(category 포함) -> 문자열 (빈 값 "").
+    # 빈 category 의 astype(str) 은 copy-on-write 에서 "Unable to avoid copy" 로 실패한다 (pandas 2.2)
+    return s.astype(object).fillna("").astype(str)
+
+def _first_label(keys: pd.Series) -> Dict[Hashable, Hashable]:
+    # key -> 처음 나온 행 라벨 (빈 key 제외)
+    keys = keys[(keys != "") & ~keys.duplicated()]
+    return dict(zip(keys.to_numpy(), keys.index))
+
+class MemberIndex:
+    """이름 / 정규화한 연락처 / id -> members 행 라벨. 같은 이름이 여럿이면 첫 행."""
+    def __init__(self, members: pd.DataFrame):
+        self.by_name  = _first_label(members["이름"].astype(str))
+        self.by_phone = _first_label(members["연락처"].map(normalize_phone))
+        self.by_id    = _first_label(members["id"].astype(str))
+
+    def __contains__(self, name) -> bool:
+        return name in self.by_name
+
+    def __len__(self) -> int:
+        return len(self.by_name)
+
+    def row(self, name):
+        """이름의 행 라벨 (없으면 None)"""
+        return self.by_name.get(name)
+
+    def phone_owner(self, phone):
+        """같은 번호(숫자만 비교)를 쓰는 행 라벨 (없거나 빈 번호면 None)"""
+        p = normalize_phone(phone)
+        return self.by_phone.get(p) if p else None
+
+def _session_summary(r: dict) -> str:
+    # 스케줄 목록의 "지난 운동" 한 줄
+    if str(r.get("사유","")).strip().lower()=="no show" or str(r.get("특이사항","")).strip().lower()=="no show":
+        return "🫥"
+    if r.get("동작(리스트)",""):
+        return r["동작(리스트)"]
+    if r.get("추가동작",""):
+        return r["추가동작"]
+    lvl = str(r.get("레벨","") or "")
+    eqp = str(r.get("기구","") or "")
+    if lvl or eqp:
+        return " · ".join([x for x in [lvl, eqp] if x])
+    return "—"
+
+class LastSessionIndex:
+    """
+    이름 -> (가장 최근 세션 날짜, 요약). groupby + idxmax 한 번으로 만들고,
+    세션을 추가할 때는 add 로 그 회원만 갱신한다 (전체를 다시 훑지 않음).
+    """
+    def __init__(self, sessions: pd.DataFrame):
+        self.latest: Dict[str, tuple] = {}
+        df = sessions[_text(sessions["이름"]) != ""]
+        if df.empty:
+            return
+        when = df["날짜"].fillna(pd.Timestamp.min)   # 날짜가 없는 기록도 후보로는 남김
+        rows = when.groupby(_text(df["이름"])).idxmax()
+        self._put(df.loc[rows.to_numpy()])
+
+    def _put(self, rows: pd.DataFrame):
+        for r in rows.to_dict("records"):
+            name, when = str(r["이름"]), r["날짜"]
+            when = pd.Timestamp.min if pd.isna(when) else pd.Timestamp(when)
+            prev = self.latest.get(name)
+            if prev is None or when >= prev[0]:
+                self.latest[name] = (when, _session_summary(r))
+
+    def add(self, rows: pd.DataFrame):
+        """새로 저장한 세션 행(들)을 반영"""
+        self._put(rows[_text(rows["이름"]) != ""])
+
+    def summary(self, name: str) -> str:
+        hit = self.latest.get(name)
+        return hit[1] if hit else "—"
+
+def split_moves(lists: pd.Series) -> pd.Series:
+    """"A; B; C" 문자열 시리즈 -> 동작 이름 (행 라벨 유지, 빈 이름 제외)"""
+    move = lists.astype(str).str.split(";").explode().str.strip()
+    return move[move.notna() & (move != "")]
+
+class MoveCatalog:
+    """
+    동작 이름 <-> 정수 id (moves 테이블: id, 동작, 기구). 세션에는 "A; B" 문자열이 그대로 저장되고
+    (시트/백업 호환), 분석은 encode 한 정수 배열로 한다. 같은 이름은 기구가 달라도 id 하나.
+    """
+    def __init__(self, moves: pd.DataFrame):
+        ids = pd.to_numeric(moves["id"], errors="coerce")
+        ok = ids.notna() & (moves["동작"].astype(str) != "")
+        ids, names = ids[ok].astype("int64").to_numpy(), moves.loc[ok, "동작"].astype(str).to_numpy()
+        self.names = np.full(int(ids.max()) + 1 if len(ids) else 0, "", dtype=object)   # id -> 이름
+        self.by_name: Dict[str, int] = {}
+        self.add(ids, names)
+
+    def __len__(self) -> int:
+        return len(self.by_name)
+
+    def add(self, ids, names):
+        """새로 등록한 (id, 이름) 반영 (이미 있는 이름은 처음 id 유지)"""
+        ids = np.asarray(ids, dtype="int64")
+        if len(ids) and ids.max() >= len(self.names):
+            self.names = np.concatenate([self.names, np.full(ids.max() + 1 - len(self.names), "", dtype=object)])
+        for i, n in zip(ids.tolist(), names):
+            if n not in self.by_name:
+                self.by_name[n] = i
+                self.names[i] = n
+
+    def unknown(self, lists: pd.Series) -> List[str]:
+        """문자열 시리즈에 나오지만 카탈로그에 없는 이름 (처음 나온 순서)"""
+        return [n for n in split_moves(lists).unique() if n not in self.by_name]
+
+    def encode(self, lists: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+        """문자열 시리즈 -> (행 위치, 동작 id) 정수 배열. 카탈로그에 없는 이름은 빠진다."""
+        move = split_moves(lists.reset_index(drop=True))
+        mid = move.map(self.by_name)
+        ok = mid.notna().to_numpy()
+        return move.index.to_numpy()[ok], mid.to_numpy()[ok].astype("int64")
+
+    def decode(self, ids) -> str:
+        """동작 id 목록 -> 세션에 저장하는 "A; B" 문자열"""
+        return "; ".join(self.names[np.asarray(ids, dtype="int64")])
+
+class MoveCounts:
+    """
+    (이름, YM, 동작 id) -> 횟수. 리포트의 Top5/추이는 여기서 꺼내 본다 (세션 전체를 다시 나누지 않음).
+    개인 세션의 동작을 catalog 로 정수화한 뒤 (회원, 월, 동작) 정수 키 하나로 np.unique 로 센다.
+    세션을 추가할 때는 add 로 추가한 행만 더한다.
+    """
+    def __init__(self, sessions: pd.DataFrame, catalog: MoveCatalog):
+        self.catalog = catalog
+        self.counts = pd.Series(dtype="int64", index=pd.MultiIndex.from_arrays([[], [], []], names=["이름", "YM", "동작"]))
+        self.months: set = set()
+        self.names: set = set()
+        self.add(sessions)
+
+    def add(self, rows: pd.DataFrame):
+        """새로 저장한 세션 행(들)을 반영"""
+        p = rows[(rows["구분"] == "개인") & (_text(rows["이름"]) != "") & rows["날짜"].notna()]
+        name, ym = _text(p["이름"]), _text(p["YM"])
+        self.months |= set(ym)
+        self.names |= set(name)
+        pos, mid = self.catalog.encode(p["동작(리스트)"])
+        if not len(pos):
+            return
+        nc, nu = pd.factorize(name.to_numpy()[pos])
+        yc, yu = pd.factorize(ym.to_numpy()[pos])
+        nm = max(len(self.catalog.names), 1)
+        keys, n = np.unique((nc.astype("int64") * len(yu) + yc) * nm + mid, return_counts=True)
+        rest, m = np.divmod(keys, nm)
+        new = pd.Series(n, index=pd.MultiIndex.from_arrays(
+            [nu[rest // len(yu)], yu[rest % len(yu)], m], names=["이름", "YM", "동작"]))
+        counts = new if self.counts.empty else self.counts.add(new, fill_value=0).astype("int64")
+        self.counts = counts.sort_index()   # .loc[(이름, YM)] 조회용
+
+    def top(self, name: str, ym: str, n: int=5) -> pd.Series:
+        """그 회원/월의 동작 이름 -> 횟수 (많은 순, n 개)"""
+        try:
+            hit = self.counts.loc[(name, ym)]
+        except KeyError:
+            return pd.Series(dtype="int64")
+        hit = hit.sort_values(ascending=False, kind="stable").head(n)
+        return pd.Series(hit.to_numpy(), index=self.catalog.names[hit.index.to_numpy()])
+
+    def trend(self, name: str, moves, months) -> pd.DataFrame:
+        """months(행) x moves(동작 이름, 열) 횟수표 (없는 칸은 0)"""
+        moves = list(moves)
+        ids = [self.catalog.by_name.get(m, -1) for m in moves]
+        try:
+            sub = self.counts.loc[name]
+        except KeyError:
+            sub = self.counts.iloc[:0].droplevel(0)
+        out = sub.unstack("동작", fill_value=0).reindex(index=list(months), columns=ids, fill_value=0)
+        out.columns = moves
+        return out
+
+AGG_KEYS = ["YM", "지점", "구분"]
+
+def _contrib(rows: pd.DataFrame, vals: Dict[str, pd.Series]) -> pd.DataFrame:
+    # id -> (YM, 지점, 구분, 건수, 값...) 한 행의 기여분. 날짜가 없는 행은 집계에서 빠진다 (예전 groupby 와 같음)
+    rows = rows[rows["날짜"].notna()]
+    out = pd.DataFrame({
+        "YM": _text(rows["YM"]),
+        "지점": _text(rows["지점"]),
+        "구분": _text(rows["구분"]),
+        "건수": 1,
+        **{k: pd.to_numeric(v.reindex(rows.index), errors="coerce").astype(float).fillna(0.0) for k, v in vals.items()},
+    })
+    out.index = rows["id"].astype(str).to_numpy()
+    return out[~out.index.duplicated(keep="last")]
+
+class IncomeAggregates:
+    """
+    (YM, 지점, 구분) -> 세션 건수/총액/실수령, 스케줄 건수/No Show 실수령·건수.
+    행(id)별 기여분을 들고 있어서, 저장한 행은 예전 기여분을 빼고 새 기여분을 더한다 (전체 재집계 없음).
+    ns_net: 스케줄 행들 -> 행별 No Show 실수령 (No Show 가 아니면 0) - 페이 규칙은 app 쪽에서 넘긴다.
+    """
+    def __init__(self, sessions: pd.DataFrame, schedule: pd.DataFrame, ns_net):
+        self.ns_net = ns_net
+        self._ses = self._ses_contrib(sessions)
+        self._sch = self._sch_contrib(schedule)
+        self.sessions = self._ses.groupby(AGG_KEYS)[["건수", "총액", "실수령"]].sum()
+        self.schedule = self._sch.groupby(AGG_KEYS)[["건수", "NoShow", "NoShow건수"]].sum()
+
+    def _ses_contrib(self, rows: pd.DataFrame) -> pd.DataFrame:
+        return _contrib(rows, {"총액": rows["페이(총)"], "실수령": rows["페이(실수령)"]})
+
+    def _sch_contrib(self, rows: pd.DataFrame) -> pd.DataFrame:
+        return _contrib(rows, {"NoShow": self.ns_net(rows), "NoShow건수": (rows["상태"] == "No Show").astype(float)})
+
+    @staticmethod
+    def _apply(agg: pd.DataFrame, cur: pd.DataFrame, new: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+        old = cur.reindex(new.index.intersection(cur.index))
+        cols = list(agg.columns)
+        agg = (agg.sub(old.groupby(AGG_KEYS)[cols].sum(), fill_value=0)
+                  .add(new.groupby(AGG_KEYS)[cols].sum(), fill_value=0))
+        agg = agg[agg["건수"] != 0].sort_index()
+        return agg, pd.concat([cur.drop(old.index), new])
+
+    def update_sessions(self, rows: pd.DataFrame):
+        """저장한 세션 행(새 행/바뀐 행) 반영"""
+        self.sessions, self._ses = self._apply(self.sessions, self._ses, self._ses_contrib(rows))
+
+    def update_schedule(self, rows: pd.DataFrame):
+        """저장한 스케줄 행(새 예약/상태 변경) 반영"""
+        self.schedule, self._sch = self._apply(self.schedule, self._sch, self._sch_contrib(rows))
+
+    def _income(self, by: str) -> pd.DataFrame:
+        # 기간별 실수령(세션 + NoShow) 표
+        s = self.sessions["실수령"].groupby(level="YM").sum()
+        n = self.schedule[["NoShow", "NoShow건수"]].groupby(level="YM").sum()
+        n = n.loc[n["NoShow건수"] > 0, "NoShow"]   # No Show 가 없는 달은 빼고
+        if by == "Y":
+            s = s.groupby(s.index.str.slice(0, 4).astype(int)).sum()
+            n = n.groupby(n.index.str.slice(0, 4).astype(int)).sum()
+        out = pd.DataFrame({"세션": s}).join(n.rename("NoShow"), how="outer").fillna(0.0)
+        out.index.name = by
+        out["합계"] = (out["세션"] + out["NoShow"]).astype(int)
+        return out.reset_index().sort_values(by, ascending=False)
+
+    def monthly(self) -> pd.DataFrame:
+        """YM / 세션 / NoShow / 합계 (최근 달 먼저)"""
+        return self._income("YM")
+
+    def yearly(self) -> pd.DataFrame:
+        """Y / 세션 / NoShow / 합계 (최근 해 먼저)"""
+        return self._income("Y")
+
+    def site_counts(self, sites) -> pd.DataFrame:
+        """YM / 구분 / 지점별 건수 - 세션 표 다음에 스케줄 표 (구분이 빈 행은 제외)"""
+        frames = []
+        for agg in (self.sessions, self.schedule):
+            c = agg["건수"]
+            c = c[c.index.get_level_values("구분") != ""]
+            pv = c.unstack("지점", fill_value=0).reindex(columns=list(sites), fill_value=0).astype(int)
+            frames.append(pv.reset_index()[["YM", "구분", *sites]])
+        out = pd.concat(frames, ignore_index=True)
+        out.columns = [str(c) for c in out.columns]
+        return out.sort_values(["YM", "구분"], ascending=[False, True])
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+# ==========================
+# Pay rules (rate table)
+# ==========================
+# 지점/구분/인원/듀엣 -> 총액, 실수령 비율. if/else 대신 표 한 장으로 두고
+# price_frame 은 프레임 전체를, pay_one 은 한 건을 같은 표에서 찾는다.
+#  F(플로우): 35,000, 3.3% 공제
+#  R(리유): 개인 30,000 / 듀엣 35,000 / 그룹 1명 25,000 / 2명 30,000 / 3명 40,000 / 그 외 30,000 (공제없음)
+#  V(방문): 🍒 설정의 'visit_default_net' (공제없음)
+# 키에서 상관없는 값은 "*" (구분) / 0 (인원) / False (듀엣) 로 맞춘다. R 그룹 인원은 규칙에 있는 인원만 따로 보고
+# 나머지는 0(그 외) 으로 본다.
+#
+# 규칙에는 시작일이 있다: RATES 는 처음부터(BASE_FROM) 적용되는 기본값이고, 🍒 에서 추가한
+# settings["pay_rules"] 가 그 날짜부터 같은 키의 금액을 바꾼다. 각 행은 날짜 기준으로 그때 유효한 규칙을 쓴다.
+RATE_KEYS = ["지점", "구분", "인원", "듀엣"]
+RULE_COLS = ["시작"] + RATE_KEYS + ["총액", "비율"]
+BASE_FROM = "2000-01-01"
+RATES = [
+    # 지점, 구분,  인원, 듀엣,  총액,    실수령 비율
+    ("F", "*",   0, False, 35000.0, 0.967),
+    ("R", "개인", 0, False, 30000.0, 1.0),
+    ("R", "개인", 0, True,  35000.0, 1.0),
+    ("R", "그룹", 1, False, 25000.0, 1.0),
+    ("R", "그룹", 2, False, 30000.0, 1.0),   # 그룹 2명 (듀엣과 다름)
+    ("R", "그룹", 3, False, 40000.0, 1.0),
+    ("R", "그룹", 0, False, 30000.0, 1.0),
+    ("V", "*",   0, False, None,    1.0),    # 총액 = settings["visit_default_net"]
+]
+
+def _rule_frame(rows) -> pd.DataFrame:
+    # 규칙 목록 -> RULE_COLS 프레임 (컬럼 타입을 먼저 맞춘다: 전부 빈 컬럼이 있어도 concat 결과 타입이 같도록)
+    t = pd.DataFrame(rows, columns=RULE_COLS)
+    return t.assign(**{
+        "시작": pd.to_datetime(t["시작"], errors="coerce").fillna(pd.Timestamp(BASE_FROM)),
+        "지점": t["지점"].fillna("").astype(str).str.strip().str.upper(),
+        "구분": t["구분"].fillna("").astype(str).str.strip().replace("", "*"),
+        "인원": pd.to_numeric(t["인원"], errors="coerce").fillna(0).astype(int).clip(lower=0),
+        "듀엣": t["듀엣"].astype(str).str.strip().str.lower().isin(["true", "1"]),
+        "총액": pd.to_numeric(t["총액"], errors="coerce").astype(float),
+        "비율": pd.to_numeric(t["비율"], errors="coerce").astype(float).fillna(1.0),
+    })
+
+def missing_gross(rules) -> pd.Series:
+    """편집기 검사용: 총액이 빈 F/R 규칙 (방문만 총액을 비워 기본 실수령을 쓸 수 있다)"""
+    t = _rule_frame(rules)
+    return t["지점"].isin(["F", "R"]) & t["총액"].isna()
+
+def rate_table(settings: dict) -> pd.DataFrame:
+    """
+    기본 RATES + settings["pay_rules"] -> RULE_COLS 표 (시작 순).
+    방문(V) 규칙만 총액이 비면 settings["visit_default_net"] 을 쓰고, 총액이 빈 F/R 규칙은 버린다 (0원으로 계산하지 않음).
+    rate_keys 가 만드는 키와 맞도록 규칙을 정규화한다: F/V 는 구분 "*"·인원 0·듀엣 False,
+    R 의 구분 "*"(편집기 기본값)는 개인/그룹 두 줄로, R 개인은 인원 0, R 그룹은 듀엣 False. 지점이 F/R/V 가 아니면 버린다.
+    """
+    extra = settings.get("pay_rules") or []
+    t = _rule_frame([(BASE_FROM, *r) for r in RATES])
+    if extra:
+        t = pd.concat([t, _rule_frame(extra)], ignore_index=True)
+    visit = t["지점"] == "V"
+    t.loc[visit, "총액"] = t.loc[visit, "총액"].fillna(float(settings.get("visit_default_net", 0) or 0))
+    t = t[t["지점"].isin(["F", "R", "V"]) & t["총액"].notna()]
+    is_r = t["지점"] == "R"
+    t.loc[~is_r, "구분"] = "*"
+    any_kind = is_r & ~t["구분"].isin(["개인", "그룹"])
+    t = (pd.concat([t[~any_kind], t[any_kind].assign(구분="개인"), t[any_kind].assign(구분="그룹")])
+         .sort_index(kind="stable").reset_index(drop=True))   # 펼친 줄도 원래 자리에 (같은 시작일이면 뒤 규칙 우선)
+    is_r = t["지점"] == "R"
+    t.loc[~is_r | (t["구분"] == "개인"), "인원"] = 0
+    t.loc[~is_r | (t["구분"] == "그룹"), "듀엣"] = False
+    return t.sort_values("시작", kind="stable").reset_index(drop=True)
+
+def rate_keys(site, kind, headcount, duet, tiers=(1, 2, 3)) -> pd.DataFrame:
+    """행 값 -> 규칙 키 (RATE_KEYS 컬럼 프레임). 지점은 F/R/V 로 정규화된 값이어야 한다 (그 밖의 값은 F)."""
+    site = pd.Series(np.asarray(site, dtype=object)).where(lambda s: s.isin(["F", "R", "V"]), "F").to_numpy()
+    personal = np.asarray(kind, dtype=object) == "개인"
+    hc = pd.to_numeric(pd.Series(np.asarray(headcount, dtype=object)), errors="coerce").fillna(0).astype(int).to_numpy()
+    is_r = site == "R"
+    k = np.where(is_r, np.where(personal, "개인", "그룹"), "*")
+    tier = np.where(is_r & ~personal & np.isin(hc, list(tiers)), hc, 0)
+    d = is_r & personal & np.asarray(duet, dtype=bool)
+    return pd.DataFrame({"지점": site, "구분": k, "인원": tier, "듀엣": d})
+
+def _lookup(keys: pd.DataFrame, rules: pd.DataFrame) -> pd.DataFrame:
+    # 키마다 그 시작 시각에 유효한 마지막 규칙 (keys 순서, 0..n-1 index)
+    hit = pd.merge_asof(keys.sort_values("시작", kind="stable"), rules, on="시작", by=RATE_KEYS)
+    return hit.sort_values("_pos").reset_index(drop=True)
+
+def price_frame(df: pd.DataFrame, settings: dict, duet=None, when=None) -> pd.DataFrame:
+    """
+    df(지점/구분/인원) 전체의 (gross, net) 를 한 번에 계산한다. df.index 그대로.
+    duet: 행별 듀엣 여부 (df 행 순서, 스칼라 가능. 없으면 df["듀엣"], 그것도 없으면 False)
+    when: 행별 날짜 (없으면 df["날짜"], 그것도 없거나 빈 날짜는 오늘) - 그날 유효한 규칙을 쓴다
+    """
+    if duet is None:
+        duet = df["듀엣"] if "듀엣" in df.columns else False
+    duet = np.broadcast_to(np.asarray(duet, dtype=bool), (len(df),))
+    if when is None:
+        when = df["날짜"] if "날짜" in df.columns else pd.NaT
+    today = pd.Timestamp.now().normalize()
+    when = pd.to_datetime(pd.Series(np.asarray(when) if np.ndim(when) else [when] * len(df)), errors="coerce")
+    rules = rate_table(settings)
+    tiers = rules.loc[(rules["지점"] == "R") & (rules["구분"] == "그룹") & (rules["인원"] > 0), "인원"].unique()
+    keys = rate_keys(df["지점"].astype(object), df["구분"].astype(object), df["인원"], duet, tiers)
+    keys["시작"] = when.fillna(today).to_numpy(dtype="datetime64[ns]")
+    keys["_pos"] = np.arange(len(df))
+    hit = _lookup(keys, rules)
+    # R 그룹 인원별 규칙이 그 날짜에는 아직 없으면 (예: 4명 규칙이 2025-01-01 부터) 그 외(인원 0) 규칙으로
+    miss = hit["총액"].isna().to_numpy() & (keys["인원"].to_numpy() != 0)
+    if miss.any():
+        hit.loc[miss, ["총액", "비율"]] = _lookup(keys[miss].assign(인원=0), rules)[["총액", "비율"]].to_numpy()
+    gross = hit["총액"].to_numpy(dtype=float)
+    ratio = hit["비율"].to_numpy(dtype=float)
+    net = np.where(ratio == 1.0, gross, np.round(gross * ratio, 0))
+    return pd.DataFrame({"gross": gross, "net": net}, index=df.index)
+
+def pay_one(site: str, session_type: str, headcount: int, settings: dict, is_duet: bool=False,
+            when=None) -> tuple[float, float]:
+    """한 건 (gross, net) - price_frame 과 같은 표 (when 이 없으면 오늘 규칙)"""
+    r = price_frame(pd.DataFrame({"지점": [site], "구분": [session_type], "인원": [headcount]}), settings,
+                    duet=[is_duet], when=[when])
+    return float(r["gross"].iat[0]), float(r["net"].iat[0])
+
+# ==========================
+# Re-pricing
+# ==========================
+REPRICE_REPORT_COLS = ["id", "날짜", "이름", "지점", "구분", "인원", "페이(총)", "페이(실수령)", "새 총", "새 실수령", "차이(실수령)"]
+
+def reprice(sessions: pd.DataFrame, settings: dict, duet=None, start=None, end=None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    [start, end) 세션의 페이를 지금 규칙(그 세션 날짜에 유효한 규칙)으로 다시 계산한다.
+    온더하우스는 0. 돌려주는 것: (값이 바뀌는 세션 행 - 새 페이가 들어간 전체 컬럼, diff 리포트)
+    """
+    m = sessions["날짜"].notna()
+    if start is not None: m &= sessions["날짜"] >= pd.Timestamp(start)
+    if end is not None:   m &= sessions["날짜"] < pd.Timestamp(end)
+    df = sessions[m]
+    if duet is not None and np.ndim(duet):
+        duet = np.asarray(duet)[m.to_numpy()]
+    p = price_frame(df, settings, duet=duet if duet is not None else False)
+    free = df["온더하우스"].fillna(False).astype(bool) if "온더하우스" in df.columns else False
+    gross, net = p["gross"].where(~free, 0.0), p["net"].where(~free, 0.0)
+    old_g = pd.to_numeric(df["페이(총)"], errors="coerce").astype(float)
+    old_n = pd.to_numeric(df["페이(실수령)"], errors="coerce").astype(float)
+    diff = ~(np.isclose(old_g.fillna(-1), gross) & np.isclose(old_n.fillna(-1), net))
+    changed = df[diff].assign(**{"페이(총)": gross[diff], "페이(실수령)": net[diff]})
+    report = df.loc[diff, REPRICE_REPORT_COLS[:8]].assign(**{
+        "새 총": gross[diff], "새 실수령": net[diff], "차이(실수령)": (net - old_n.fillna(0))[diff]})
+    return changed, report
@@ -0,0 +1,119 @@
+from typing import Dict
+
+import pandas as pd
+
+# ==========================
+# Typed schema (members / sessions / schedule)
+# ==========================
+# 저장소(storage.py)와 시트는 모든 값을 문자열로 다룬다.
+# load_* 는 to_typed 로 한 번만 타입을 입히고, save_* 는 to_text 로 되돌린다.
+#  - 값 종류가 적은 컬럼(지점/구분/상태/레벨/이름/기구 등) -> category (지점/구분/상태는 고정 카테고리)
+#  - 횟수/인원/분      -> Int64 (빈 값은 기본값), 페이 -> Float64
+#  - 체크 값           -> bool,  날짜 -> datetime64 (고정 포맷 먼저, 실패한 것만 느슨하게)
+#  - "날짜" 가 있는 표는 달력 파생 컬럼(CALENDAR_COLS)도 붙인다. 저장하지 않는 컬럼이라 to_text 가 뺀다.
+SITES    = ["F", "R", "V"]  # Flow / Ryu / Visit
+SITE_KR  = {"F": "플로우", "R": "리유", "V": "방문"}
+KINDS    = ["개인", "그룹"]
+STATUSES = ["예약됨", "완료", "취소됨", "No Show"]
+
+DATETIME_FMT = "%Y-%m-%d %H:%M:%S"
+DATE_FMT     = "%Y-%m-%d"
+
+SITE_DTYPE   = pd.CategoricalDtype(SITES)
+KIND_DTYPE   = pd.CategoricalDtype(KINDS)
+STATUS_DTYPE = pd.CategoricalDtype(STATUSES)
+
+# 컬럼 -> (타입, 빈 값일 때 기본값). 타입: "str" | "category" | CategoricalDtype | "Int64" | "Float64"
+#                                         | "bool" | "datetime" | "date"
+MEMBERS: Dict[str, tuple] = {
+    "id": ("str", None), "이름": ("str", None), "연락처": ("str", None),
+    "기본지점": (SITE_DTYPE, "F"), "등록일": ("date", None),
+    "총등록": ("Int64", 0), "남은횟수": ("Int64", 0), "회원유형": ("category", None),
+    "메모": ("str", None), "재등록횟수": ("Int64", 0), "최근재등록일": ("date", None),
+    "듀엣": ("bool", None), "듀엣상대": ("str", None), "updated_at": ("str", None),
+}
+SESSIONS: Dict[str, tuple] = {
+    "id": ("str", None), "날짜": ("datetime", None), "지점": (SITE_DTYPE, "F"), "구분": (KIND_DTYPE, None),
+    "이름": ("category", None), "인원": ("Int64", 1), "레벨": ("category", None), "기구": ("category", None),
+    "동작(리스트)": ("str", None), "추가동작": ("str", None), "특이사항": ("str", None),
+    "숙제": ("str", None), "메모": ("str", None), "취소": ("bool", None), "사유": ("str", None),
+    "분": ("Int64", 50), "온더하우스": ("bool", None),
+    "페이(총)": ("Float64", None), "페이(실수령)": ("Float64", None), "updated_at": ("str", None),
+}
+SCHEDULE: Dict[str, tuple] = {
+    "id": ("str", None), "날짜": ("datetime", None), "지점": (SITE_DTYPE, "F"), "구분": (KIND_DTYPE, None),
+    "이름": ("category", None), "인원": ("Int64", 1), "메모": ("str", None), "온더하우스": ("bool", None),
+    "상태": (STATUS_DTYPE, "예약됨"), "updated_at": ("str", None),
+}
+# 동작 카탈로그 (indexes.MoveCatalog). 세션의 "동작(리스트)" 이름 -> 정수 id
+MOVES: Dict[str, tuple] = {
+    "id": ("str", None), "동작": ("str", None), "기구": ("category", None), "updated_at": ("str", None),
+}
+
+MEMBERS_COLS  = list(MEMBERS)
+SESSIONS_COLS = list(SESSIONS)
+SCHEDULE_COLS = list(SCHEDULE)
+MOVES_COLS    = list(MOVES)
+
+# 달력 파생 컬럼: 로드할 때 한 번만 계산해서 프레임과 같이 캐시된다 (페이지마다 strftime 하지 않도록)
+#  YM: "2024-05" (category) / Y: 연도 / 요일: 0=월 / 시: 0~23 / 주: 그 주 월요일 0시 (날짜가 없으면 모두 빈 값)
+CALENDAR_COLS = ["YM", "Y", "요일", "시", "주"]
+
+_TRUE = {"true", "1", "y", "yes"}
+
+def _datetime(s: pd.Series, fmt: str) -> pd.Series:
+    out = pd.to_datetime(s, format=fmt, errors="coerce")
+    rest = out.isna() & (s.astype(str).str.strip() != "")
+    if rest.any():   # 예전 포맷(초 없음, ISO 'T' 등)만 느슨하게 다시 파싱
+        out[rest] = pd.to_datetime(s[rest], errors="coerce", format="mixed")
+    return out
+
+def add_calendar(df: pd.DataFrame, col: str="날짜") -> pd.DataFrame:
+    """df[col](datetime64) -> CALENDAR_COLS 를 붙인 프레임"""
+    t = df[col]
+    y, m = t.dt.year, t.dt.month
+    codes, months = pd.factorize(y * 12 + m - 1, sort=True)   # 빈 날짜 -> -1 (NaN)
+    ym = pd.Categorical.from_codes(codes, [f"{int(c) // 12:04d}-{int(c) % 12 + 1:02d}" for c in months])
+    day = t.dt.normalize()
+    return df.assign(**{
+        "YM": pd.Series(ym, index=df.index), "Y": y.astype("Int16"), "요일": t.dt.weekday.astype("Int8"),
+        "시": t.dt.hour.astype("Int8"), "주": day - pd.to_timedelta(t.dt.weekday, unit="D"),
+    })
+
+def to_typed(df: pd.DataFrame, schema: Dict[str, tuple]) -> pd.DataFrame:
+    """문자열 프레임 -> 타입 프레임 (schema 에 없는 컬럼은 그대로, 없는 컬럼은 추가. "날짜" 가 있으면 달력 컬럼도)"""
+    out = df.copy()
+    for c, (kind, default) in schema.items():
+        s = out[c] if c in out.columns else pd.Series("", index=out.index, dtype=object)
+        if kind == "str":
+            s = s.fillna("").astype(str)
+        elif kind == "bool":
+            s = s.astype(str).str.strip().str.lower().isin(_TRUE)
+        elif kind in ("datetime", "date"):
+            s = _datetime(s, DATETIME_FMT if kind == "datetime" else DATE_FMT)
+        elif kind in ("Int64", "Float64"):
+            s = pd.to_numeric(s, errors="coerce")
+            s = (s.round() if kind == "Int64" else s).astype(kind)
+        else:   # category (고정 카테고리에 없는 값/빈 값 -> NaN -> 기본값)
+            s = s.fillna("").astype(str).str.strip().astype(kind)
+        if default is not None:
+            s = s.fillna(default)
+        out[c] = s
+    return add_calendar(out) if schema.get("날짜", ("",))[0] == "datetime" else out
+
+def to_text(df: pd.DataFrame, schema: Dict[str, tuple]) -> pd.DataFrame:
+    """타입 프레임 -> 저장용 문자열 프레임 (빈 값 "", 날짜는 고정 포맷, 달력 파생 컬럼은 뺀다)"""
+    out = df.drop(columns=[c for c in CALENDAR_COLS if c in df.columns])
+    for c, (kind, _) in schema.items():
+        if c not in out.columns:
+            continue
+        s = out[c]
+        if kind in ("datetime", "date"):
+            s = pd.to_datetime(s, errors="coerce", format="mixed").dt.strftime(DATETIME_FMT if kind == "datetime" else DATE_FMT)
+        elif kind == "Int64":
+            s = pd.to_numeric(s, errors="coerce").round().astype("Int64")
+        elif kind == "bool":
+            s = s.fillna(False).astype(bool)
+        s = s.astype(object)
+        out[c] = s.where(s.notna(), "").astype(str)
+    return out
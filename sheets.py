@@ -0,0 +1,401 @@
+import json, time, zlib, random, sqlite3, threading
+from collections.abc import Mapping
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+
+# ==========================
+# Google Sheets (members / sessions / schedule 탭)
+# ==========================
+# Streamlit 에 의존하지 않는 부분만 둔다. 캐시/자원 관리는 app.py 에서
+# st.cache_resource / st.cache_data 로 감싼다.
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+TABS   = ["members", "sessions", "schedule"]
+
+def credentials_info(raw) -> dict:
+    # secrets 에 credentials 가 문자열(JSON)/딕트 어떤 형태로 와도 동작하게 처리
+    if isinstance(raw, Mapping):
+        return {k: raw[k] for k in raw}
+    return json.loads(raw)
+
+def open_spreadsheet(creds_info: dict, sheet_id: str):
+    """인증 + open_by_key 를 한 번에 (gspread.Spreadsheet 반환)"""
+    import gspread
+    from google.oauth2.service_account import Credentials
+    creds = Credentials.from_service_account_info(creds_info, scopes=SCOPES)
+    return gspread.authorize(creds).open_by_key(sheet_id)
+
+def values_to_frame(values: List[List]) -> pd.DataFrame:
+    """첫 행을 헤더로 하는 2차원 값 -> DataFrame(dtype=str). 짧은 행은 "" 로 채운다."""
+    if not values:
+        return pd.DataFrame()
+    header = [str(h) for h in values[0]]
+    width  = len(header)
+    rows = [[str(v) for v in r[:width]] + [""] * (width - len(r)) for r in values[1:]]
+    return pd.DataFrame(rows, columns=header, dtype=str)
+
+def fetch_tabs(book, tabs: List[str]=TABS) -> Dict[str, pd.DataFrame]:
+    """탭 여러 개를 values_batch_get 한 번(API 호출 1회)으로 읽는다."""
+    res = book.values_batch_get([f"'{t}'" for t in tabs])
+    out = {}
+    for t, vr in zip(tabs, res.get("valueRanges", [])):
+        out[t] = values_to_frame(vr.get("values", []))
+    return out
+
+# ==========================
+# Incremental pull
+# ==========================
+# 처음 한 번만 탭 전체를 읽고, 이후에는
+#  1) 헤더 행 + updated_at 열만 읽어서 (탭 전체 1회 batch_get)
+#  2) 커서 이후이거나 로컬 사본에 없는 스탬프(늦게 도착한 다른 기기의 쓰기 포함)를 가진 행만
+#     연속 구간으로 묶어 범위 읽기 (1회 batch_get) 후 id 기준으로 병합한다.
+# 시트에서 지운 행/손으로 넣은 행은 스탬프로 알 수 없으므로 verify_every 번에 한 번
+# (또는 행 수가 줄었을 때) id 열을 읽어 block 행 단위 체크섬을 비교하고, 다른 블록만 맞춘다.
+VERSION_COL = "updated_at"
+
+def _block_sums(ids: List[str], block: int) -> List[int]:
+    return [zlib.crc32("\x1f".join(ids[i:i + block]).encode("utf-8")) for i in range(0, len(ids), block)]
+
+def _runs(rows: List[int]) -> List[tuple]:
+    # [2,3,4,9] -> [(2,4), (9,9)]
+    out = []
+    for r in sorted(rows):
+        if out and r == out[-1][1] + 1:
+            out[-1] = (out[-1][0], r)
+        else:
+            out.append((r, r))
+    return out
+
+def _merge_by_id(base: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    # 같은 id 는 덮어쓰고 새 id 는 뒤에 붙인다
+    if rows.empty:
+        return base
+    rows = rows.drop_duplicates("id", keep="last").reindex(columns=base.columns, fill_value="")
+    where = pd.Series(range(len(base)), index=base["id"].to_numpy())
+    where = where[~where.index.duplicated(keep="last")]
+    pos = where.reindex(rows["id"].to_numpy()).to_numpy()
+    hit = ~pd.isna(pos)
+    base = base.copy()
+    if hit.any():
+        base.iloc[pos[hit].astype(int)] = rows[hit].to_numpy()
+    return pd.concat([base, rows[~hit]], ignore_index=True)
+
+class IncrementalPuller:
+    def __init__(self, book, tabs: List[str]=TABS, verify_every: int=12, block: int=500):
+        self.book = book
+        self.tabs = list(tabs)
+        self.verify_every = verify_every
+        self.block = block
+        self.frames: Dict[str, pd.DataFrame] = {}
+        self.cursor: Dict[str, str] = {}     # tab -> 지금까지 본 가장 큰 updated_at
+        self.pulls = 0
+
+    def _get(self, ranges: List[str]) -> List[List[List]]:
+        if not ranges:
+            return []
+        res = self.book.values_batch_get(ranges)
+        return [vr.get("values", []) for vr in res.get("valueRanges", [])]
+
+    def _col(self, tab: str, name: str) -> str:
+        return _col_letter(list(self.frames[tab].columns).index(name) + 1)
+
+    def _full(self, tabs: List[str]):
+        for t, df in fetch_tabs(self.book, tabs).items():
+            self.frames[t] = df
+            self.cursor[t] = df[VERSION_COL].max() if VERSION_COL in df.columns and len(df) else ""
+
+    def _fetch_rows(self, want: Dict[str, List[int]]) -> Dict[str, pd.DataFrame]:
+        # {tab: [시트 행 번호]} -> {tab: 그 행들 (헤더 = 로컬 사본 헤더)} , API 1회
+        ranges, owners = [], []
+        for t, rows in want.items():
+            last = _col_letter(len(self.frames[t].columns))
+            for a, b in _runs(rows):
+                ranges.append(f"'{t}'!A{a}:{last}{b}")
+                owners.append(t)
+        got: Dict[str, list] = {}
+        for t, values in zip(owners, self._get(ranges)):
+            got.setdefault(t, []).extend(values)
+        return {t: values_to_frame([list(self.frames[t].columns)] + v) for t, v in got.items()}
+
+    def pull(self) -> Dict[str, pd.DataFrame]:
+        """변경분만 읽어 frames 를 갱신하고, 새 dict 로 돌려준다."""
+        self.pulls += 1
+        full = [t for t in self.tabs
+                if t not in self.frames or not {"id", VERSION_COL} <= set(self.frames[t].columns)]
+        inc  = [t for t in self.tabs if t not in full]
+
+        ranges = []
+        for t in inc:
+            v = self._col(t, VERSION_COL)
+            ranges += [f"'{t}'!1:1", f"'{t}'!{v}2:{v}"]
+        got = self._get(ranges)
+        stamps: Dict[str, List[str]] = {}
+        for k, t in enumerate(inc):
+            header, col = got[2 * k], got[2 * k + 1]
+            if not header or [str(h) for h in header[0]] != list(self.frames[t].columns):
+                full.append(t)   # 헤더가 바뀜 -> 그 탭만 전체 읽기
+                continue
+            stamps[t] = [str(r[0]) if r else "" for r in col]
+        if full:
+            self._full(full)
+
+        # 스탬프가 다른 행만 범위 읽기
+        want, verify = {}, []
+        for t, st in stamps.items():
+            # 로컬 사본에 없는 스탬프만 (행이 밀려도 같은 스탬프는 다시 읽지 않음)
+            local = self.frames[t][VERSION_COL]
+            seen = set(local)
+            rows = [i + 2 for i, v in enumerate(st) if v and (v > self.cursor[t] or v not in seen)]
+            if rows:
+                want[t] = rows
+            if len(st) < len(local) or self.pulls % self.verify_every == 0:
+                verify.append(t)
+        for t, df in self._fetch_rows(want).items():
+            self.frames[t] = _merge_by_id(self.frames[t], df[df["id"] != ""])
+            if len(df):
+                self.cursor[t] = max(self.cursor[t], df[VERSION_COL].max())
+        if verify:
+            self._verify(verify)
+        return dict(self.frames)
+
+    def _verify(self, tabs: List[str]):
+        # id 열 블록 체크섬 비교 -> 다른 블록이 있으면 시트에 없는 id 삭제 + 시트 순서로 정렬,
+        # 로컬에 없는 id(스탬프 없이 추가된 행)는 범위 읽기로 가져온다.
+        got = self._get([f"'{t}'!{self._col(t, 'id')}2:{self._col(t, 'id')}" for t in tabs])
+        want = {}
+        for t, col in zip(tabs, got):
+            ids = [str(r[0]) if r else "" for r in col]
+            local = self.frames[t]
+            if _block_sums(ids, self.block) == _block_sums(local["id"].tolist(), self.block):
+                continue
+            order = [i for i in ids if i != ""]
+            local = local.drop_duplicates("id", keep="last").set_index("id", drop=False)
+            keep = [i for i in order if i in local.index]
+            self.frames[t] = local.loc[keep].reset_index(drop=True)
+            missing = set(order) - set(keep)
+            if missing:
+                want[t] = [n + 2 for n, i in enumerate(ids) if i in missing]
+        for t, df in self._fetch_rows(want).items():
+            self.frames[t] = _merge_by_id(self.frames[t], df[df["id"] != ""])
+
+# ==========================
+# Delta write-back
+# ==========================
+# 바뀐 행만 해당 탭에 반영한다.
+#  - 시트에 이미 있는 id -> batch_update (그 행 범위만)
+#  - 새 id             -> append_rows
+# 워크시트/헤더는 탭마다 처음 한 번 읽어서 기억하고, id -> 시트 행 번호는 쓸 때마다 id 열을
+# 다시 읽어 정한다 (누가 시트에서 행을 지우거나 정렬하면 예전 행 번호가 다른 행을 가리킨다).
+def _col_letter(n: int) -> str:
+    s = ""
+    while n > 0:
+        n, r = divmod(n - 1, 26)
+        s = chr(65 + r) + s
+    return s
+
+def _status_code(e: Exception):
+    code = getattr(e, "code", None)
+    if code is None:
+        code = getattr(getattr(e, "response", None), "status_code", None)
+    return code
+
+class SheetWriter:
+    def __init__(self, book, max_retries: int=6, sleep=time.sleep):
+        self.book  = book
+        self.max_retries = max_retries
+        self.sleep = sleep
+        self._sheets: Dict[str, tuple] = {}   # tab -> (worksheet, header)
+
+    def _call(self, fn, *args, **kwargs):
+        # 429(요청 한도 초과)는 지수 백오프로 재시도
+        for attempt in range(self.max_retries + 1):
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if _status_code(e) != 429 or attempt == self.max_retries:
+                    raise
+                self.sleep(min(64.0, 2 ** attempt) + random.random())
+
+    def _load_index(self, tab: str) -> tuple:
+        """-> (worksheet, header, {id: 행 번호}). id 열은 매번 새로 읽는다 (API 1회)"""
+        if tab not in self._sheets:
+            ws = self._call(self.book.worksheet, tab)
+            self._sheets[tab] = (ws, list(self._call(ws.row_values, 1)))
+        ws, header = self._sheets[tab]
+        ids = self._call(ws.col_values, header.index("id") + 1) if "id" in header else []
+        return ws, header, {str(v): i + 1 for i, v in enumerate(ids) if i > 0 and str(v) != ""}
+
+    def write_rows(self, tab: str, rows: List[dict]):
+        """rows(같은 id 는 하나만)를 탭에 반영한다: 갱신은 batch_update 1회, 추가는 append_rows 1회"""
+        if not rows:
+            return
+        ws, header, pos = self._load_index(tab)
+        data = []
+        new_cols = [c for c in rows[0] if c not in header]
+        if new_cols or not header:
+            header = header + new_cols
+            data.append({"range": f"A1:{_col_letter(len(header))}1", "values": [header]})
+        width = _col_letter(len(header))
+
+        inserts = []
+        for r in rows:
+            i = pos.get(str(r["id"]))
+            if i is None:
+                inserts.append([r.get(h, "") for h in header])
+            else:   # 로컬에 없는 열(None)은 건너뛰어 시트 값 유지
+                data.append({"range": f"A{i}:{width}{i}", "values": [[r.get(h) for h in header]]})
+
+        if data:
+            self._call(ws.batch_update, data, value_input_option="USER_ENTERED")
+        if inserts:
+            self._call(ws.append_rows, inserts, value_input_option="USER_ENTERED", table_range="A1")
+        self._sheets[tab] = (ws, header)
+
+# ==========================
+# Write-behind outbox + worker
+# ==========================
+# 로컬 저장소가 기준이다. save_* 가 반영한 변경 행은 디스크의 outbox(SQLite)에
+# 쌓이고, 백그라운드 스레드(SyncWorker)가 시트로 내보낸다.
+# 화면(rerun)은 네트워크를 기다리지 않는다. 시트가 느리거나 끊겨도 outbox 에 남아
+# 있다가 다시 연결되면 재시도한다.
+class Outbox:
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._con as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("CREATE TABLE IF NOT EXISTS outbox (seq INTEGER PRIMARY KEY AUTOINCREMENT, tab TEXT, row TEXT)")
+            con.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)")
+
+    def put(self, tab: str, rows: pd.DataFrame):
+        """storage.set_write_listener 에 그대로 등록할 수 있는 형태 (tab, 문자열 프레임)"""
+        if rows.empty:
+            return
+        recs = [(tab, json.dumps(r, ensure_ascii=False)) for r in rows.to_dict("records")]
+        with self._lock, self._con as con:
+            con.executemany("INSERT INTO outbox (tab, row) VALUES (?, ?)", recs)
+
+    def peek(self, limit: int=500) -> List[tuple]:
+        with self._lock:
+            cur = self._con.execute("SELECT seq, tab, row FROM outbox ORDER BY seq LIMIT ?", (limit,))
+            return [(seq, tab, json.loads(row)) for seq, tab, row in cur.fetchall()]
+
+    def ack(self, upto_seq: int):
+        with self._lock, self._con as con:
+            con.execute("DELETE FROM outbox WHERE seq <= ?", (upto_seq,))
+
+    def depth(self) -> int:
+        with self._lock:
+            return self._con.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def get_meta(self, k: str, default: str="") -> str:
+        with self._lock:
+            row = self._con.execute("SELECT v FROM meta WHERE k = ?", (k,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, k: str, v: str):
+        with self._lock, self._con as con:
+            con.execute("INSERT INTO meta (k, v) VALUES (?, ?) ON CONFLICT(k) DO UPDATE SET v = excluded.v", (k, v))
+
+class SyncWorker(threading.Thread):
+    """
+    outbox 를 시트로 내보내는 데몬 스레드.
+    - 변경이 들어오면(notify) coalesce 초 동안 더 모은 뒤 한 번에 보낸다.
+    - 실패하면 5초부터 최대 5분까지 간격을 늘려 재시도한다.
+    - pull_every 초마다(또는 request_pull) 탭을 다시 읽어 frames 에 둔다.
+    book_factory 는 워커 스레드 안에서 처음 필요할 때 불린다 (인증도 화면을 막지 않음).
+    """
+    def __init__(self, outbox: Outbox, book_factory, pull_every: float=300, coalesce: float=2.0,
+                 batch: int=500, idle: float=30):
+        super().__init__(name="sheets-sync", daemon=True)
+        self.outbox = outbox
+        self.book_factory = book_factory
+        self.pull_every = pull_every
+        self.coalesce = coalesce
+        self.batch = batch
+        self.idle = idle
+        self.frames: Dict[str, pd.DataFrame] = {}
+        self.pulled_at: float = 0.0
+        self.last_error: str = ""
+        self._book = None
+        self._writer: SheetWriter|None = None
+        self._puller: IncrementalPuller|None = None
+        self._wake = threading.Event()
+        self._pull_req = threading.Event()
+        self._stop_evt = threading.Event()
+
+    # --- 화면 쪽에서 부르는 것들 (즉시 반환) ---
+    def enqueue(self, tab: str, rows: pd.DataFrame):
+        """storage 쓰기 리스너: outbox 에 넣고 워커를 깨운다 (디스크 쓰기만, 네트워크 없음)"""
+        if tab not in TABS:   # 시트에 탭이 없는 로컬 전용 테이블 (moves 등)
+            return
+        self.outbox.put(tab, rows)
+        self._wake.set()
+
+    def request_pull(self):
+        self._pull_req.set()
+        self._wake.set()
+
+    def stop(self):
+        self._stop_evt.set()
+        self._wake.set()
+
+    @property
+    def last_sync(self) -> str:
+        return self.outbox.get_meta("last_sync")
+
+    # --- 워커 ---
+    def _get_writer(self) -> SheetWriter:
+        if self._writer is None:
+            self._book = self.book_factory()
+            self._writer = SheetWriter(self._book)
+        return self._writer
+
+    def drain(self) -> int:
+        """outbox 가 빌 때까지 보낸다. 보낸 항목 수를 반환 (실패하면 예외, 항목은 남음)"""
+        sent = 0
+        while True:
+            items = self.outbox.peek(self.batch)
+            if not items:
+                return sent
+            writer = self._get_writer()
+            by_tab: Dict[str, Dict[str, dict]] = {}
+            for _, tab, row in items:   # 같은 id 는 마지막 값만
+                by_tab.setdefault(tab, {})[str(row.get("id", ""))] = row
+            for tab, rows in by_tab.items():
+                writer.write_rows(tab, list(rows.values()))
+            self.outbox.ack(items[-1][0])
+            self.outbox.set_meta("last_sync", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            sent += len(items)
+
+    def pull(self):
+        if self._book is None:
+            self._get_writer()
+        if self._puller is None or self._puller.book is not self._book:
+            self._puller = IncrementalPuller(self._book)
+        self.frames = self._puller.pull()
+        self.pulled_at = time.time()
+
+    def run(self):
+        backoff = 0.0
+        while not self._stop_evt.is_set():
+            woke = self._wake.wait(self.idle if not backoff else backoff)
+            self._wake.clear()
+            if self._stop_evt.is_set():
+                break
+            if woke and self.coalesce:
+                self._stop_evt.wait(self.coalesce)   # 연속 클릭 모으기
+            try:
+                self.drain()
+                if self._pull_req.is_set() or time.time() - self.pulled_at >= self.pull_every:
+                    self._pull_req.clear()
+                    self.pull()
+                self.last_error = ""
+                backoff = 0.0
+            except Exception as e:
+                self.last_error = str(e)
+                self._writer = None if _status_code(e) in (401, 403) else self._writer
+                backoff = min(300.0, backoff * 2 or 5.0)
@@ -0,0 +1,684 @@
+import os, io, sys, json, time, sqlite3, threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List
+
+import pandas as pd
+
+# ==========================
+# Append-only journal
+# ==========================
+# members.csv / sessions.csv / schedule.csv 를 매번 통째로 다시 쓰지 않고,
+# 바뀐 행만 <이름>.journal.jsonl 에 추가한다.
+# 읽을 때는 base CSV + journal 을 id 기준으로 재생(마지막 기록 우선)한다.
+JOURNAL_COMPACT_ROWS  = 500    # journal 이 이 행 수를 넘으면 base CSV 로 병합
+JOURNAL_COMPACT_RATIO = 0.5    # 또는 base 행 수 대비 이 비율을 넘으면 병합
+
+# 테이블에 이 컬럼이 있으면 write_table 이 바뀐 행마다 버전 스탬프를 찍는다
+# (시트 증분 읽기용). 변경 판단(hash)에서는 제외한다.
+VERSION_COL = "updated_at"
+
+_snapshots: Dict[Path, tuple] = {}     # path -> (columns, id별 row hash) : 마지막으로 읽거나 쓴 상태
+_journal_rows: Dict[Path, int] = {}    # path -> journal 행 수
+# 모듈 상태(_snapshots/_journal_rows/_cache/_part_of)는 앱 스크립트 스레드와 피드(HTTP) 스레드가 같이 쓴다.
+# 쓰기/복원/파티션 나누기와 read_table(읽기+스냅샷)은 통째로, 캐시는 dict 를 만질 때만 잡는다
+# (같은 스레드에서 다시 잡을 수 있게 RLock)
+_lock = threading.RLock()
+
+def journal_path(path: Path) -> Path:
+    return path.with_name(path.stem + ".journal.jsonl")
+
+def _as_text(df: pd.DataFrame) -> pd.DataFrame:
+    # to_csv 가 쓰는 것과 같은 문자열 표현(NaN/NaT -> "")
+    return df.astype(object).where(df.notna(), "").astype(str)
+
+_last_stamp = 0
+
+def version_stamp() -> str:
+    """프로세스 안에서 단조 증가하는 버전 스탬프 "YYYYMMDDTHHMMSSmmm" (고정 길이 -> 문자열 비교 가능).
+    숫자/날짜로 보이지 않는 형태라 시트(USER_ENTERED)에서도 글자 그대로 남는다."""
+    global _last_stamp
+    _last_stamp = max(time.time_ns() // 1_000_000, _last_stamp + 1)
+    return datetime.fromtimestamp(_last_stamp / 1000).strftime("%Y%m%dT%H%M%S") + f"{_last_stamp % 1000:03d}"
+
+def _content_hashes(x: pd.DataFrame):
+    return pd.util.hash_pandas_object(x.drop(columns=VERSION_COL, errors="ignore"), index=False)
+
+def _row_hashes(x: pd.DataFrame) -> pd.Series:
+    h = _content_hashes(x)
+    h.index = x["id"].to_numpy()
+    return h[~h.index.duplicated(keep="last")]
+
+def _read_journal(path: Path) -> List[dict]:
+    jp = journal_path(path)
+    if not jp.exists():
+        _journal_rows[path] = 0
+        return []
+    rows = []
+    with open(jp, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                continue   # 쓰다 끊긴 마지막 줄 등은 무시
+    _journal_rows[path] = len(rows)
+    return rows
+
+def _replay(base: pd.DataFrame, rows: List[dict]) -> pd.DataFrame:
+    j = pd.DataFrame(rows, dtype=str).fillna("").drop_duplicates("id", keep="last")
+    cols = list(base.columns) + [c for c in j.columns if c not in base.columns]
+    base = base.reindex(columns=cols, fill_value="")
+    j = j.reindex(columns=cols, fill_value="")
+
+    where = pd.Series(range(len(base)), index=base["id"].to_numpy())
+    where = where[~where.index.duplicated(keep="last")]
+    pos = where.reindex(j["id"].to_numpy()).to_numpy()
+    hit = ~pd.isna(pos)
+    if hit.any():
+        base.iloc[pos[hit].astype(int)] = j[hit].to_numpy()
+    if (~hit).any():
+        base = pd.concat([base, j[~hit]], ignore_index=True)
+    return base
+
+def _read_merged(path: Path) -> pd.DataFrame:
+    df = pd.read_csv(path, dtype=str, encoding="utf-8-sig").fillna("")
+    rows = _read_journal(path)
+    return _replay(df, rows) if rows else df
+
+def read_table(path: Path) -> pd.DataFrame:
+    """전체 테이블(dtype=str). csv: base CSV + journal (월 파티션이면 모든 파티션) / sqlite: 같은 이름의 테이블"""
+    if BACKEND == "csv" and path in _partitions:
+        return _part_read(path)   # 스냅샷은 파티션 파일별로
+    with _lock:   # 읽기와 스냅샷 저장을 한 번에 (사이에 다른 스레드가 쓰면 새 스냅샷을 읽은 옛 내용으로 덮는다)
+        df = _sql_read(path) if BACKEND == "sqlite" else _read_merged(path)
+        _snapshots[path] = (tuple(df.columns), _row_hashes(df))
+    return df
+
+def query_table(path: Path, start: datetime|None=None, end: datetime|None=None,
+                date_col: str="날짜", **eq) -> pd.DataFrame:
+    """
+    [start, end) 기간 + 컬럼 일치(eq) 조건에 맞는 행만 반환한다.
+    sqlite 에서는 인덱스 range scan, csv 에서는 읽은 뒤 필터 (월 파티션이면 기간에 걸친 파티션만 읽음).
+    예) query_table(SCHEDULE_CSV, start, end) / query_table(SESSIONS_CSV, 이름="홍길동")
+    """
+    if BACKEND == "sqlite":
+        return _sql_read(path, start, end, date_col, eq)
+    if path in _partitions:
+        df = _part_read(path, _part_keys(path, start, end))
+    else:
+        df = read_table(path)
+    mask = pd.Series(True, index=df.index)
+    if start is not None or end is not None:
+        d = pd.to_datetime(df[date_col], errors="coerce")
+        if start is not None: mask &= d >= start
+        if end is not None:   mask &= d < end
+    for c, v in eq.items():
+        mask &= df[c] == str(v)
+    return df[mask]
+
+def _write_full(path: Path, x: pd.DataFrame):
+    tmp = path.with_name(path.name + ".tmp")
+    x.to_csv(tmp, index=False, encoding="utf-8-sig")
+    os.replace(tmp, path)
+    journal_path(path).unlink(missing_ok=True)
+    _journal_rows[path] = 0
+    _snapshots[path] = (tuple(x.columns), _row_hashes(x))
+
+def write_table(path: Path, df: pd.DataFrame):
+    """
+    바뀐 행(새 id 포함)만 journal 에 추가한다.
+    df 에 없는 행은 지우지 않는다(부분 프레임 저장 가능).
+    컬럼 구성이 바뀌었거나 journal 이 커지면 base CSV 로 병합(compact)한다.
+    """
+    with _lock:
+        x = _as_text(df)
+        invalidate(path)
+        if BACKEND == "sqlite":
+            changed = _sql_write(path, x)
+        elif path in _partitions:
+            changed = _part_write(path, x)
+        else:
+            changed = _csv_write(path, x)
+            _csv_bump_seq(path, x if changed is None else changed)
+        if changed is not None and not changed.empty:
+            _notify(path, changed)
+
+def _csv_write(path: Path, x: pd.DataFrame) -> pd.DataFrame|None:
+    # 반영한 변경 행 (컬럼 구성 변경/새 파일로 전체를 쓴 경우는 None)
+    if path not in _snapshots and path.exists():
+        read_table(path)
+    snap = _snapshots.get(path)
+    if snap is None or snap[0] != tuple(x.columns) or not path.exists():
+        if snap is not None and path.exists():
+            base = _as_text(_read_merged(path))
+            if len(x):
+                base = _replay(base, x.to_dict("records"))
+            x = base.reindex(columns=list(x.columns) + [c for c in base.columns if c not in x.columns], fill_value="")
+        _write_full(path, x)
+        return None
+
+    changed, hs = _diff(snap, x)
+    if changed.empty:
+        return changed
+
+    n = _journal_rows.get(path, 0) + len(changed)
+    if n > max(JOURNAL_COMPACT_ROWS, JOURNAL_COMPACT_RATIO * len(snap[1])):
+        _write_full(path, _replay(_as_text(_read_merged(path)), changed.to_dict("records")))
+    else:
+        with open(journal_path(path), "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in changed.to_dict("records")))
+        _journal_rows[path] = n
+        _snapshots[path] = (snap[0], pd.concat([snap[1].drop(hs.index, errors="ignore"), hs]))
+    return changed
+
+# --- 변경 알림 (예: 구글 시트 write-back) ---
+# write_table 이 실제로 반영한 변경 행(문자열 프레임)을 fn(table, rows) 로 넘긴다.
+# 컬럼 구성이 바뀌어 전체를 다시 쓴 경우(마이그레이션)와 replace_table(복원)은 알리지 않는다.
+_listeners: Dict[str, object] = {}
+
+def set_write_listener(key: str, fn):
+    """key 별로 하나만 등록된다 (rerun 마다 불러도 중복되지 않음). fn=None 이면 해제."""
+    if fn is None:
+        _listeners.pop(key, None)
+    else:
+        _listeners[key] = fn
+
+def _notify(path: Path, rows: pd.DataFrame):
+    for fn in list(_listeners.values()):
+        fn(path.stem, rows)
+
+def _diff(snap: tuple, x: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
+    # 스냅샷과 hash 가 다른 행(새 id 포함)과 그 행들의 hash. 바뀐 행에는 버전 스탬프를 찍는다.
+    hashes = _content_hashes(x).to_numpy()
+    prev = snap[1].reindex(x["id"].to_numpy(), fill_value=0).to_numpy()   # 새 id -> 0
+    diff = hashes != prev
+    changed = x[diff]
+    if VERSION_COL in x.columns and not changed.empty:
+        changed = changed.assign(**{VERSION_COL: version_stamp()})
+    hs = pd.Series(hashes[diff], index=changed["id"].to_numpy())
+    return changed, hs[~hs.index.duplicated(keep="last")]
+
+def compact_table(path: Path):
+    """journal 을 base CSV 에 병합하고 journal 을 비운다."""
+    with _lock:
+        if BACKEND != "csv":
+            return
+        for p in (_part_files(path) if path in _partitions else [path]):
+            if journal_path(p).exists():
+                _write_full(p, _read_merged(p))
+
+def create_table(path: Path, cols: List[str]):
+    """테이블이 없으면 헤더만 있는 빈 테이블을 만든다 (csv / 월 파티션)."""
+    if path in _partitions and BACKEND == "csv":
+        if not partition_dir(path).is_dir():
+            _part_init(path, pd.DataFrame(columns=cols))
+    elif not path.exists() and not partition_dir(path).is_dir():
+        pd.DataFrame(columns=cols).to_csv(path, index=False, encoding="utf-8-sig")
+
+def table_bytes(path: Path) -> bytes:
+    """백업용: journal(또는 sqlite)까지 반영된 CSV bytes (파일은 건드리지 않음)"""
+    if BACKEND == "sqlite":
+        return _sql_read(path).to_csv(index=False).encode("utf-8-sig")
+    if path not in _partitions and not journal_path(path).exists():
+        return path.read_bytes()
+    return _read_csv_table(path).to_csv(index=False).encode("utf-8-sig")
+
+def replace_table(path: Path, raw: bytes):
+    """복원 등으로 테이블 전체를 CSV bytes 로 교체한다(예전 journal/스냅샷은 버림)."""
+    with _lock:
+        _snapshots.pop(path, None)
+        invalidate(path)
+        df = pd.read_csv(io.BytesIO(raw), dtype=str, encoding="utf-8-sig").fillna("")
+        if BACKEND == "sqlite":
+            with _conn() as con:
+                con.execute(f'DROP TABLE IF EXISTS "{path.stem}"')
+                con.execute("DELETE FROM _seq WHERE name = ?", (path.stem,))   # 다음 할당 때 새 데이터로 초기화
+                _sql_load(con, path.stem, df)
+            return
+        with _id_lock:   # 카운터는 복원한 데이터의 최댓값 뒤에서 다시 시작
+            _csv_set_seq(path, _max_id(df) + 1)
+        if path in _partitions:
+            for p in _part_files(path):
+                _snapshots.pop(p, None)
+                p.unlink()
+                journal_path(p).unlink(missing_ok=True)
+            _part_init(path, df)
+            return
+        path.write_bytes(raw)
+        journal_path(path).unlink(missing_ok=True)
+        _journal_rows.pop(path, None)
+
+# ==========================
+# mtime 캐시
+# ==========================
+# Streamlit 은 위젯을 건드릴 때마다 app.py 전체를 다시 실행한다.
+# 파일(path, mtime, size)이 그대로면 이전에 파싱한 결과를 그대로 돌려준다.
+# 이 모듈은 rerun 사이에도 살아 있으므로 캐시도 유지된다.
+_cache: Dict[object, tuple] = {}   # key -> (signature, value)
+
+def file_signature(paths: List[Path]) -> tuple:
+    sig = []
+    for p in paths:
+        try:
+            stt = os.stat(p)
+            sig.append((str(p), stt.st_mtime_ns, stt.st_size))
+        except FileNotFoundError:
+            sig.append((str(p), None, None))
+    return tuple(sig)
+
+def table_files(path: Path, start: datetime|None=None, end: datetime|None=None) -> List[Path]:
+    """테이블(월 파티션이면 start~end 에 걸친 파티션) 내용을 결정하는 파일들 (캐시 키)"""
+    if BACKEND == "sqlite":
+        return [SQLITE_DB, SQLITE_DB.with_name(SQLITE_DB.name + "-wal")]
+    if path in _partitions:
+        ranged = start is not None or end is not None
+        keys = _month_range(start, end) if start is not None and end is not None else _part_keys(path, start, end)
+        files = [_part_path(path, k) for k in keys] if ranged else _part_files(path)
+        return [f for p in files for f in (p, journal_path(p))]
+    return [path, journal_path(path)]
+
+def cached_load(key, paths: List[Path], loader, extra=None):
+    """paths 의 서명(+extra)이 같으면 loader 를 다시 부르지 않는다."""
+    sig = (file_signature(paths), extra)
+    with _lock:
+        hit = _cache.get(key)
+    if hit is not None and hit[0] == sig:
+        return hit[1]
+    val = loader()
+    with _lock:
+        _cache[key] = (sig, val)
+    return val
+
+def cached_peek(key, paths: List[Path], extra=None):
+    """cached_load 와 같은 조건(서명 일치)일 때만 캐시된 값, 아니면 None (loader 는 부르지 않음)"""
+    with _lock:
+        hit = _cache.get(key)
+    return hit[1] if hit is not None and hit[0] == (file_signature(paths), extra) else None
+
+def invalidate(path: Path):
+    """path 와 관련된 캐시를 버린다 (save_* 에서 호출)."""
+    with _lock:
+        for k in [k for k in _cache if k == path or (isinstance(k, tuple) and k[0] == path)]:
+            _cache.pop(k, None)
+
+def cached_table(path: Path, parse, start: datetime|None=None, end: datetime|None=None,
+                 date_col: str="날짜") -> pd.DataFrame:
+    """
+    read_table/query_table + parse 결과를 캐시해서 돌려준다.
+    돌려주는 프레임은 캐시와 데이터를 공유하는 얕은 복사본이다
+    (app 은 copy_on_write 모드라 수정해도 캐시는 바뀌지 않는다).
+    """
+    ranged = start is not None or end is not None
+    if not ranged or (BACKEND == "csv" and path not in _partitions):
+        df = cached_load(path, table_files(path), lambda: parse(read_table(path)))
+        if ranged and not df.empty:
+            mask = pd.Series(True, index=df.index)
+            if start is not None: mask &= df[date_col] >= start
+            if end is not None:   mask &= df[date_col] < end
+            df = df[mask]
+    else:   # sqlite range scan / 월 파티션 중 그 기간 파티션만
+        df = cached_load((path, "range"), table_files(path, start, end),
+                         lambda: parse(query_table(path, start, end, date_col)), extra=(start, end))
+    return df.copy(deep=False)
+
+# ==========================
+# 월 파티션 (csv)
+# ==========================
+# 날짜로 기간 조회하는 테이블(schedule/sessions)은 <이름>/YYYY-MM.csv 로 나눠 저장할 수 있다.
+# 파티션 하나하나는 보통 테이블과 같은 base CSV + journal 이고, 날짜가 없는 행은 <이름>/undated.csv.
+#  - 기간 조회(query_range / cached_table(start, end))는 그 기간에 걸친 파티션만 읽는다.
+#  - 전체 읽기도 파티션별로 캐시하므로, 이번 달에 한 줄 추가하면 이번 달 파티션만 다시 읽는다.
+#  - 날짜가 바뀌어 다른 달로 옮겨 간 행은 예전 파티션에서 지운다.
+UNDATED = "undated"
+_partitions: Dict[Path, str] = {}            # 테이블 path -> 날짜 컬럼
+_part_of: Dict[Path, Dict[str, str]] = {}    # 테이블 path -> {id: 파티션 key}
+
+def partition_dir(path: Path) -> Path:
+    return path.with_suffix("")
+
+def _part_path(path: Path, key: str) -> Path:
+    return partition_dir(path) / f"{key}.csv"
+
+def partition_table(path: Path, date_col: str="날짜"):
+    """
+    csv 백엔드에서 path 를 월 파티션으로 저장한다 (rerun 마다 불러도 됨).
+    예전 단일 CSV(+journal)가 있으면 처음 한 번 파티션으로 나누고 원본은 <이름>.csv.bak 으로 남긴다.
+    """
+    with _lock:
+        _partitions[path] = date_col
+        if BACKEND != "csv" or partition_dir(path).is_dir() or not path.exists():
+            return
+        _part_init(path, _read_merged(path))
+        os.replace(path, path.with_name(path.name + ".bak"))
+        journal_path(path).unlink(missing_ok=True)
+        _snapshots.pop(path, None)
+
+def attach_partitions(path: Path, date_col: str="날짜") -> bool:
+    """
+    읽기만 하는 쪽(따로 띄운 피드 등)용: 앱이 이미 월 파티션으로 나눈 테이블이면 파티션으로 읽도록 등록만 한다.
+    partition_table 과 달리 파일을 나누거나 옮기지 않는다. 파티션으로 읽으면 True.
+    """
+    if BACKEND == "csv" and path not in _partitions and partition_dir(path).is_dir():
+        with _lock:
+            _partitions[path] = date_col
+    return path in _partitions
+
+def _part_init(path: Path, df: pd.DataFrame):
+    # 파티션 디렉터리를 df 로 새로 채운다 (undated.csv 는 빈 헤더라도 항상 만든다)
+    partition_dir(path).mkdir(parents=True, exist_ok=True)
+    df = _as_text(df)
+    keys = _month_keys(df[_partitions[path]]) if len(df) else pd.Series([], dtype=object)
+    _write_full(_part_path(path, UNDATED), df[keys == UNDATED] if len(df) else df)
+    for k, g in df.groupby(keys):
+        if k != UNDATED:
+            _write_full(_part_path(path, k), g)
+    _part_of[path] = dict(zip(df["id"], keys)) if len(df) else {}
+
+def _month_keys(dates: pd.Series) -> pd.Series:
+    # "2024-05-03 10:00:00" -> "2024-05" (다른 포맷은 파싱, 날짜가 아니면 undated)
+    k = dates.astype(str).str.slice(0, 7)
+    bad = ~k.str.fullmatch(r"\d{4}-\d{2}")
+    if bad.any():
+        d = pd.to_datetime(dates[bad], errors="coerce", format="mixed")
+        k[bad] = d.dt.strftime("%Y-%m").fillna(UNDATED)
+    return k
+
+def _month_range(start: datetime, end: datetime) -> List[str]:
+    # [start, end) 가 걸친 달들
+    last = pd.Timestamp(end) - pd.Timedelta(microseconds=1)
+    return [p.strftime("%Y-%m") for p in pd.period_range(pd.Timestamp(start), last, freq="M")] if last >= pd.Timestamp(start) else []
+
+def _part_files(path: Path) -> List[Path]:
+    d = partition_dir(path)
+    return sorted(d.glob("*.csv")) if d.is_dir() else []
+
+def _part_keys(path: Path, start: datetime|None=None, end: datetime|None=None) -> List[str]:
+    """있는 파티션 key 중 [start, end) 에 걸친 것 (기간을 주면 undated 는 제외)"""
+    keys = [p.stem for p in _part_files(path)]
+    if start is None and end is None:
+        return keys
+    lo = pd.Timestamp(start).strftime("%Y-%m") if start is not None else ""
+    hi = (pd.Timestamp(end) - pd.Timedelta(microseconds=1)).strftime("%Y-%m") if end is not None else "9999-99"
+    return [k for k in keys if k != UNDATED and lo <= k <= hi]
+
+def _part_read(path: Path, keys: List[str]|None=None) -> pd.DataFrame:
+    # 파티션들을 (파일 서명별 캐시로) 읽어 이어 붙인다. keys=None 이면 전부 + id 위치 갱신
+    frames = []
+    for k in (keys if keys is not None else [p.stem for p in _part_files(path)]):
+        p = _part_path(path, k)
+        if p.exists():
+            frames.append((k, cached_load(("part", p), [p, journal_path(p)], lambda p=p: read_table(p))))
+    if keys is None:
+        with _lock:
+            _part_of[path] = {i: k for k, f in frames for i in f["id"]}
+    if not frames:   # 기간에 파티션이 없으면 컬럼만 (undated.csv 헤더)
+        u = _part_path(path, UNDATED)
+        return read_table(u).iloc[:0] if u.exists() else pd.DataFrame()
+    return pd.concat([f for _, f in frames], ignore_index=True).fillna("")
+
+def _read_csv_table(path: Path) -> pd.DataFrame:
+    # 단일 CSV 든 파티션 디렉터리든 (백업/SQLite 이전용, 캐시/스냅샷 안 건드림)
+    if partition_dir(path).is_dir():
+        frames = [_read_merged(p) for p in _part_files(path)]
+        return pd.concat(frames, ignore_index=True).fillna("") if frames else pd.DataFrame()
+    return _read_merged(path)
+
+def query_range(path: Path, start: datetime|None, end: datetime|None, date_col: str="날짜") -> pd.DataFrame:
+    """[start, end) 의 행만 (dtype=str). 월 파티션이면 그 기간에 걸친 파티션 파일만 읽는다."""
+    return query_table(path, start, end, date_col)
+
+def _part_write(path: Path, x: pd.DataFrame) -> pd.DataFrame|None:
+    if not partition_dir(path).is_dir():
+        _part_init(path, x.iloc[:0])
+    if path not in _part_of:
+        _part_read(path)
+    where = _part_of[path]
+    keys = _month_keys(x[_partitions[path]]) if len(x) else pd.Series([], dtype=object)
+
+    # 다른 달로 옮겨 간 행은 예전 파티션에서 지운다 (작은 파티션 하나만 다시 씀)
+    old = x["id"].map(where)
+    moved = old.notna() & (old != keys)
+    for k, ids in x.loc[moved, "id"].groupby(old[moved]):
+        p = _part_path(path, k)
+        if p.exists():
+            cur = _as_text(_read_merged(p))
+            _write_full(p, cur[~cur["id"].isin(set(ids))])
+
+    out, full = [], False
+    for k, g in x.groupby(keys):
+        p = _part_path(path, k)
+        if not p.exists():   # 새 달: 헤더만 만든 뒤 diff 로 쓰면 모든 행이 변경(스탬프/알림 포함)
+            _write_full(p, g.iloc[:0])
+        ch = _csv_write(p, g)
+        if ch is None:
+            full = True
+        else:
+            out.append(ch)
+    where.update(zip(x["id"], keys))
+    _csv_bump_seq(path, x)
+    if full and not out:
+        return None
+    return pd.concat(out, ignore_index=True) if out else x.iloc[:0]
+
+# ==========================
+# SQLite backend (선택)
+# ==========================
+# use_backend("sqlite", DATA_DIR / "pilates.db") 이후 read_table/write_table/query_table 은
+# CSV 대신 같은 이름(members/sessions/schedule)의 SQLite 테이블을 쓴다. (WAL 모드)
+# 모든 값은 CSV 와 같은 TEXT 로 저장하므로 load_* 가 돌려주는 DataFrame 은 동일하다.
+BACKEND = "csv"          # "csv" | "sqlite"
+SQLITE_DB: Path|None = None
+SQLITE_INDEX_COLS = ["날짜", "이름", "지점", "상태"]
+
+_local = threading.local()   # Streamlit 세션(스레드)별 connection
+
+def use_backend(name: str, db_path: Path|None=None):
+    global BACKEND, SQLITE_DB
+    if name not in ("csv", "sqlite"):
+        raise ValueError(f"unknown storage backend: {name}")
+    if name == "sqlite" and db_path is None:
+        raise ValueError("sqlite backend needs db_path")
+    if (name, db_path) != (BACKEND, SQLITE_DB):
+        _snapshots.clear()
+    BACKEND, SQLITE_DB = name, db_path
+
+def _conn() -> sqlite3.Connection:
+    con = getattr(_local, "con", None)
+    if con is None or getattr(_local, "db", None) != SQLITE_DB:
+        con = sqlite3.connect(SQLITE_DB, check_same_thread=False)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.execute("CREATE TABLE IF NOT EXISTS _seq (name TEXT PRIMARY KEY, next INTEGER NOT NULL)")
+        _local.con, _local.db = con, SQLITE_DB
+    return con
+
+def _q(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+def has_sql_table(path: Path) -> bool:
+    row = _conn().execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (path.stem,)).fetchone()
+    return row is not None
+
+def _sql_columns(con: sqlite3.Connection, table: str) -> List[str]:
+    return [r[1] for r in con.execute(f"PRAGMA table_info({_q(table)})")]
+
+def _sql_ensure(con: sqlite3.Connection, table: str, cols: List[str]):
+    have = _sql_columns(con, table)
+    if not have:
+        defs = ", ".join(f"{_q(c)} TEXT PRIMARY KEY" if c == "id" else f"{_q(c)} TEXT" for c in cols)
+        con.execute(f"CREATE TABLE {_q(table)} ({defs})")
+        have = list(cols)
+    else:
+        for c in cols:
+            if c not in have:
+                con.execute(f"ALTER TABLE {_q(table)} ADD COLUMN {_q(c)} TEXT DEFAULT ''")
+                have.append(c)
+    for c in SQLITE_INDEX_COLS:
+        if c in have:
+            con.execute(f"CREATE INDEX IF NOT EXISTS {_q(f'ix_{table}_{c}')} ON {_q(table)} ({_q(c)})")
+
+def _sql_upsert(con: sqlite3.Connection, table: str, x: pd.DataFrame):
+    cols = list(x.columns)
+    sets = ", ".join(f"{_q(c)}=excluded.{_q(c)}" for c in cols if c != "id")
+    sql = (f"INSERT INTO {_q(table)} ({', '.join(map(_q, cols))}) VALUES ({', '.join('?' * len(cols))}) "
+           f"ON CONFLICT({_q('id')}) DO " + (f"UPDATE SET {sets}" if sets else "NOTHING"))
+    con.executemany(sql, x.to_numpy().tolist())
+
+def _dedupe_ids(df: pd.DataFrame) -> pd.DataFrame:
+    # PRIMARY KEY(id) 를 위해 예전 ensure_id 폴백(len+1)으로 생긴 중복 id 는 새 번호로 바꾼다.
+    dup = df["id"].duplicated(keep="first") | (df["id"] == "")
+    if dup.any():
+        top = pd.to_numeric(df["id"], errors="coerce").max()
+        top = 0 if pd.isna(top) else int(top)
+        df = df.copy()
+        df.loc[dup, "id"] = [str(top + i + 1) for i in range(int(dup.sum()))]
+    return df
+
+def _sql_load(con: sqlite3.Connection, table: str, df: pd.DataFrame):
+    _sql_ensure(con, table, list(df.columns))
+    _sql_upsert(con, table, _dedupe_ids(df))
+
+def _sql_read(path: Path, start=None, end=None, date_col: str="날짜", eq: dict|None=None) -> pd.DataFrame:
+    con, table = _conn(), path.stem
+    if not has_sql_table(path):
+        return pd.DataFrame(columns=["id"])
+    where, args = [], []
+    if start is not None:
+        where.append(f"{_q(date_col)} >= ?"); args.append(start.strftime("%Y-%m-%d %H:%M:%S"))
+    if end is not None:
+        where.append(f"{_q(date_col)} < ?");  args.append(end.strftime("%Y-%m-%d %H:%M:%S"))
+    for c, v in (eq or {}).items():
+        where.append(f"{_q(c)} = ?"); args.append(str(v))
+    sql = f"SELECT * FROM {_q(table)}" + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY rowid"
+    return pd.read_sql_query(sql, con, params=args).fillna("").astype(str)
+
+def _sql_write(path: Path, x: pd.DataFrame) -> pd.DataFrame|None:
+    # 반영한 변경 행을 돌려준다 (컬럼 구성 변경으로 전체를 쓴 경우/변경 없음은 None)
+    if path not in _snapshots:
+        read_table(path)
+    snap = _snapshots[path]
+    with _conn() as con:
+        if snap[0] != tuple(x.columns):
+            _sql_ensure(con, path.stem, list(x.columns))
+            _sql_upsert(con, path.stem, x)
+            _sql_bump_seq(con, path, x)
+            _snapshots.pop(path, None)   # 컬럼 구성이 바뀜 -> 다음 읽기에서 새로 만든다
+            return None
+        changed, hs = _diff(snap, x)
+        if changed.empty:
+            return None
+        _sql_upsert(con, path.stem, changed)
+        _sql_bump_seq(con, path, changed)   # 같은 트랜잭션
+    _snapshots[path] = (snap[0], pd.concat([snap[1].drop(hs.index, errors="ignore"), hs]))
+    return changed
+
+def migrate_csv_to_sqlite(paths: List[Path], db_path: Path, overwrite: bool=False) -> Dict[str, int]:
+    """
+    CSV(+journal) 테이블들을 SQLite 로 한 번에 옮긴다. 이미 있는 테이블은 overwrite=False 면 건너뛴다.
+    returns {table: 옮긴 행 수}
+    """
+    prev = (BACKEND, SQLITE_DB)
+    done = {}
+    try:
+        use_backend("sqlite", db_path)
+        with _conn() as con:
+            for p in paths:
+                if not p.exists() and not partition_dir(p).is_dir():
+                    continue
+                if has_sql_table(p):
+                    if not overwrite:
+                        continue
+                    con.execute(f"DROP TABLE {_q(p.stem)}")
+                df = _read_csv_table(p)
+                _sql_load(con, p.stem, df)
+                done[p.stem] = len(df)
+    finally:
+        use_backend(*prev)
+    return done
+
+# ==========================
+# ID allocator
+# ==========================
+# 테이블마다 "다음 id" 카운터를 데이터 옆에 둔다 (csv: <이름>.seq / sqlite: 같은 DB 의 _seq 테이블).
+# 카운터가 없을 때 한 번만 기존 id 최댓값으로 초기화하고(월 파티션이면 파티션 전체에서, 복원하면 복원한 데이터로
+# 다시), 이후 할당은 행 수와 무관하게 O(1).
+# write_table 이 카운터 이상인 id(외부 입력 등)를 쓰면 카운터를 그 뒤로 민다
+# (sqlite 는 행 쓰기와 같은 트랜잭션). 예약만 하고 쓰지 않은 id 는 비어 있는 채로 남는다.
+_id_lock = threading.Lock()
+
+def seq_path(path: Path) -> Path:
+    return path.with_name(path.stem + ".seq")
+
+def _max_id(df: pd.DataFrame) -> int:
+    if df.empty or "id" not in df.columns:
+        return 0
+    ids = pd.to_numeric(df["id"], errors="coerce")
+    return int(ids.max()) if ids.notna().any() else 0
+
+def next_ids(path: Path, n: int=1) -> List[str]:
+    """id n 개를 한 번에 예약한다 (단조 증가, 세션/스레드가 달라도 중복 없음)."""
+    with _id_lock:
+        if BACKEND == "sqlite":
+            with _conn() as con:
+                start = _sql_reserve(con, path, n)
+        else:
+            start = _csv_reserve(path, n)
+    return [str(i) for i in range(start, start + n)]
+
+def next_id(path: Path) -> str:
+    return next_ids(path, 1)[0]
+
+def _csv_seq(path: Path) -> int|None:
+    try:
+        return int(seq_path(path).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _csv_set_seq(path: Path, v: int):
+    sp = seq_path(path)
+    tmp = sp.with_name(sp.name + ".tmp")
+    tmp.write_text(str(v))
+    os.replace(tmp, sp)
+
+def _csv_reserve(path: Path, n: int) -> int:
+    cur = _csv_seq(path)
+    if cur is None:   # 월 파티션이면 path 는 .bak 으로 옮겨져 없다 -> 파티션 디렉터리에서 읽는다
+        have = path.exists() or partition_dir(path).is_dir()
+        cur = (_max_id(_read_csv_table(path)) if have else 0) + 1
+    _csv_set_seq(path, cur + n)
+    return cur
+
+def _csv_bump_seq(path: Path, rows: pd.DataFrame):
+    with _id_lock:
+        cur = _csv_seq(path)
+        if cur is not None and (m := _max_id(rows)) >= cur:
+            _csv_set_seq(path, m + 1)
+
+def _sql_reserve(con: sqlite3.Connection, path: Path, n: int) -> int:
+    upd = "UPDATE _seq SET next = next + ? WHERE name = ? RETURNING next"
+    row = con.execute(upd, (n, path.stem)).fetchone()
+    if row is None:   # 처음: 기존 최댓값으로 초기화
+        seed = 1
+        if has_sql_table(path):
+            seed = con.execute(f"SELECT COALESCE(MAX(CAST(id AS INTEGER)), 0) + 1 FROM {_q(path.stem)}").fetchone()[0]
+        con.execute("INSERT OR IGNORE INTO _seq VALUES (?, ?)", (path.stem, seed))
+        row = con.execute(upd, (n, path.stem)).fetchone()
+    return row[0] - n
+
+def _sql_bump_seq(con: sqlite3.Connection, path: Path, rows: pd.DataFrame):
+    m = _max_id(rows)
+    if m:
+        con.execute("UPDATE _seq SET next = MAX(next, ?) WHERE name = ?", (m + 1, path.stem))
+
+if __name__ == "__main__":
+    # python storage.py migrate [DATA_DIR]  ->  DATA_DIR/pilates.db
+    if len(sys.argv) >= 2 and sys.argv[1] == "migrate":
+        d = Path(sys.argv[2] if len(sys.argv) > 2 else ".")
+        res = migrate_csv_to_sqlite([d / "members.csv", d / "sessions.csv", d / "schedule.csv"], d / "pilates.db")
+        for t, n in res.items():
+            print(f"{t}: {n} rows")
+    else:
+        print("usage: python storage.py migrate [DATA_DIR]")
@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# 앱 모듈(storage.py, sheets.py ...)은 저장소 루트에 있다
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+pd.set_option("mode.copy_on_write", True)   # app.py 와 같은 모드로
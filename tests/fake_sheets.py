@@ -0,0 +1,115 @@
+"""
+gspread.Spreadsheet / Worksheet 에서 이 앱이 쓰는 메서드만 흉내 낸 오프라인 테스트 더블.
+호출은 book.calls 에 (메서드, 인자) 로 남으므로 API 호출 수를 셀 수 있다.
+book.fail_with 에 상태 코드(예: 429)를 넣으면 다음 호출들이 차례로 그 오류를 낸다.
+예) book = FakeSpreadsheet({"members": [["id","이름"], ["1","홍길동"]]})
+"""
+from typing import Dict, List
+
+
+class FakeAPIError(Exception):
+    def __init__(self, code: int):
+        super().__init__(f"fake API error {code}")
+        self.code = code
+
+def _slice(values: List[List], a1: str) -> List[List]:
+    # "'tab'" / "'tab'!1:1" / "'tab'!C2:C" / "'tab'!A5:F9" 범위 (빈 시작/끝은 시트 끝까지)
+    if "!" not in a1:
+        return [list(x) for x in values]
+    a, b = (a1.split("!", 1)[1].split(":") + [""])[:2]
+    def part(p, d_row, d_col):
+        letters = "".join(ch for ch in p if ch.isalpha())
+        digits  = p[len(letters):]
+        col = 0
+        for ch in letters.upper():
+            col = col * 26 + ord(ch) - 64
+        return (int(digits) if digits else d_row), (col or d_col)
+    width = max((len(r) for r in values), default=0)
+    r1, c1 = part(a, 1, 1)
+    r2, c2 = part(b or a, len(values), width)
+    return [list(r[c1 - 1:c2]) for r in values[r1 - 1:r2]]
+
+def _a1_to_rowcol(a1: str) -> tuple[int, int]:
+    letters = "".join(ch for ch in a1 if ch.isalpha())
+    col = 0
+    for ch in letters.upper():
+        col = col * 26 + ord(ch) - 64
+    return int(a1[len(letters):]), col
+
+class FakeWorksheet:
+    def __init__(self, book: "FakeSpreadsheet", title: str, values: List[List]|None=None):
+        self.book  = book
+        self.title = title
+        self.values = [[str(v) for v in r] for r in (values or [])]
+
+    def _hit(self, name: str, arg=None):
+        self.book._hit(name, arg if arg is not None else self.title)
+
+    def get_all_values(self) -> List[List[str]]:
+        self._hit("get_all_values")
+        return [list(r) for r in self.values]
+
+    def row_values(self, row: int) -> List[str]:
+        self._hit("row_values", (self.title, row))
+        return list(self.values[row - 1]) if row <= len(self.values) else []
+
+    def col_values(self, col: int) -> List[str]:
+        self._hit("col_values", (self.title, col))
+        out = [r[col - 1] if col <= len(r) else "" for r in self.values]
+        while out and out[-1] == "":
+            out.pop()
+        return out
+
+    def _set(self, row: int, col: int, v):
+        while len(self.values) < row:
+            self.values.append([])
+        r = self.values[row - 1]
+        while len(r) < col:
+            r.append("")
+        r[col - 1] = "" if v is None else str(v)
+
+    def batch_update(self, data: List[dict], **kwargs):
+        self._hit("batch_update", (self.title, len(data)))
+        for d in data:
+            row, col = _a1_to_rowcol(d["range"].split(":")[0])
+            for i, vals in enumerate(d["values"]):
+                for j, v in enumerate(vals):
+                    if v is not None:
+                        self._set(row + i, col + j, v)
+
+    def append_rows(self, values: List[List], **kwargs):
+        self._hit("append_rows", (self.title, len(values)))
+        for vals in values:
+            self.values.append(["" if v is None else str(v) for v in vals])
+
+    def get_all_records(self) -> List[dict]:
+        self._hit("get_all_records")
+        if not self.values:
+            return []
+        header = self.values[0]
+        return [dict(zip(header, r + [""] * (len(header) - len(r)))) for r in self.values[1:]]
+
+class FakeSpreadsheet:
+    def __init__(self, tabs: Dict[str, List[List]]|None=None):
+        self.calls: List[tuple] = []
+        self.fail_with: List[int] = []
+        self._sheets = {t: FakeWorksheet(self, t, v) for t, v in (tabs or {}).items()}
+
+    def _hit(self, name: str, arg):
+        self.calls.append((name, arg))
+        if self.fail_with:
+            raise FakeAPIError(self.fail_with.pop(0))
+
+    def worksheet(self, title: str) -> FakeWorksheet:
+        self._hit("worksheet", title)
+        if title not in self._sheets:
+            raise KeyError(title)
+        return self._sheets[title]
+
+    def values_batch_get(self, ranges: List[str], params=None) -> dict:
+        self._hit("values_batch_get", list(ranges))
+        out = []
+        for r in ranges:
+            title = r.split("!")[0].strip("'")
+            out.append({"range": r, "values": _slice(self._sheets[title].values, r)})
+        return {"valueRanges": out}
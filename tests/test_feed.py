@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from feed import IcsFeed
+from schema import SCHEDULE_COLS
+import storage
+from storage import partition_dir, partition_table
+
+def _schedule(tmp_path, when):
+    path = tmp_path / "schedule.csv"
+    rows = [{"id": "1", "날짜": when.strftime("%Y-%m-%d %H:%M:%S"), "지점": "F", "구분": "개인", "이름": "홍길동",
+             "상태": "예약됨"}]
+    pd.DataFrame(rows, columns=SCHEDULE_COLS).fillna("").to_csv(path, index=False, encoding="utf-8-sig")
+    return path
+
+def test_feed_reads_without_migrating_and_follows_app_partitions(tmp_path, monkeypatch):
+    path = _schedule(tmp_path, datetime.now().replace(microsecond=0) + timedelta(days=1))
+    feed = IcsFeed(path)
+    query = feed.parse_query({})
+    etag, _ = feed.validators(query)
+    assert b"UID:1@pilatesapp" in feed.render(query)
+    # 피드는 읽기만 한다: 단일 CSV 는 그대로
+    assert path.exists() and not partition_dir(path).exists()
+
+    partition_table(path)   # 앱(다른 프로세스)이 나중에 파티션으로 나눈 경우
+    monkeypatch.delitem(storage._partitions, path)   # 피드 프로세스에는 등록되어 있지 않다
+    assert not path.exists()
+    assert feed.validators(query)[0] != etag
+    assert b"UID:1@pilatesapp" in feed.render(query)
@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+from indexes import LastSessionIndex, MoveCatalog, MoveCounts, IncomeAggregates
+from schema import SESSIONS, SESSIONS_COLS, SCHEDULE, SCHEDULE_COLS, MOVES, MOVES_COLS, to_typed
+
+def _sessions(rows):
+    return to_typed(pd.DataFrame(rows, columns=SESSIONS_COLS).fillna(""), SESSIONS)
+
+def _catalog(names):
+    rows = [{"id": str(i + 1), "동작": n} for i, n in enumerate(names)]
+    return MoveCatalog(to_typed(pd.DataFrame(rows, columns=MOVES_COLS).fillna(""), MOVES))
+
+def test_last_session_index_on_empty_sessions():
+    # 새로 설치했을 때 (빈 세션) / 카테고리는 있지만 행이 없는 프레임
+    s = _sessions([{"id": "1", "날짜": "2026-09-01 10:00:00", "이름": "홍길동"}])
+    for empty in (_sessions([]), s[s["이름"] == "없음"]):
+        idx = LastSessionIndex(empty)
+        idx.add(empty)
+        assert idx.summary("홍길동") == "—"
+
+def test_last_session_index_keeps_latest_per_member():
+    s = _sessions([
+        {"id": "1", "날짜": "2026-09-01 10:00:00", "이름": "홍길동", "동작(리스트)": "A"},
+        {"id": "2", "날짜": "2026-09-03 10:00:00", "이름": "홍길동", "동작(리스트)": "B"},
+        {"id": "3", "날짜": "2026-09-02 10:00:00", "이름": "", "동작(리스트)": "C"},
+    ])
+    idx = LastSessionIndex(s)
+    assert idx.summary("홍길동") == "B" and "" not in idx.latest
+    idx.add(_sessions([{"id": "4", "날짜": "2026-09-05 10:00:00", "이름": "홍길동", "동작(리스트)": "D"}]))
+    assert idx.summary("홍길동") == "D"
+
+def test_move_counts_on_empty_sessions():
+    # 새로 설치한 뒤 첫 세션 저장: 빈 세션으로 만들고 새 행을 더한다
+    s = _sessions([{"id": "1", "날짜": "2026-09-01 10:00:00", "구분": "개인", "이름": "홍길동", "동작(리스트)": "A; B"}])
+    for empty in (_sessions([]), s[s["이름"] == "없음"]):
+        mc = MoveCounts(empty, _catalog(["A", "B"]))
+        mc.add(empty)
+        assert mc.counts.empty and not mc.names
+        mc.add(s)
+        assert mc.names == {"홍길동"} and mc.months == {"2026-09"}
+        assert mc.top("홍길동", "2026-09").to_dict() == {"A": 1, "B": 1}
+
+def test_income_aggregates_on_empty_tables():
+    sch = to_typed(pd.DataFrame([], columns=SCHEDULE_COLS), SCHEDULE)
+    agg = IncomeAggregates(_sessions([]), sch, lambda rows: pd.Series(0.0, index=rows.index))
+    assert agg.sessions.empty and agg.schedule.empty
+    agg.update_sessions(_sessions([{"id": "1", "날짜": "2026-09-01 10:00:00", "지점": "F", "구분": "개인",
+                                    "이름": "홍길동", "페이(총)": "50000", "페이(실수령)": "45000"}]))
+    assert agg.sessions.loc[("2026-09", "F", "개인"), "실수령"] == 45000
+
+@pytest.fixture
+def no_strftime(monkeypatch):
+    # 달력 컬럼(YM/주/요일...)이 있으면 집계는 날짜를 문자열로 바꾸지 않아야 한다
+    def fail(*args, **kwargs):
+        raise AssertionError("strftime called")
+    monkeypatch.setattr(pd.core.indexes.accessors.DatetimeProperties, "strftime", fail)
+    monkeypatch.setattr(pd.DatetimeIndex, "strftime", fail)
+
+def test_aggregates_use_calendar_columns_not_strftime(no_strftime):
+    s = _sessions([
+        {"id": "1", "날짜": "2026-09-01 10:00:00", "지점": "F", "구분": "개인", "이름": "홍길동",
+         "동작(리스트)": "A", "페이(총)": "35000", "페이(실수령)": "33845"},
+        {"id": "2", "날짜": "2025-12-30 10:00:00", "지점": "R", "구분": "그룹", "인원": "3",
+         "페이(총)": "40000", "페이(실수령)": "40000"},
+    ])
+    with pytest.raises(AssertionError):
+        s["날짜"].dt.strftime("%Y-%m")
+    sch = to_typed(pd.DataFrame([{"id": "1", "날짜": "2026-09-02 10:00:00", "지점": "F", "구분": "개인",
+                                  "상태": "No Show"}], columns=SCHEDULE_COLS).fillna(""), SCHEDULE)
+    agg = IncomeAggregates(s, sch, lambda rows: pd.Series(10000.0, index=rows.index))
+    agg.update_sessions(s.iloc[:1])
+    assert agg.monthly().set_index("YM")["합계"].to_dict() == {"2026-09": 43845, "2025-12": 40000}
+    assert agg.yearly().set_index("Y")["합계"].to_dict() == {2026: 43845, 2025: 40000}
+    assert len(agg.site_counts(["F", "R", "V"])) == 3
+    mc = MoveCounts(s, _catalog(["A"]))
+    assert mc.months == {"2026-09"} and mc.top("홍길동", "2026-09").to_dict() == {"A": 1}
@@ -0,0 +1,80 @@
+import itertools
+
+import pandas as pd
+
+import warnings
+
+from pay import price_frame, pay_one, rate_table, missing_gross
+
+def _ladder(site, session_type, headcount, settings, is_duet=False):
+    # pay.py 이전 app.calc_pay 의 if/else (지점은 이미 F/R/V)
+    if site == "F":
+        gross = 35000.0
+        return gross, round(gross * 0.967, 0)
+    if site == "R":
+        if session_type == "개인":
+            return (35000.0, 35000.0) if is_duet else (30000.0, 30000.0)
+        g = {2: 30000.0, 3: 40000.0, 1: 25000.0}.get(headcount, 30000.0)
+        return g, g
+    net = float(settings.get("visit_default_net", 0) or 0)
+    return net, net
+
+SETTINGS = [{}, {"visit_default_net": 45000}, {"visit_default_net": None}, {"visit_default_net": "0"}]
+CASES = list(itertools.product(["F", "R", "V"], ["개인", "그룹"], range(0, 7), [False, True]))
+
+def test_pay_one_matches_old_ladder():
+    for settings in SETTINGS:
+        for site, kind, n, duet in CASES:
+            assert pay_one(site, kind, n, settings, is_duet=duet) == _ladder(site, kind, n, settings, duet), \
+                (site, kind, n, duet, settings)
+
+def test_price_frame_matches_old_ladder():
+    df = pd.DataFrame(CASES, columns=["지점", "구분", "인원", "듀엣"])
+    for settings in SETTINGS:
+        got = price_frame(df, settings)
+        want = [_ladder(*c[:3], settings, c[3]) for c in CASES]
+        assert list(zip(got["gross"], got["net"])) == want, settings
+
+def test_new_group_tier_does_not_blank_earlier_rows():
+    # 4명 규칙은 2025-01-01 부터: 그 전 4명 그룹은 그 외(인원 0) 요율
+    settings = {"pay_rules": [{"시작": "2025-01-01", "지점": "R", "구분": "그룹", "인원": 4, "듀엣": False,
+                               "총액": 50000, "비율": 1.0}]}
+    assert pay_one("R", "그룹", 4, settings, when=pd.Timestamp("2024-03-01")) == (30000.0, 30000.0)
+    assert pay_one("R", "그룹", 4, settings, when=pd.Timestamp("2025-03-01")) == (50000.0, 50000.0)
+    df = pd.DataFrame({"지점": ["R", "R", "R"], "구분": ["그룹"] * 3, "인원": [4, 4, 3],
+                       "날짜": pd.to_datetime(["2025-02-01", "2024-02-01", "2024-02-01"])})
+    assert price_frame(df, settings)["gross"].tolist() == [50000.0, 30000.0, 40000.0]
+
+def test_rules_are_normalized_to_matchable_keys():
+    rule = lambda **kw: {"시작": "2025-01-01", "인원": 0, "듀엣": False, "비율": 1.0, **kw}
+    settings = {"pay_rules": [
+        rule(지점="R", 구분="*", 총액=33000),            # 편집기 기본값 "*" -> 개인/그룹 모두
+        rule(지점="F", 구분="개인", 총액=36000, 비율=0.967),
+        rule(지점="V", 구분="그룹", 인원=2, 총액=60000),
+        rule(지점="x", 구분="*", 총액=1),               # 지점이 잘못된 규칙은 버린다
+    ]}
+    when = pd.Timestamp("2025-06-01")
+    assert pay_one("R", "개인", 1, settings, when=when) == (33000.0, 33000.0)
+    assert pay_one("R", "그룹", 5, settings, when=when) == (33000.0, 33000.0)
+    assert pay_one("R", "그룹", 3, settings, when=when) == (40000.0, 40000.0)   # 3명 규칙은 그대로
+    assert pay_one("F", "그룹", 2, settings, when=when) == (36000.0, 34812.0)
+    assert pay_one("V", "개인", 1, settings, when=when) == (60000.0, 60000.0)
+
+def test_blank_gross_falls_back_only_for_visits():
+    rule = lambda **kw: {"시작": "2024-01-01", "구분": "*", "인원": 0, "듀엣": False, "총액": None, "비율": None, **kw}
+    rules = [rule(지점="R", 구분="그룹", 인원=4), rule(지점="F"), rule(지점="V")]
+    settings = {"visit_default_net": 50000, "pay_rules": rules}
+    assert missing_gross(rules).tolist() == [True, True, False]
+    when = pd.Timestamp("2024-06-01")
+    # 총액이 빈 F/R 규칙은 버린다 (0원이 아니라 예전 규칙 그대로)
+    assert pay_one("R", "그룹", 4, settings, when=when) == (30000.0, 30000.0)
+    assert pay_one("F", "개인", 1, settings, when=when) == (35000.0, 33845.0)
+    assert pay_one("V", "개인", 1, settings, when=when) == (50000.0, 50000.0)
+
+def test_rate_table_with_all_blank_columns_does_not_warn():
+    settings = {"pay_rules": [{"시작": "2024-01-01", "지점": "V", "구분": None, "인원": None, "듀엣": None,
+                               "총액": None, "비율": None}]}
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", FutureWarning)
+        t = rate_table(settings)
+    assert t["총액"].notna().all() and t["듀엣"].dtype == bool
@@ -0,0 +1,27 @@
+import pandas as pd
+
+from schema import CALENDAR_COLS, SESSIONS, SESSIONS_COLS, SCHEDULE, SCHEDULE_COLS, to_typed, to_text
+from storage import cached_table, partition_table, write_table
+
+def test_to_typed_attaches_calendar_columns():
+    raw = pd.DataFrame([{"id": "1", "날짜": "2026-09-03 14:30:00"}, {"id": "2", "날짜": ""}],
+                       columns=SESSIONS_COLS).fillna("")
+    df = to_typed(raw, SESSIONS)
+    assert set(CALENDAR_COLS) <= set(df.columns)
+    r = df.iloc[0]
+    assert (r["YM"], r["Y"], r["요일"], r["시"], r["주"]) == ("2026-09", 2026, 3, 14, pd.Timestamp("2026-08-31"))
+    assert df.iloc[1][CALENDAR_COLS].isna().all()
+    assert not set(CALENDAR_COLS) & set(to_text(df, SESSIONS).columns)   # 저장할 때는 뺀다
+
+def test_cached_loader_keeps_calendar_columns(tmp_path):
+    # app.load_schedule 과 같은 경로: 월 파티션 + cached_table + to_typed
+    path = tmp_path / "schedule.csv"
+    partition_table(path)
+    rows = pd.DataFrame([{"id": "1", "날짜": "2026-09-03 14:30:00"}, {"id": "2", "날짜": "2026-10-01 09:00:00"}],
+                        columns=SCHEDULE_COLS).fillna("")
+    write_table(path, rows)
+    parse = lambda df: to_typed(df, SCHEDULE)
+    for start, end in ((None, None), (pd.Timestamp("2026-10-01"), pd.Timestamp("2026-11-01"))):
+        df = cached_table(path, parse, start, end)
+        assert set(CALENDAR_COLS) <= set(df.columns) and df["YM"].notna().all()
+    assert list(df["YM"].astype(object)) == ["2026-10"]
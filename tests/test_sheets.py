@@ -0,0 +1,48 @@
+import time
+
+import pandas as pd
+
+from fake_sheets import FakeSpreadsheet
+from sheets import TABS, fetch_tabs, SheetWriter, Outbox, SyncWorker
+
+def _book():
+    return FakeSpreadsheet({
+        "members":  [["id", "이름", "updated_at"], ["1", "홍길동", "a"], ["2", "김철수"]],
+        "sessions": [["id", "이름"], ["10", "홍길동"]],
+        "schedule": [["id", "상태"]],
+    })
+
+def test_fetch_tabs_reads_all_tabs_in_one_call():
+    book = _book()
+    frames = fetch_tabs(book)
+    assert [name for name, _ in book.calls] == ["values_batch_get"]
+    assert list(frames) == TABS
+    assert frames["members"]["이름"].tolist() == ["홍길동", "김철수"]
+    assert frames["members"]["updated_at"].tolist() == ["a", ""]   # 짧은 행은 "" 로 채움
+    assert frames["schedule"].empty and list(frames["schedule"].columns) == ["id", "상태"]
+
+def test_writer_rereads_row_positions_after_rows_are_deleted():
+    book = FakeSpreadsheet({"members": [["id", "이름"], ["1", "가"], ["2", "나"], ["3", "다"], ["4", "라"]]})
+    w = SheetWriter(book, sleep=lambda s: None)
+    w.write_rows("members", [{"id": "2", "이름": "나2"}])
+    del book._sheets["members"].values[1]   # 시트에서 id 1 행을 지움 -> 아래 행이 한 칸씩 올라감
+    w.write_rows("members", [{"id": "3", "이름": "다2"}, {"id": "5", "이름": "마"}])
+    assert book._sheets["members"].values == [["id", "이름"], ["2", "나2"], ["3", "다2"], ["4", "라"], ["5", "마"]]
+
+def test_worker_drains_outbox_into_sheet_and_stops(tmp_path):
+    book = FakeSpreadsheet({"members": [["id", "이름", "updated_at"], ["1", "가", "a"]],
+                            "sessions": [["id", "updated_at"]], "schedule": [["id", "updated_at"]]})
+    worker = SyncWorker(Outbox(tmp_path / "outbox.db"), lambda: book, pull_every=0, coalesce=0, idle=0.05)
+    worker.start()
+    worker.enqueue("members", pd.DataFrame([{"id": "1", "이름": "가2", "updated_at": "b"},
+                                            {"id": "2", "이름": "나", "updated_at": "c"}]))
+    worker.enqueue("moves", pd.DataFrame([{"id": "9"}]))   # 시트에 없는 로컬 전용 탭은 무시
+    deadline = time.time() + 5
+    while worker.outbox.depth() and time.time() < deadline:
+        time.sleep(0.02)
+    worker.stop()
+    worker.join(timeout=5)
+    assert not worker.is_alive()
+    assert worker.outbox.depth() == 0 and worker.last_error == ""
+    assert book._sheets["members"].values == [["id", "이름", "updated_at"], ["1", "가2", "b"], ["2", "나", "c"]]
+    assert worker.frames["members"]["이름"].tolist() == ["가2", "나"]   # 보낸 뒤 다시 읽어 둔 사본
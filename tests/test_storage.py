@@ -0,0 +1,99 @@
+import sys
+import threading
+
+import pandas as pd
+
+import storage
+from storage import (partition_table, partition_dir, read_table, write_table, next_id, replace_table, seq_path,
+                     cached_load, invalidate)
+
+COLS = ["id", "날짜", "이름"]
+
+def _table(tmp_path, rows, name="sessions.csv"):
+    path = tmp_path / name
+    pd.DataFrame(rows, columns=COLS).to_csv(path, index=False, encoding="utf-8-sig")
+    return path
+
+def test_next_id_after_partitioning_does_not_reuse_ids(tmp_path):
+    # 파티션으로 나눈 뒤 sessions.csv 는 .bak 으로 옮겨지고 .seq 도 아직 없다
+    path = _table(tmp_path, [["1", "2026-09-01 10:00:00", "A"], ["2", "2026-09-02 10:00:00", "B"],
+                             ["7", "", "C"]])
+    partition_table(path)
+    assert not path.exists() and partition_dir(path).is_dir() and not seq_path(path).exists()
+    new = next_id(path)
+    assert new == "8"
+    write_table(path, pd.DataFrame([[new, "2026-10-01 10:00:00", "D"]], columns=COLS))
+    assert sorted(read_table(path)["id"], key=int) == ["1", "2", "7", "8"]
+
+def test_next_id_after_restore_starts_after_restored_ids(tmp_path):
+    path = _table(tmp_path, [["1", "2026-09-01 10:00:00", "A"]], name="schedule.csv")
+    partition_table(path)
+    assert next_id(path) == "2"
+    raw = pd.DataFrame([["1", "2026-09-01 10:00:00", "A"], ["20", "2026-08-01 10:00:00", "B"]],
+                       columns=COLS).to_csv(index=False).encode("utf-8-sig")
+    replace_table(path, raw)
+    assert next_id(path) == "21"
+    assert set(read_table(path)["id"]) == {"1", "20"}
+
+def test_cache_is_safe_across_threads(tmp_path, monkeypatch):
+    # 피드(HTTP) 스레드의 cached_load 와 스크립트 스레드의 invalidate 가 겹쳐도
+    # "dictionary changed size during iteration" 이 나지 않아야 한다
+    monkeypatch.setattr(storage, "_cache", {("pad", j): (None, None) for j in range(5000)})
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    errors, stop = [], threading.Event()
+
+    def load():
+        i = 0
+        while not stop.is_set():
+            try:
+                cached_load((tmp_path, i), [], lambda: i)
+            except Exception as e:
+                errors.append(e)
+                return
+            i += 1
+
+    threads = [threading.Thread(target=load) for _ in range(2)]
+    try:
+        for t in threads:
+            t.start()
+        for _ in range(100):
+            invalidate(tmp_path)
+    except Exception as e:
+        errors.append(e)
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
+        sys.setswitchinterval(interval)
+    assert errors == []
+
+def test_concurrent_read_does_not_overwrite_newer_snapshot(tmp_path, monkeypatch):
+    # 피드 스레드가 파일을 읽은 뒤 스냅샷을 저장하기 전에 앱이 쓰면, 읽은 옛 내용이 새 스냅샷을 덮으면 안 된다
+    path = _table(tmp_path, [["1", "2026-09-01 10:00:00", "A"]])
+    read_table(path)
+    read_done, go = threading.Event(), threading.Event()
+    merged = storage._read_merged
+
+    def slow_read(p):
+        df = merged(p)
+        if threading.current_thread().name == "feed":
+            read_done.set()
+            go.wait(5)
+        return df
+    monkeypatch.setattr(storage, "_read_merged", slow_read)
+
+    row = pd.DataFrame([["2", "2026-09-02 10:00:00", "B"]], columns=COLS)
+    reader = threading.Thread(target=read_table, args=(path,), name="feed")
+    writer = threading.Thread(target=write_table, args=(path, row))
+    reader.start()
+    read_done.wait(5)
+    writer.start()
+    writer.join(0.2)   # 잠겨 있으면 읽기가 끝날 때까지 기다린다
+    go.set()
+    reader.join()
+    writer.join()
+    journal = storage.journal_path(path)
+    n = len(journal.read_text(encoding="utf-8").splitlines())
+    write_table(path, row)   # 같은 행: 스냅샷이 최신이면 바뀐 것이 없다
+    assert len(journal.read_text(encoding="utf-8").splitlines()) == n == 1